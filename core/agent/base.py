@@ -1,6 +1,7 @@
 import asyncio
 import logging
 from abc import ABCMeta
+from contextlib import aclosing
 from typing import AsyncGenerator, Generator, Optional
 
 from core.base.abstractions import (
@@ -135,14 +136,16 @@ class R2RStreamingAgent(R2RAgent):
             generation_config = self.get_generation_config(
                 messages_list[-1], stream=True
             )
-            stream = self.llm_provider.aget_completion_stream(
-                messages_list,
-                generation_config,
-            )
-            async for proc_chunk in self.process_llm_response(
-                stream, *args, **kwargs
-            ):
-                yield proc_chunk
+            async with aclosing(
+                self.llm_provider.aget_completion_stream(
+                    messages_list,
+                    generation_config,
+                )
+            ) as stream:
+                async for proc_chunk in self.process_llm_response(
+                    stream, *args, **kwargs
+                ):
+                    yield proc_chunk
 
     def run(
         self, system_instruction, messages, *args, **kwargs
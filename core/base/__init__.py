@@ -114,7 +114,10 @@ __all__ = [
     "DatabaseConfig",
     "DatabaseProvider",
     "PostgresConfigurationSettings",
+    "current_project_name",
+    "project_context",
     # Embedding provider
+    "EmbeddingCache",
     "EmbeddingConfig",
     "EmbeddingProvider",
     # Ingestion provider
@@ -7,6 +7,7 @@ from .database import (
     DatabaseConnectionManager,
     DatabaseProvider,
     DocumentHandler,
+    EmbeddingCacheHandler,
     FileHandler,
     KGHandler,
     LoggingHandler,
@@ -15,9 +16,11 @@ from .database import (
     TokenHandler,
     UserHandler,
     VectorHandler,
+    current_project_name,
+    project_context,
 )
 from .email import EmailConfig, EmailProvider
-from .embedding import EmbeddingConfig, EmbeddingProvider
+from .embedding import EmbeddingCache, EmbeddingConfig, EmbeddingProvider
 from .ingestion import ChunkingStrategy, IngestionConfig, IngestionProvider
 from .llm import CompletionConfig, CompletionProvider
 from .orchestration import OrchestrationConfig, OrchestrationProvider, Workflow
@@ -45,6 +48,7 @@ __all__ = [
     "DocumentHandler",
     "CollectionHandler",
     "TokenHandler",
+    "EmbeddingCacheHandler",
     "UserHandler",
     "LoggingHandler",
     "VectorHandler",
@@ -54,7 +58,10 @@ __all__ = [
     "DatabaseConfig",
     "PostgresConfigurationSettings",
     "DatabaseProvider",
+    "current_project_name",
+    "project_context",
     # Embedding provider
+    "EmbeddingCache",
     "EmbeddingConfig",
     "EmbeddingProvider",
     # LLM provider
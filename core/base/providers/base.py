@@ -6,6 +6,23 @@ from pydantic import BaseModel
 from ..abstractions import R2RSerializable
 
 
+def is_rate_limit_error(e: BaseException) -> bool:
+    """Whether `e`, or an exception it was raised from, is a rate limit."""
+    # Providers re-raise upstream errors as `ValueError` or
+    # `R2RException(..., 400)`, so look through the exception chain
+    seen: set[int] = set()
+    error: Optional[BaseException] = e
+    while error is not None and id(error) not in seen:
+        if (
+            getattr(error, "status_code", None) == 429
+            or "ratelimit" in type(error).__name__.lower()
+        ):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
 class AppConfig(R2RSerializable):
     project_name: Optional[str] = None
 
@@ -1,5 +1,7 @@
 import logging
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from io import BytesIO
 from typing import (
@@ -7,6 +9,7 @@ from typing import (
     AsyncGenerator,
     BinaryIO,
     Dict,
+    Iterator,
     List,
     Optional,
     Sequence,
@@ -117,6 +120,13 @@ class PostgresConfigurationSettings(BaseModel):
     max_parallel_workers: Optional[int] = 8
     max_parallel_maintenance_workers: Optional[int] = 2
 
+    # Client-side connection pool settings. Unset values fall back to the
+    # R2R_POSTGRES_* environment variables, then to the pool's defaults
+    min_connections: Optional[int] = None
+    max_inactive_connection_lifetime: Optional[float] = None
+    statement_cache_size: Optional[int] = None
+    max_cached_statement_lifetime: Optional[int] = None
+
 
 class DatabaseConfig(ProviderConfig):
     """A base database configuration class"""
@@ -134,6 +144,7 @@ class DatabaseConfig(ProviderConfig):
     default_collection_name: str = "Default"
     default_collection_description: str = "Your default collection."
     enable_fts: bool = False
+    read_replica_host: Optional[str] = None
 
     # KG settings
     batch_size: Optional[int] = 1
@@ -167,11 +178,18 @@ class DatabaseConnectionManager(ABC):
         query: str,
         params: Optional[Union[dict[str, Any], Sequence[Any]]] = None,
         isolation_level: Optional[str] = None,
+        query_name: str = "unnamed",
     ):
         pass
 
     @abstractmethod
-    async def execute_many(self, query, params=None, batch_size=1000):
+    async def execute_many(
+        self,
+        query,
+        params=None,
+        batch_size=1000,
+        query_name: str = "unnamed",
+    ):
         pass
 
     @abstractmethod
@@ -179,6 +197,8 @@ class DatabaseConnectionManager(ABC):
         self,
         query: str,
         params: Optional[Union[dict[str, Any], Sequence[Any]]] = None,
+        read_only: bool = False,
+        query_name: str = "unnamed",
     ):
         pass
 
@@ -187,14 +207,34 @@ class DatabaseConnectionManager(ABC):
         self,
         query: str,
         params: Optional[Union[dict[str, Any], Sequence[Any]]] = None,
+        read_only: bool = False,
+        query_name: str = "unnamed",
     ):
         pass
 
     @abstractmethod
-    async def initialize(self, pool: Any):
+    async def initialize(self, pool: Any, read_pool: Optional[Any] = None):
         pass
 
 
+# Project, i.e. tenant schema, of the request being served. Handlers resolve
+# their tables against it on every query, so a single provider and its pool
+# can serve many tenants concurrently.
+current_project_name: ContextVar[Optional[str]] = ContextVar(
+    "current_project_name", default=None
+)
+
+
+@contextmanager
+def project_context(project_name: Optional[str]) -> Iterator[None]:
+    """Serves the enclosed requests from the schema of `project_name`."""
+    token = current_project_name.set(project_name)
+    try:
+        yield
+    finally:
+        current_project_name.reset(token)
+
+
 class Handler(ABC):
     def __init__(
         self, project_name: str, connection_manager: DatabaseConnectionManager
@@ -202,6 +242,15 @@ class Handler(ABC):
         self.project_name = project_name
         self.connection_manager = connection_manager
 
+    @property
+    def project_name(self) -> str:
+        """The project of the current request, else the configured one."""
+        return current_project_name.get() or self._project_name
+
+    @project_name.setter
+    def project_name(self, project_name: str) -> None:
+        self._project_name = project_name
+
     def _get_table_name(self, base_name: str) -> str:
         return f"{self.project_name}.{base_name}"
 
@@ -365,6 +414,12 @@ class TokenHandler(Handler):
     async def is_token_blacklisted(self, token: str) -> bool:
         pass
 
+    @abstractmethod
+    async def get_blacklisted_tokens(
+        self, since: Optional[datetime] = None
+    ) -> list[tuple[str, datetime]]:
+        pass
+
     @abstractmethod
     async def clean_expired_blacklisted_tokens(
         self,
@@ -374,6 +429,31 @@ class TokenHandler(Handler):
         pass
 
 
+class EmbeddingCacheHandler(Handler):
+
+    @abstractmethod
+    async def create_tables(self):
+        pass
+
+    @abstractmethod
+    async def get_cached_embeddings(
+        self, cache_keys: list[str]
+    ) -> dict[str, list[float]]:
+        pass
+
+    @abstractmethod
+    async def cache_embeddings(self, entries: dict[str, list[float]]) -> None:
+        pass
+
+    @abstractmethod
+    async def clean_embedding_cache(
+        self,
+        max_age_hours: int = 30 * 24,
+        current_time: Optional[datetime] = None,
+    ) -> None:
+        pass
+
+
 class UserHandler(Handler):
     TABLE_NAME = "users"
 
@@ -509,6 +589,10 @@ class VectorHandler(Handler):
     async def upsert_entries(self, entries: list[VectorEntry]) -> None:
         pass
 
+    @abstractmethod
+    async def upsert_entries_bulk(self, entries: list[VectorEntry]) -> None:
+        pass
+
     @abstractmethod
     async def semantic_search(
         self, query_vector: list[float], search_settings: VectorSearchSettings
@@ -527,6 +611,12 @@ class VectorHandler(Handler):
     ) -> list[dict]:
         pass
 
+    @abstractmethod
+    async def refresh_document_search_index(
+        self, document_ids: Optional[list[UUID]] = None
+    ) -> None:
+        pass
+
     @abstractmethod
     async def hybrid_search(
         self,
@@ -595,7 +685,9 @@ class VectorHandler(Handler):
 
     @abstractmethod
     async def list_indices(
-        self, table_name: Optional[VectorTableName] = None
+        self,
+        table_name: Optional[VectorTableName] = None,
+        index_column: Optional[str] = None,
     ) -> list[dict]:
         pass
 
@@ -636,6 +728,13 @@ class KGHandler(Handler):
         """Add KG extractions to storage."""
         pass
 
+    @abstractmethod
+    def batch_writer(
+        self, table_prefix: str = "chunk_", flush_size: int = 5_000
+    ) -> Any:
+        """Return a buffered bulk writer for KG extractions."""
+        pass
+
     @abstractmethod
     async def add_entities(
         self,
@@ -662,6 +761,13 @@ class KGHandler(Handler):
         """Get entity map for a document."""
         pass
 
+    @abstractmethod
+    def stream_entity_map(
+        self, document_id: UUID, batch_size: int = 256
+    ) -> AsyncGenerator[Tuple[str, Dict[str, List[Dict[str, Any]]]], None]:
+        """Stream entities of a document with their triples, in name order."""
+        pass
+
     @abstractmethod
     async def upsert_embeddings(
         self,
@@ -678,6 +784,13 @@ class KGHandler(Handler):
         """Perform vector similarity search."""
         pass
 
+    @abstractmethod
+    async def batched_vector_query(
+        self, query_embeddings: List[List[float]], **kwargs: Any
+    ) -> List[List[Dict[str, Any]]]:
+        """Perform one vector similarity search per query embedding."""
+        pass
+
     # Community management
     @abstractmethod
     async def add_community_info(self, communities: List[Any]) -> None:
@@ -710,6 +823,27 @@ class KGHandler(Handler):
         """Get detailed information about a community."""
         pass
 
+    @abstractmethod
+    async def get_pending_community_details(
+        self, collection_id: UUID, offset: int, limit: int
+    ) -> List[Tuple[int, int, list[Entity], list[Triple]]]:
+        """Get the details of communities that have no report yet."""
+        pass
+
+    @abstractmethod
+    async def add_community_summary_tokens(
+        self, collection_id: UUID, tokens: int
+    ) -> int:
+        """Record tokens spent on community summaries, return the total."""
+        pass
+
+    @abstractmethod
+    async def reset_community_summary_tokens(
+        self, collection_id: UUID
+    ) -> None:
+        """Reset the community summary token count of a collection."""
+        pass
+
     @abstractmethod
     async def get_community_reports(
         self, collection_id: UUID
@@ -775,6 +909,30 @@ class KGHandler(Handler):
         """Get triples from storage."""
         pass
 
+    @abstractmethod
+    async def get_entity_embeddings(
+        self,
+        collection_id: UUID,
+        entity_table_name: str = "document_entity",
+        fetch_size: int = 10_000,
+        include_embeddings: bool = True,
+    ) -> Tuple[List[Entity], Any]:
+        """Get entities and their description embeddings as a float32 matrix."""
+        pass
+
+    @abstractmethod
+    async def get_entity_neighbours(
+        self,
+        collection_id: UUID,
+        entity_ids: List[int],
+        max_distance: float,
+        limit: int = 16,
+        entity_table_name: str = "document_entity",
+        ef_search: int = 40,
+    ) -> List[Tuple[int, int]]:
+        """Get pairs of nearby entities through the description ANN index."""
+        pass
+
     @abstractmethod
     async def get_entity_count(
         self,
@@ -819,10 +977,48 @@ class KGHandler(Handler):
         """Get deduplication cost estimate."""
         pass
 
+    @abstractmethod
+    async def create_index(
+        self,
+        table_name: VectorTableName,
+        index_measure: IndexMeasure = IndexMeasure.cosine_distance,
+        index_method: IndexMethod = IndexMethod.auto,
+        index_arguments: Optional[
+            Union[IndexArgsIVFFlat, IndexArgsHNSW]
+        ] = None,
+        index_name: Optional[str] = None,
+        concurrently: bool = True,
+    ) -> None:
+        """Create a vector index on a knowledge graph table."""
+        pass
+
+    @abstractmethod
+    async def list_indices(self, table_name: VectorTableName) -> list[dict]:
+        """List the vector indices on a knowledge graph table."""
+        pass
+
+    @abstractmethod
+    async def delete_index(
+        self,
+        index_name: str,
+        table_name: VectorTableName,
+        concurrently: bool = True,
+    ) -> None:
+        """Delete a vector index from a knowledge graph table."""
+        pass
+
     # Other operations
     @abstractmethod
-    async def create_vector_index(self) -> None:
-        """Create vector index."""
+    async def create_vector_index(
+        self,
+        index_measure: Optional[IndexMeasure] = None,
+        index_method: IndexMethod = IndexMethod.hnsw,
+        index_arguments: Optional[
+            Union[IndexArgsIVFFlat, IndexArgsHNSW]
+        ] = None,
+        concurrently: bool = True,
+    ) -> list[str]:
+        """Create vector indices on knowledge graph tables lacking one."""
         raise NotImplementedError
 
     @abstractmethod
@@ -862,6 +1058,17 @@ class KGHandler(Handler):
         """Get existing entity extraction IDs."""
         raise NotImplementedError
 
+    @abstractmethod
+    def stream_document_chunk_groups(
+        self,
+        document_id: UUID,
+        group_size: int = 1,
+        filter_out_existing_chunks: bool = True,
+        prefetch: int = 256,
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Stream groups of document chunks to extract, in chunk order."""
+        pass
+
     @abstractmethod
     async def get_all_triples(
         self, collection_id: UUID, document_ids: Optional[list[UUID]] = None
@@ -1098,6 +1305,7 @@ class DatabaseProvider(Provider):
     prompt_handler: PromptHandler
     file_handler: FileHandler
     logging_handler: LoggingHandler
+    embedding_cache_handler: EmbeddingCacheHandler
     config: DatabaseConfig
     project_name: str
 
@@ -1274,6 +1482,11 @@ class DatabaseProvider(Provider):
     async def is_token_blacklisted(self, token: str) -> bool:
         return await self.token_handler.is_token_blacklisted(token)
 
+    async def get_blacklisted_tokens(
+        self, since: Optional[datetime] = None
+    ) -> list[tuple[str, datetime]]:
+        return await self.token_handler.get_blacklisted_tokens(since)
+
     async def clean_expired_blacklisted_tokens(
         self,
         max_age_hours: int = 7 * 24,
@@ -1403,6 +1616,9 @@ class DatabaseProvider(Provider):
     async def upsert_entries(self, entries: list[VectorEntry]) -> None:
         return await self.vector_handler.upsert_entries(entries)
 
+    async def upsert_entries_bulk(self, entries: list[VectorEntry]) -> None:
+        return await self.vector_handler.upsert_entries_bulk(entries)
+
     async def semantic_search(
         self, query_vector: list[float], search_settings: VectorSearchSettings
     ) -> list[VectorSearchResult]:
@@ -1434,6 +1650,13 @@ class DatabaseProvider(Provider):
     ) -> list[dict]:
         return await self.vector_handler.search_documents(query_text, settings)
 
+    async def refresh_document_search_index(
+        self, document_ids: Optional[list[UUID]] = None
+    ) -> None:
+        return await self.vector_handler.refresh_document_search_index(
+            document_ids
+        )
+
     async def delete(
         self, filters: dict[str, Any]
     ) -> dict[str, dict[str, str]]:
@@ -1489,6 +1712,15 @@ class DatabaseProvider(Provider):
         index_column: Optional[str] = None,
         concurrently: bool = True,
     ) -> None:
+        if table_name not in (None, VectorTableName.VECTORS):
+            return await self.kg_handler.create_index(
+                table_name,
+                index_measure,
+                index_method,
+                index_arguments,
+                index_name,
+                concurrently,
+            )
         return await self.vector_handler.create_index(
             table_name,
             index_measure,
@@ -1500,9 +1732,15 @@ class DatabaseProvider(Provider):
         )
 
     async def list_indices(
-        self, table_name: Optional[VectorTableName] = None
+        self,
+        table_name: Optional[VectorTableName] = None,
+        index_column: Optional[str] = None,
     ) -> list[dict]:
-        return await self.vector_handler.list_indices(table_name)
+        if table_name not in (None, VectorTableName.VECTORS):
+            return await self.kg_handler.list_indices(table_name)
+        return await self.vector_handler.list_indices(
+            table_name, index_column
+        )
 
     async def delete_index(
         self,
@@ -1510,6 +1748,10 @@ class DatabaseProvider(Provider):
         table_name: Optional[VectorTableName] = None,
         concurrently: bool = True,
     ) -> None:
+        if table_name not in (None, VectorTableName.VECTORS):
+            return await self.kg_handler.delete_index(
+                index_name, table_name, concurrently
+            )
         return await self.vector_handler.delete_index(
             index_name, table_name, concurrently
         )
@@ -1535,6 +1777,12 @@ class DatabaseProvider(Provider):
             kg_extractions, table_prefix
         )
 
+    def kg_batch_writer(
+        self, table_prefix: str = "chunk_", flush_size: int = 5_000
+    ) -> Any:
+        """Forward to KG handler batch_writer method."""
+        return self.kg_handler.batch_writer(table_prefix, flush_size)
+
     async def add_entities(
         self,
         entities: list[Entity],
@@ -1560,6 +1808,12 @@ class DatabaseProvider(Provider):
         """Forward to KG handler get_entity_map method."""
         return await self.kg_handler.get_entity_map(offset, limit, document_id)
 
+    def stream_entity_map(
+        self, document_id: UUID, batch_size: int = 256
+    ) -> AsyncGenerator[Tuple[str, Dict[str, List[Dict[str, Any]]]], None]:
+        """Forward to KG handler stream_entity_map method."""
+        return self.kg_handler.stream_entity_map(document_id, batch_size)
+
     async def upsert_embeddings(
         self,
         data: List[Tuple[Any]],
@@ -1604,6 +1858,30 @@ class DatabaseProvider(Provider):
             community_number, collection_id
         )
 
+    async def get_pending_community_details(
+        self, collection_id: UUID, offset: int, limit: int
+    ) -> List[Tuple[int, int, list[Entity], list[Triple]]]:
+        """Forward to KG handler get_pending_community_details method."""
+        return await self.kg_handler.get_pending_community_details(
+            collection_id, offset, limit
+        )
+
+    async def add_community_summary_tokens(
+        self, collection_id: UUID, tokens: int
+    ) -> int:
+        """Forward to KG handler add_community_summary_tokens method."""
+        return await self.kg_handler.add_community_summary_tokens(
+            collection_id, tokens
+        )
+
+    async def reset_community_summary_tokens(
+        self, collection_id: UUID
+    ) -> None:
+        """Forward to KG handler reset_community_summary_tokens method."""
+        return await self.kg_handler.reset_community_summary_tokens(
+            collection_id
+        )
+
     async def get_community_reports(
         self, collection_id: UUID
     ) -> List[CommunityReport]:
@@ -1684,6 +1962,37 @@ class DatabaseProvider(Provider):
             limit,
         )
 
+    async def get_entity_embeddings(
+        self,
+        collection_id: UUID,
+        entity_table_name: str = "document_entity",
+        fetch_size: int = 10_000,
+        include_embeddings: bool = True,
+    ) -> Tuple[List[Entity], Any]:
+        """Forward to KG handler get_entity_embeddings method."""
+        return await self.kg_handler.get_entity_embeddings(
+            collection_id, entity_table_name, fetch_size, include_embeddings
+        )
+
+    async def get_entity_neighbours(
+        self,
+        collection_id: UUID,
+        entity_ids: List[int],
+        max_distance: float,
+        limit: int = 16,
+        entity_table_name: str = "document_entity",
+        ef_search: int = 40,
+    ) -> List[Tuple[int, int]]:
+        """Forward to KG handler get_entity_neighbours method."""
+        return await self.kg_handler.get_entity_neighbours(
+            collection_id,
+            entity_ids,
+            max_distance,
+            limit,
+            entity_table_name,
+            ef_search,
+        )
+
     async def get_entity_count(
         self,
         collection_id: Optional[UUID] = None,
@@ -1748,8 +2057,25 @@ class DatabaseProvider(Provider):
     ) -> AsyncGenerator[Any, None]:
         return self.kg_handler.vector_query(query, **kwargs)  # type: ignore
 
-    async def create_vector_index(self) -> None:
-        return await self.kg_handler.create_vector_index()
+    async def batched_vector_query(
+        self, query_embeddings: List[List[float]], **kwargs: Any
+    ) -> List[List[Dict[str, Any]]]:
+        return await self.kg_handler.batched_vector_query(
+            query_embeddings, **kwargs
+        )
+
+    async def create_vector_index(
+        self,
+        index_measure: Optional[IndexMeasure] = None,
+        index_method: IndexMethod = IndexMethod.hnsw,
+        index_arguments: Optional[
+            Union[IndexArgsIVFFlat, IndexArgsHNSW]
+        ] = None,
+        concurrently: bool = True,
+    ) -> list[str]:
+        return await self.kg_handler.create_vector_index(
+            index_measure, index_method, index_arguments, concurrently
+        )
 
     async def delete_triples(self, triple_ids: list[int]) -> None:
         return await self.kg_handler.delete_triples(triple_ids)
@@ -1776,6 +2102,17 @@ class DatabaseProvider(Provider):
             document_id
         )
 
+    def stream_document_chunk_groups(
+        self,
+        document_id: UUID,
+        group_size: int = 1,
+        filter_out_existing_chunks: bool = True,
+        prefetch: int = 256,
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        return self.kg_handler.stream_document_chunk_groups(
+            document_id, group_size, filter_out_existing_chunks, prefetch
+        )
+
     async def add_prompt(
         self, name: str, template: str, input_types: dict[str, str]
     ) -> None:
@@ -1,11 +1,16 @@
 import asyncio
+import hashlib
 import logging
 import random
 import time
 from abc import abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
+import numpy as np
 from litellm import AuthenticationError
 
 from core.base.abstractions import VectorQuantizationSettings
@@ -15,11 +20,23 @@ from ..abstractions import (
     VectorSearchResult,
     default_embedding_prefixes,
 )
-from .base import Provider, ProviderConfig
+from .base import Provider, ProviderConfig, is_rate_limit_error
 
 logger = logging.getLogger()
 
 
+class RateLimitTracker:
+    """Counts the rate limited requests made on behalf of one caller."""
+
+    def __init__(self):
+        self.events = 0
+
+
+_rate_limit_tracker: ContextVar[Optional[RateLimitTracker]] = ContextVar(
+    "embedding_rate_limit_tracker", default=None
+)
+
+
 class EmbeddingConfig(ProviderConfig):
     provider: str
     base_model: str
@@ -37,6 +54,12 @@ class EmbeddingConfig(ProviderConfig):
     quantization_settings: VectorQuantizationSettings = (
         VectorQuantizationSettings()
     )
+    cache_size: int = 1024
+    persistent_cache: bool = False
+    persistent_cache_ttl_hours: int = 30 * 24
+    persistent_cache_cleanup_interval: float = 3600.0
+    max_tokens_per_batch: Optional[int] = None
+    target_batch_latency: float = 2.0
 
     def validate_config(self) -> None:
         if self.provider not in self.supported_providers:
@@ -47,6 +70,120 @@ class EmbeddingConfig(ProviderConfig):
         return ["litellm", "openai", "ollama"]
 
 
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache with an in-process LRU tier and an
+    optional persistent tier, such as a Postgres `EmbeddingCacheHandler`.
+
+    Persistent entries expire `ttl_hours` after they were first written.
+    Writes sweep expired entries out of the store at most once every
+    `cleanup_interval` seconds per project, so the table stays bounded
+    without a scheduler, which short-lived workers cannot rely on.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_hours: int = 30 * 24,
+        cleanup_interval: float = 3600.0,
+    ):
+        self.max_size = max_size
+        self.ttl_hours = ttl_hours
+        self.cleanup_interval = cleanup_interval
+        self.persistent_store: Optional[Any] = None
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._last_cleanup: dict[str, float] = {}
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 or self.persistent_store is not None
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+    @staticmethod
+    def make_key(
+        model: str, dimension: int, purpose: str, prefix: str, text: str
+    ) -> str:
+        prefix_digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        text_digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}:{dimension}:{purpose}:{prefix_digest[:16]}:{text_digest}"
+
+    async def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        missing = []
+        for key in keys:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                found[key] = self._entries[key].tolist()
+            else:
+                missing.append(key)
+        self.memory_hits += len(found)
+
+        if missing and self.persistent_store is not None:
+            try:
+                stored = await self.persistent_store.get_cached_embeddings(
+                    missing
+                )
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+                stored = {}
+            self.persistent_hits += len(stored)
+            for key, embedding in stored.items():
+                self._remember(key, embedding)
+                found[key] = list(embedding)
+
+        self.misses += len(set(keys) - found.keys())
+        return found
+
+    async def set_many(self, entries: dict[str, list[float]]) -> None:
+        for key, embedding in entries.items():
+            self._remember(key, embedding)
+        if entries and self.persistent_store is not None:
+            try:
+                await self.persistent_store.cache_embeddings(entries)
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+            await self._maybe_clean_persistent_store()
+
+    async def _maybe_clean_persistent_store(self) -> None:
+        # The store resolves the project per call, so sweep each one on
+        # its own schedule
+        project = getattr(self.persistent_store, "project_name", "")
+        now = time.monotonic()
+        last_cleanup = self._last_cleanup.get(project)
+        if (
+            last_cleanup is not None
+            and now - last_cleanup < self.cleanup_interval
+        ):
+            return
+        self._last_cleanup[project] = now
+        try:
+            await self.persistent_store.clean_embedding_cache(  # type: ignore
+                max_age_hours=self.ttl_hours
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache cleanup failed: {e}")
+
+    def _remember(self, key: str, embedding: list[float]) -> None:
+        if self.max_size <= 0:
+            return
+        # float32 arrays are far smaller than lists of Python floats
+        self._entries[key] = np.asarray(embedding, dtype=np.float32)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
 class EmbeddingProvider(Provider):
     class PipeStage(Enum):
         BASE = 1
@@ -63,8 +200,101 @@ class EmbeddingProvider(Provider):
         self.config: EmbeddingConfig = config
         self.semaphore = asyncio.Semaphore(config.concurrent_request_limit)
         self.current_requests = 0
+        self.cache = EmbeddingCache(
+            config.cache_size,
+            ttl_hours=config.persistent_cache_ttl_hours,
+            cleanup_interval=config.persistent_cache_cleanup_interval,
+        )
+        self.rate_limit_events = 0
+        self._encoding = None
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Approximate token count used to pack batches. Falls back to a
+        character heuristic when tiktoken is not installed.
+        """
+        if self._encoding is None:
+            try:
+                import tiktoken
+
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                self._encoding = False
+        if self._encoding:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    @contextmanager
+    def track_rate_limits(self) -> Iterator[RateLimitTracker]:
+        """
+        Counts the rate limited requests made within the block, including
+        those of tasks it spawns, but not those of concurrent callers.
+        """
+        tracker = RateLimitTracker()
+        token = _rate_limit_tracker.set(tracker)
+        try:
+            yield tracker
+        finally:
+            _rate_limit_tracker.reset(token)
+
+    def _record_rate_limit(self) -> None:
+        self.rate_limit_events += 1
+        tracker = _rate_limit_tracker.get()
+        if tracker is not None:
+            tracker.events += 1
+
+    def attach_cache_store(self, store: Any) -> None:
+        """
+        Attaches a persistent tier, e.g. `EmbeddingCacheHandler`, to the
+        embedding cache. Does nothing unless `persistent_cache` is enabled.
+        """
+        if self.config.persistent_cache:
+            self.cache.persistent_store = store
+
+    def _cache_key(self, text: str, purpose: EmbeddingPurpose) -> str:
+        prefix = getattr(self, "prefixes", {}).get(purpose, "")
+        return EmbeddingCache.make_key(
+            self.config.base_model,
+            self.config.base_dimension,
+            purpose.name if isinstance(purpose, Enum) else str(purpose),
+            prefix,
+            text,
+        )
 
     async def _execute_with_backoff_async(self, task: dict[str, Any]):
+        # Only base-stage batch tasks without request-specific kwargs are
+        # content-addressed; anything else goes straight upstream
+        if (
+            self.cache.enabled
+            and "texts" in task
+            and task.get("stage", EmbeddingProvider.PipeStage.BASE)
+            == EmbeddingProvider.PipeStage.BASE
+            and not task.get("kwargs")
+        ):
+            return await self._execute_with_cache_async(task)
+        return await self._execute_with_retries_async(task)
+
+    async def _execute_with_cache_async(self, task: dict[str, Any]):
+        purpose = task.get("purpose", EmbeddingPurpose.INDEX)
+        keys = [self._cache_key(text, purpose) for text in task["texts"]]
+        found = await self.cache.get_many(keys)
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, task["texts"]):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            embeddings = await self._execute_with_retries_async(
+                {**task, "texts": list(missing.values())}
+            )
+            computed = dict(zip(missing.keys(), embeddings))
+            await self.cache.set_many(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    async def _execute_with_retries_async(self, task: dict[str, Any]):
         retries = 0
         backoff = self.config.initial_backoff
         while retries < self.config.max_retries:
@@ -77,6 +307,8 @@ class EmbeddingProvider(Provider):
                 logger.warning(
                     f"Request failed (attempt {retries + 1}): {str(e)}"
                 )
+                if is_rate_limit_error(e):
+                    self._record_rate_limit()
                 retries += 1
                 if retries == self.config.max_retries:
                     raise
@@ -95,6 +327,8 @@ class EmbeddingProvider(Provider):
                 logger.warning(
                     f"Request failed (attempt {retries + 1}): {str(e)}"
                 )
+                if is_rate_limit_error(e):
+                    self._record_rate_limit()
                 retries += 1
                 if retries == self.config.max_retries:
                     raise
@@ -29,6 +29,8 @@ class IngestionConfig(ProviderConfig):
     vision_pdf_prompt_name: str = "vision_pdf"
     vision_pdf_model: str = "openai/gpt-4-mini"
 
+    streaming_ingestion: bool = False
+
     @property
     def supported_providers(self) -> list[str]:
         return ["r2r", "unstructured_local", "unstructured_api"]
@@ -3,8 +3,19 @@ import logging
 import random
 import time
 from abc import abstractmethod
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, AsyncGenerator, Generator, Optional
+from contextlib import aclosing, asynccontextmanager
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Generator,
+    Iterable,
+    Optional,
+    Union,
+)
 
 from litellm import AuthenticationError
 
@@ -14,7 +25,7 @@ from core.base.abstractions import (
     LLMChatCompletionChunk,
 )
 
-from .base import Provider, ProviderConfig
+from .base import Provider, ProviderConfig, is_rate_limit_error
 
 logger = logging.getLogger()
 
@@ -23,6 +34,9 @@ class CompletionConfig(ProviderConfig):
     provider: Optional[str] = None
     generation_config: GenerationConfig = GenerationConfig()
     concurrent_request_limit: int = 256
+    # starting point of the adaptive limit, defaults to the hard limit above
+    initial_concurrency: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
     max_retries: int = 8
     initial_backoff: float = 1.0
     max_backoff: float = 64.0
@@ -38,6 +52,217 @@ class CompletionConfig(ProviderConfig):
         return ["litellm", "openai"]
 
 
+class LimiterSlot:
+    """A granted request slot; set `used_tokens` once usage is known."""
+
+    __slots__ = ("estimated_tokens", "used_tokens", "started", "reservation")
+
+    def __init__(
+        self, estimated_tokens: int, reservation: Optional[list] = None
+    ):
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: Optional[int] = None
+        self.started = time.monotonic()
+        # the [timestamp, tokens] entry held in the limiter's token window
+        self.reservation = reservation
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Additive-increase / multiplicative-decrease limit on concurrent LLM
+    requests, shared by everything that talks to one completion provider.
+
+    The limit grows by roughly one slot per limit's worth of successful
+    requests and is halved when the provider rate limits us, at most once
+    per round of in-flight requests. With `tokens_per_minute` set, requests
+    also wait until their estimated tokens fit in the trailing minute.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(
+        self,
+        max_limit: int,
+        initial_limit: Optional[int] = None,
+        min_limit: int = 1,
+        tokens_per_minute: Optional[int] = None,
+        decrease_factor: float = 0.5,
+    ):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = min(max(min_limit, 1), self.max_limit)
+        self.limit = float(
+            min(
+                max(initial_limit or self.max_limit, self.min_limit),
+                self.max_limit,
+            )
+        )
+        self.tokens_per_minute = tokens_per_minute
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.rate_limit_events = 0
+        self._last_decrease = 0.0
+        # [timestamp, tokens] reserved against the tokens-per-minute budget,
+        # mutable so a reservation can be corrected once usage is known
+        self._reserved: deque[list] = deque()
+        # (timestamp, tokens) of completed requests, for throughput
+        self._completed: deque[tuple[float, int]] = deque()
+        self._started_at = time.monotonic()
+        self._changed = asyncio.Event()
+
+    def _expire(self, now: float) -> None:
+        for window in (self._reserved, self._completed):
+            while window and window[0][0] <= now - self.WINDOW:
+                window.popleft()
+
+    def _token_wait(self, tokens: int, now: float) -> Optional[float]:
+        """Seconds until `tokens` fit the budget, or None if they fit now."""
+        if not self.tokens_per_minute or not self._reserved:
+            return None
+        used = sum(reserved for _, reserved in self._reserved)
+        if used + tokens <= self.tokens_per_minute:
+            return None
+        return max(self._reserved[0][0] + self.WINDOW - now, 0.01)
+
+    async def acquire(self, estimated_tokens: int = 0) -> LimiterSlot:
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+            timeout = None
+            if self.in_flight < int(self.limit):
+                timeout = self._token_wait(estimated_tokens, now)
+                if timeout is None:
+                    break
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        self.in_flight += 1
+        reservation = None
+        if estimated_tokens:
+            reservation = [now, estimated_tokens]
+            self._reserved.append(reservation)
+        return LimiterSlot(estimated_tokens, reservation)
+
+    def release(
+        self, slot: LimiterSlot, success: bool, rate_limited: bool = False
+    ) -> None:
+        now = time.monotonic()
+        self.in_flight -= 1
+        used_tokens = (
+            slot.estimated_tokens
+            if slot.used_tokens is None
+            else slot.used_tokens
+        )
+        if used_tokens != slot.estimated_tokens:
+            # Correct the reservation in place now that actual usage is
+            # known. It keeps its timestamp, so the correction leaves the
+            # window together with the tokens it corrects; correcting one
+            # that already expired has no effect.
+            if slot.reservation is not None:
+                slot.reservation[1] = used_tokens
+            else:
+                self._reserved.append([now, used_tokens])
+
+        if rate_limited:
+            self.rate_limit_events += 1
+            # Requests that were already in flight when we backed off are
+            # answering for the old limit, do not punish the new one
+            if slot.started >= self._last_decrease:
+                self.limit = max(
+                    self.min_limit, self.limit * self.decrease_factor
+                )
+                self._last_decrease = now
+                logger.warning(
+                    f"LLM provider is rate limiting, reducing concurrency to {int(self.limit)}."
+                )
+        elif success:
+            self._completed.append((now, used_tokens))
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._changed.set()
+
+    @asynccontextmanager
+    async def slot(
+        self, estimated_tokens: int = 0
+    ) -> AsyncGenerator[LimiterSlot, None]:
+        slot = await self.acquire(estimated_tokens)
+        success, rate_limited = False, False
+        try:
+            yield slot
+            success = True
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            raise
+        finally:
+            self.release(slot, success, rate_limited)
+
+    async def as_completed(
+        self,
+        aws: Union[Iterable[Awaitable[Any]], AsyncIterable[Awaitable[Any]]],
+    ) -> AsyncGenerator[asyncio.Future, None]:
+        """
+        Like `asyncio.as_completed`, but only schedules as many of `aws` as
+        the current limit allows, so a large batch of work does not queue
+        thousands of tasks ahead of the provider. An async iterable is only
+        advanced when a slot frees up, so work can be streamed in.
+        """
+        if isinstance(aws, AsyncIterable):
+            iterator: Any = aws.__aiter__()
+
+            async def next_aw() -> Awaitable[Any]:
+                return await iterator.__anext__()
+
+        else:
+            iterator = iter(aws)
+
+            async def next_aw() -> Awaitable[Any]:
+                try:
+                    return next(iterator)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        pending: set[asyncio.Future] = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max(int(self.limit), 1):
+                    try:
+                        pending.add(asyncio.ensure_future(await next_aw()))
+                    except StopAsyncIteration:
+                        exhausted = True
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield future
+        finally:
+            for future in pending:
+                future.cancel()
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+            elif not isinstance(aws, AsyncIterable):
+                for aw in iterator:
+                    if asyncio.iscoroutine(aw):
+                        aw.close()
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        self._expire(now)
+        elapsed = max(min(now - self._started_at, self.WINDOW), 1e-6)
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "requests_per_second": round(len(self._completed) / elapsed, 2),
+            "tokens_per_second": round(
+                sum(tokens for _, tokens in self._completed) / elapsed, 1
+            ),
+            "rate_limit_events": self.rate_limit_events,
+        }
+
+
 class CompletionProvider(Provider):
     def __init__(self, config: CompletionConfig) -> None:
         if not isinstance(config, CompletionConfig):
@@ -47,7 +272,11 @@ class CompletionProvider(Provider):
         logger.info(f"Initializing CompletionProvider with config: {config}")
         super().__init__(config)
         self.config: CompletionConfig = config
-        self.semaphore = asyncio.Semaphore(config.concurrent_request_limit)
+        self.limiter = AdaptiveConcurrencyLimiter(
+            config.concurrent_request_limit,
+            initial_limit=config.initial_concurrency,
+            tokens_per_minute=config.tokens_per_minute,
+        )
         self.thread_pool = ThreadPoolExecutor(
             max_workers=config.concurrent_request_limit
         )
@@ -57,8 +286,12 @@ class CompletionProvider(Provider):
         backoff = self.config.initial_backoff
         while retries < self.config.max_retries:
             try:
-                async with self.semaphore:
-                    return await self._execute_task(task)
+                async with self.limiter.slot(
+                    self._estimate_tokens(task)
+                ) as slot:
+                    response = await self._execute_task(task)
+                    slot.used_tokens = self._used_tokens(response)
+                    return response
             except AuthenticationError as e:
                 raise
             except Exception as e:
@@ -77,10 +310,18 @@ class CompletionProvider(Provider):
         retries = 0
         backoff = self.config.initial_backoff
         while retries < self.config.max_retries:
+            started = False
             try:
-                async with self.semaphore:
-                    async for chunk in await self._execute_task(task):
-                        yield chunk
+                async with self.limiter.slot(self._estimate_tokens(task)):
+                    response = await self._execute_task(task)
+                    try:
+                        async for chunk in response:
+                            started = True
+                            yield chunk
+                    finally:
+                        # Runs on client disconnect (cancellation or
+                        # `aclose()`) as well, releasing the upstream socket
+                        await self._close_stream(response)
                 return  # Successful completion of the stream
             except AuthenticationError as e:
                 raise
@@ -88,12 +329,49 @@ class CompletionProvider(Provider):
                 logger.warning(
                     f"Streaming request failed (attempt {retries + 1}): {str(e)}"
                 )
+                # Chunks already sent downstream cannot be taken back, so a
+                # stream that fails part way through is not replayed
+                if started:
+                    raise
                 retries += 1
                 if retries == self.config.max_retries:
                     raise
                 await asyncio.sleep(random.uniform(0, backoff))
                 backoff = min(backoff * 2, self.config.max_backoff)
 
+    @staticmethod
+    def _estimate_tokens(task: dict[str, Any]) -> int:
+        """
+        Rough prompt size (four characters per token) plus the completion
+        budget, which is what providers count against tokens-per-minute.
+        """
+        prompt_chars = sum(
+            len(str(message.get("content") or ""))
+            for message in task.get("messages") or []
+        )
+        generation_config = task.get("generation_config")
+        max_tokens = (
+            getattr(generation_config, "max_tokens_to_sample", None) or 0
+        )
+        return prompt_chars // 4 + max_tokens
+
+    @staticmethod
+    def _used_tokens(response: Any) -> Optional[int]:
+        usage = getattr(response, "usage", None)
+        return getattr(usage, "total_tokens", None) if usage else None
+
+    @staticmethod
+    async def _close_stream(response: Any) -> None:
+        try:
+            if hasattr(response, "aclose"):
+                await response.aclose()
+            elif hasattr(response, "close"):
+                result = response.close()
+                if asyncio.iscoroutine(result):
+                    await result
+        except Exception as e:
+            logger.debug(f"Failed to close completion stream: {e}")
+
     def _execute_with_backoff_sync(self, task: dict[str, Any]):
         retries = 0
         backoff = self.config.initial_backoff
@@ -165,8 +443,11 @@ class CompletionProvider(Provider):
             "generation_config": generation_config,
             "kwargs": kwargs,
         }
-        async for chunk in self._execute_with_backoff_async_stream(task):
-            yield LLMChatCompletionChunk(**chunk.dict())
+        async with aclosing(
+            self._execute_with_backoff_async_stream(task)
+        ) as stream:
+            async for chunk in stream:
+                yield LLMChatCompletionChunk(**chunk.dict())
 
     def get_completion_stream(
         self,
@@ -0,0 +1,271 @@
+"""
+Benchmarks `by_description` entity deduplication on synthetic embeddings.
+
+The exact, all-pairs search runs in-process:
+
+    python -m core.examples.scripts.benchmark_entity_deduplication exact \
+        --sizes=10000,100000,1000000
+
+The ANN search runs against the Postgres database of an R2R config, in a
+scratch project schema that is dropped afterwards. For sizes up to
+`exact_limit` it also reports how many entities end up in the same cluster
+as with the exact search:
+
+    python -m core.examples.scripts.benchmark_entity_deduplication index \
+        --sizes=10000,100000,1000000
+"""
+
+import asyncio
+import os
+import resource
+import time
+import uuid
+from typing import Iterator, Optional
+
+import fire
+import numpy as np
+
+from core.base.abstractions import VectorTableName
+from core.pipes.kg.deduplication import (
+    cluster_by_cosine_distance,
+    cluster_by_nearest_neighbours,
+)
+
+
+def _parse_sizes(sizes) -> list[int]:
+    if isinstance(sizes, int):
+        return [sizes]
+    if isinstance(sizes, str):
+        sizes = sizes.split(",")
+    return [int(size) for size in sizes]
+
+
+def _peak_rss_mb() -> float:
+    # `ru_maxrss` is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_embeddings(
+    n: int,
+    dimension: int,
+    duplicate_rate: float = 0.2,
+    noise: float = 0.25,
+    seed: int = 0,
+    block_size: int = 100_000,
+) -> Iterator[np.ndarray]:
+    """
+    Yields `n` embeddings in blocks. Entities are noisy copies of
+    `n * (1 - duplicate_rate)` random directions, so copies of the same
+    direction lie about `noise**2 / (1 + noise**2)` apart in cosine distance
+    and unrelated ones about 1 apart.
+    """
+    rng = np.random.default_rng(seed)
+    num_bases = max(int(n * (1 - duplicate_rate)), 1)
+    base_seed = int(rng.integers(2**32))
+    for start in range(0, n, block_size):
+        size = min(block_size, n - start)
+        bases = rng.integers(num_bases, size=size)
+        block = np.empty((size, dimension), dtype=np.float32)
+        # Regenerate each base direction from its own seed, so the bases
+        # never have to be held in memory
+        for row, base in enumerate(bases):
+            block[row] = np.random.default_rng(
+                (base_seed, int(base))
+            ).standard_normal(dimension)
+        block += noise * rng.standard_normal(
+            (size, dimension), dtype=np.float32
+        )
+        yield block
+
+
+def _summary(labels: np.ndarray) -> str:
+    clusters = int(labels.max()) + 1 if len(labels) else 0
+    noise = int((labels == -1).sum())
+    return f"{clusters} clusters, {noise} unmerged"
+
+
+def _agreement(exact: np.ndarray, approximate: np.ndarray) -> float:
+    """Fraction of entities whose cluster has the same members in both."""
+    n = len(exact)
+    if not n:
+        return 1.0
+    # Unmerged entities are clusters of their own
+    rows = np.arange(n)
+    exact = np.where(exact == -1, -1 - rows, exact)
+    approximate = np.where(approximate == -1, -1 - rows, approximate)
+
+    def sizes(*labels: np.ndarray) -> np.ndarray:
+        _, inverse, counts = np.unique(
+            np.stack(labels, axis=1),
+            axis=0,
+            return_inverse=True,
+            return_counts=True,
+        )
+        return counts[inverse.reshape(-1)]
+
+    joint = sizes(exact, approximate)
+    agree = (joint == sizes(exact)) & (joint == sizes(approximate))
+    return float(agree.mean())
+
+
+def exact(
+    sizes="10000,100000,1000000",
+    dimension: int = 1536,
+    eps: float = 0.1,
+    block_size: int = 4096,
+    seed: int = 0,
+):
+    """
+    Times `cluster_by_cosine_distance` in-process. Holds the whole float32
+    matrix, e.g. 6 GB for 1M entities of dimension 1536.
+    """
+    for n in _parse_sizes(sizes):
+        embeddings = np.concatenate(
+            list(synthetic_embeddings(n, dimension, seed=seed))
+        )
+        start = time.perf_counter()
+        labels = cluster_by_cosine_distance(embeddings, eps, block_size)
+        elapsed = time.perf_counter() - start
+        print(
+            f"exact n={n} dim={dimension}: {elapsed:.1f}s, peak RSS {_peak_rss_mb():.0f} MB, {_summary(labels)}"
+        )
+        del embeddings
+
+
+async def _index(
+    sizes: list[int],
+    eps: float,
+    neighbours: int,
+    exact_limit: int,
+    insert_batch_size: int,
+    config_name: Optional[str],
+    config_path: Optional[str],
+    project_name: str,
+    seed: int,
+):
+    from core.main.assembly.factory import R2RProviderFactory
+    from core.main.config import R2RConfig
+
+    if config_name is None and config_path is None:
+        config_name = "default"
+    config = R2RConfig.load(config_name, config_path)
+    dimension = config.embedding.base_dimension
+
+    # The provider creates and uses the schema of the configured project
+    os.environ["R2R_PROJECT_NAME"] = project_name
+    factory = R2RProviderFactory(config)
+    database = await factory.create_database_provider(
+        config.database, factory.create_crypto_provider(config.crypto)
+    )
+    entity_table = f"{project_name}.document_entity"
+    try:
+        for n in sizes:
+            collection_id, document_id = uuid.uuid4(), uuid.uuid4()
+            await database.connection_manager.execute_query(
+                f"TRUNCATE {entity_table}; TRUNCATE {project_name}.document_info;"
+            )
+            await database.connection_manager.execute_query(
+                f"INSERT INTO {project_name}.document_info (document_id, collection_ids) VALUES ($1, $2)",
+                [document_id, [collection_id]],
+            )
+
+            start = time.perf_counter()
+            offset = 0
+            for block in synthetic_embeddings(n, dimension, seed=seed):
+                for batch in range(0, len(block), insert_batch_size):
+                    rows = block[batch : batch + insert_batch_size]
+                    await database.connection_manager.execute_query(
+                        f"""
+                        INSERT INTO {entity_table}
+                        (name, description, extraction_ids, description_embedding, document_id)
+                        SELECT 'entity ' || i, '', '{{}}', e::vector, $3
+                        FROM unnest($1::int[], $2::text[]) AS t(i, e)
+                        """,
+                        [
+                            list(range(offset, offset + len(rows))),
+                            [str(row.tolist()) for row in rows],
+                            document_id,
+                        ],
+                    )
+                    offset += len(rows)
+            await database.connection_manager.execute_query(
+                f"ANALYZE {entity_table}"
+            )
+            load_time = time.perf_counter() - start
+
+            for index in await database.list_indices(
+                VectorTableName.ENTITIES_DOCUMENT
+            ):
+                await database.delete_index(
+                    index["name"], VectorTableName.ENTITIES_DOCUMENT
+                )
+            start = time.perf_counter()
+            if not await database.create_vector_index():
+                raise ValueError(
+                    f"No index could be built for dimension {dimension}; see the log."
+                )
+            index_time = time.perf_counter() - start
+
+            entities, _ = await database.get_entity_embeddings(
+                collection_id, include_embeddings=False
+            )
+            entity_ids = np.fromiter(
+                (entity.id for entity in entities), np.int64, len(entities)
+            )
+            start = time.perf_counter()
+            labels = await cluster_by_nearest_neighbours(
+                database, collection_id, entity_ids, eps, neighbours
+            )
+            search_time = time.perf_counter() - start
+
+            report = (
+                f"index n={n} dim={dimension}: load {load_time:.1f}s, "
+                f"index build {index_time:.1f}s, search {search_time:.1f}s, "
+                f"{_summary(labels)}"
+            )
+            if n <= exact_limit:
+                _, embeddings = await database.get_entity_embeddings(
+                    collection_id
+                )
+                exact_labels = cluster_by_cosine_distance(embeddings, eps)
+                report += f", agreement with exact {_agreement(exact_labels, labels):.4f}"
+            print(report)
+    finally:
+        await database.connection_manager.execute_query(
+            f'DROP SCHEMA IF EXISTS "{project_name}" CASCADE'
+        )
+        await database.close()
+
+
+def index(
+    sizes="10000,100000,1000000",
+    eps: float = 0.1,
+    neighbours: int = 16,
+    exact_limit: int = 100_000,
+    insert_batch_size: int = 1000,
+    config_name: Optional[str] = None,
+    config_path: Optional[str] = None,
+    project_name: str = "dedup_benchmark",
+    seed: int = 0,
+):
+    """
+    Times `cluster_by_nearest_neighbours` against Postgres, including the
+    load and index build, at the dimension of the config's embeddings.
+    """
+    asyncio.run(
+        _index(
+            _parse_sizes(sizes),
+            eps,
+            neighbours,
+            exact_limit,
+            insert_batch_size,
+            config_name,
+            config_path,
+            project_name,
+            seed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    fire.Fire({"exact": exact, "index": index})
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import aclosing
 from pathlib import Path
 from typing import Any, Optional, Union
 from uuid import UUID
@@ -234,9 +235,12 @@ class RetrievalRouter(BaseRouter):
             if rag_generation_config.stream:
 
                 async def stream_generator():
-                    async for chunk in response:
-                        yield chunk
-                        await asyncio.sleep(0)
+                    # Closing `response` on disconnect cancels the upstream
+                    # LLM stream instead of letting it run to completion
+                    async with aclosing(response):
+                        async for chunk in response:
+                            yield chunk
+                            await asyncio.sleep(0)
 
                 return StreamingResponse(
                     stream_generator(), media_type="application/json"
@@ -326,10 +330,11 @@ class RetrievalRouter(BaseRouter):
 
                     async def stream_generator():
                         content = ""
-                        async for chunk in response:
-                            yield chunk
-                            content += chunk
-                            await asyncio.sleep(0)
+                        async with aclosing(response):
+                            async for chunk in response:
+                                yield chunk
+                                content += chunk
+                                await asyncio.sleep(0)
 
                     return StreamingResponse(
                         stream_generator(), media_type="application/json"
@@ -301,6 +301,9 @@ class R2RProviderFactory:
                 self.config.database, crypto_provider, *args, **kwargs
             )
         )
+        embedding_provider.attach_cache_store(
+            database_provider.embedding_cache_handler
+        )
 
         ingestion_provider = (
             ingestion_provider_override
@@ -35,30 +35,64 @@ def simple_ingestion_factory(service: IngestionService):
                 document_info, status=IngestionStatus.PARSING
             )
 
-            ingestion_config = parsed_data["ingestion_config"]
+            ingestion_config = dict(parsed_data["ingestion_config"])
+            streaming = ingestion_config.pop(
+                "streaming_ingestion",
+                service.providers.ingestion.config.streaming_ingestion,
+            )
             extractions_generator = await service.parse_file(
                 document_info, ingestion_config
             )
-            extractions = [
-                extraction.model_dump()
-                async for extraction in extractions_generator
-            ]
 
-            await service.update_document_status(
-                document_info, status=IngestionStatus.EMBEDDING
-            )
-            embedding_generator = await service.embed_document(extractions)
-            embeddings = [
-                embedding.model_dump()
-                async for embedding in embedding_generator
-            ]
+            if streaming:
+                # Parse, embed and store as one chain of bounded async
+                # generators, so only in-flight batches are held in memory
+                await service.update_document_status(
+                    document_info, status=IngestionStatus.EMBEDDING
+                )
+                embedding_generator = await service.embed_document(
+                    extractions_generator
+                )
 
-            await service.update_document_status(
-                document_info, status=IngestionStatus.STORING
-            )
-            storage_generator = await service.store_embeddings(embeddings)
-            async for _ in storage_generator:
-                pass
+                async def embeddings_to_store():
+                    # Embedding keeps running behind storage, so the
+                    # document moves to STORING once its first vector
+                    # reaches the storage pipe
+                    storing = False
+                    async for embedding in embedding_generator:
+                        if not storing:
+                            await service.update_document_status(
+                                document_info, status=IngestionStatus.STORING
+                            )
+                            storing = True
+                        yield embedding
+
+                storage_generator = await service.store_embeddings(
+                    embeddings_to_store()
+                )
+                async for _ in storage_generator:
+                    pass
+            else:
+                extractions = [
+                    extraction.model_dump()
+                    async for extraction in extractions_generator
+                ]
+
+                await service.update_document_status(
+                    document_info, status=IngestionStatus.EMBEDDING
+                )
+                embedding_generator = await service.embed_document(extractions)
+                embeddings = [
+                    embedding.model_dump()
+                    async for embedding in embedding_generator
+                ]
+
+                await service.update_document_status(
+                    document_info, status=IngestionStatus.STORING
+                )
+                storage_generator = await service.store_embeddings(embeddings)
+                async for _ in storage_generator:
+                    pass
 
             await service.finalize_ingestion(
                 document_info, is_update=is_update
@@ -223,14 +223,22 @@ class IngestionService(Service):
 
     async def embed_document(
         self,
-        chunked_documents: list[dict],
+        chunked_documents: Union[
+            list[dict], AsyncGenerator[DocumentExtraction, None]
+        ],
     ) -> AsyncGenerator[VectorEntry, None]:
+        # Generators are passed through untouched so that extractions are
+        # embedded as they are parsed instead of being materialized first
         return await self.pipes.embedding_pipe.run(
             input=self.pipes.embedding_pipe.Input(
-                message=[
-                    DocumentExtraction.from_dict(chunk)
-                    for chunk in chunked_documents
-                ]
+                message=(
+                    [
+                        DocumentExtraction.from_dict(chunk)
+                        for chunk in chunked_documents
+                    ]
+                    if isinstance(chunked_documents, list)
+                    else chunked_documents
+                )
             ),
             state=None,
             run_manager=self.run_manager,
@@ -238,16 +246,23 @@ class IngestionService(Service):
 
     async def store_embeddings(
         self,
-        embeddings: Sequence[Union[dict, VectorEntry]],
+        embeddings: Union[
+            Sequence[Union[dict, VectorEntry]],
+            AsyncGenerator[VectorEntry, None],
+        ],
     ) -> AsyncGenerator[str, None]:
-        vector_entries = [
-            (
-                embedding
-                if isinstance(embedding, VectorEntry)
-                else VectorEntry.from_dict(embedding)
-            )
-            for embedding in embeddings
-        ]
+        vector_entries = (
+            [
+                (
+                    embedding
+                    if isinstance(embedding, VectorEntry)
+                    else VectorEntry.from_dict(embedding)
+                )
+                for embedding in embeddings
+            ]
+            if isinstance(embeddings, Sequence)
+            else embeddings
+        )
 
         return await self.pipes.vector_storage_pipe.run(
             input=self.pipes.vector_storage_pipe.Input(message=vector_entries),
@@ -592,6 +607,12 @@ class IngestionService(Service):
 
         # embed and store the enriched chunk
         await self.providers.database.upsert_entries(new_vector_entries)
+        try:
+            await self.providers.database.refresh_document_search_index(
+                [document_id]
+            )
+        except Exception as e:
+            logger.error(f"Failed to refresh document search index: {e}")
 
         return len(new_vector_entries)
 
@@ -628,6 +649,12 @@ class IngestionService(Service):
         await self.providers.database.upsert_documents_overview(
             existing_document  # type: ignore
         )
+        try:
+            await self.providers.database.refresh_document_search_index(
+                [document_id]
+            )
+        except Exception as e:
+            logger.error(f"Failed to refresh document search index: {e}")
 
 
 class IngestionServiceAdapter:
@@ -1,5 +1,4 @@
 import logging
-import math
 import time
 from typing import AsyncGenerator, Optional
 from uuid import UUID
@@ -165,39 +164,24 @@ class KgService(Service):
             f"KGService: Found {entity_count} entities in document {document_id}"
         )
 
-        # TODO - Do not hardcode the batch size,
+        # TODO - Do not hardcode the page size,
         # make it a configurable parameter at runtime & server-side defaults
 
-        # process 256 entities at a time
-        num_batches = math.ceil(entity_count / 256)
-        logger.info(
-            f"Calling `kg_entity_description` on document {document_id} with an entity count of {entity_count} and total batches of {num_batches}"
+        # entities are streamed in keyset-paginated pages of 256
+        node_descriptions = await self.pipes.kg_entity_description_pipe.run(
+            input=self.pipes.kg_entity_description_pipe.Input(
+                message={
+                    "batch_size": 256,
+                    "max_description_input_length": max_description_input_length,
+                    "document_id": document_id,
+                    "logger": logger,
+                }
+            ),
+            state=None,
+            run_manager=self.run_manager,
         )
-        all_results = []
-        for i in range(num_batches):
-            logger.info(
-                f"KGService: Running kg_entity_description for batch {i+1}/{num_batches} for document {document_id}"
-            )
-
-            node_descriptions = await self.pipes.kg_entity_description_pipe.run(
-                input=self.pipes.kg_entity_description_pipe.Input(
-                    message={
-                        "offset": i * 256,
-                        "limit": 256,
-                        "max_description_input_length": max_description_input_length,
-                        "document_id": document_id,
-                        "logger": logger,
-                    }
-                ),
-                state=None,
-                run_manager=self.run_manager,
-            )
 
-            all_results.append(await _collect_results(node_descriptions))
-
-            logger.info(
-                f"KGService: Completed kg_entity_description for batch {i+1}/{num_batches} for document {document_id}"
-            )
+        all_results = await _collect_results(node_descriptions)
 
         await self.providers.database.set_workflow_status(
             id=document_id,
@@ -223,6 +207,10 @@ class KgService(Service):
         logger.info(
             f"Running ClusteringPipe for collection {collection_id} with settings {leiden_params}"
         )
+        # a new enrichment run starts with a fresh summary token budget
+        await self.providers.database.reset_community_summary_tokens(
+            collection_id
+        )
         clustering_result = await self.pipes.kg_clustering_pipe.run(
             input=self.pipes.kg_clustering_pipe.Input(
                 message={
@@ -235,7 +223,11 @@ class KgService(Service):
             state=None,
             run_manager=self.run_manager,
         )
-        return await _collect_results(clustering_result)
+        clustering_results = await _collect_results(clustering_result)
+        # entity and community searches need ANN indices once the graph
+        # exists; creating them is best effort and never fails clustering
+        await self.providers.database.create_vector_index()
+        return clustering_results
 
     @telemetry_event("kg_community_summary")
     async def kg_community_summary(
@@ -245,6 +237,7 @@ class KgService(Service):
         max_summary_input_length: int,
         generation_config: GenerationConfig,
         collection_id: UUID,
+        community_summary_token_budget: Optional[int] = None,
         **kwargs,
     ):
         summary_results = await self.pipes.kg_community_summary_pipe.run(
@@ -255,6 +248,7 @@ class KgService(Service):
                     "generation_config": generation_config,
                     "max_summary_input_length": max_summary_input_length,
                     "collection_id": collection_id,
+                    "token_budget": community_summary_token_budget,
                     "logger": logger,
                 }
             ),
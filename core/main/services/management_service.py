@@ -1,5 +1,4 @@
 import logging
-import os
 from collections import defaultdict
 from importlib.metadata import version as get_version
 from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
@@ -199,7 +198,7 @@ class ManagementService(Service):
         return {
             "config": config_dict,
             "prompts": prompts,
-            "r2r_project_name": os.environ["R2R_PROJECT_NAME"],
+            "r2r_project_name": self.providers.database.project_name,
             # "r2r_version": get_version("r2r"),
         }
 
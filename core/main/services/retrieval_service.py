@@ -1,6 +1,7 @@
 import json
 import logging
 import time
+from contextlib import aclosing
 from typing import Optional
 from uuid import UUID
 from fastapi import HTTPException
@@ -234,13 +235,14 @@ class RetrievalService(Service):
                     **kwargs,
                 }
 
-                async for (
-                    chunk
-                ) in await self.pipelines.streaming_rag_pipeline.run(
-                    *args,
-                    **merged_kwargs,
-                ):
-                    yield chunk
+                async with aclosing(
+                    await self.pipelines.streaming_rag_pipeline.run(
+                        *args,
+                        **merged_kwargs,
+                    )
+                ) as stream:
+                    async for chunk in stream:
+                        yield chunk
 
         return stream_response()
 
@@ -357,17 +359,20 @@ class RetrievalService(Service):
                                 config=self.config.agent,
                                 search_pipeline=self.pipelines.search_pipeline,
                             )
-                            async for chunk in agent.arun(
-                                messages=messages,
-                                system_instruction=task_prompt_override,
-                                vector_search_settings=vector_search_settings,
-                                kg_search_settings=kg_search_settings,
-                                rag_generation_config=rag_generation_config,
-                                include_title_if_available=include_title_if_available,
-                                *args,
-                                **kwargs,
-                            ):
-                                yield chunk
+                            async with aclosing(
+                                agent.arun(
+                                    messages=messages,
+                                    system_instruction=task_prompt_override,
+                                    vector_search_settings=vector_search_settings,
+                                    kg_search_settings=kg_search_settings,
+                                    rag_generation_config=rag_generation_config,
+                                    include_title_if_available=include_title_if_available,
+                                    *args,
+                                    **kwargs,
+                                )
+                            ) as stream:
+                                async for chunk in stream:
+                                    yield chunk
 
                     return stream_response()
 
@@ -1,6 +1,8 @@
 import asyncio
+import json
 import logging
-from typing import Any, AsyncGenerator, Optional, Union
+import time
+from typing import Any, AsyncGenerator, AsyncIterator, Optional, Union
 
 from core.base import (
     AsyncState,
@@ -11,18 +13,52 @@ from core.base import (
     VectorEntry,
 )
 from core.base.pipes.base_pipe import AsyncPipe
+from core.base.utils import to_async_generator
 from core.providers.logger.r2r_logger import SqlitePersistentLoggingProvider
 
 logger = logging.getLogger()
 
 
+class TokenBudget:
+    """
+    Additive-increase / multiplicative-decrease controller for the number of
+    tokens packed into a single embedding request.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        target_latency: float,
+        min_tokens: int = 512,
+    ):
+        self.max_tokens = max_tokens
+        self.min_tokens = min(min_tokens, max_tokens)
+        self.target_latency = target_latency
+        self.tokens = max_tokens
+
+    def observe(self, latency: float, rate_limited: bool) -> None:
+        if rate_limited:
+            self.tokens = max(self.min_tokens, self.tokens // 2)
+        elif latency > self.target_latency:
+            self.tokens = max(self.min_tokens, int(self.tokens * 0.75))
+        else:
+            self.tokens = min(
+                self.max_tokens, self.tokens + max(self.max_tokens // 10, 1)
+            )
+
+
 class EmbeddingPipe(AsyncPipe[VectorEntry]):
     """
     Embeds extractions using a specified embedding model.
     """
 
+    # Upper bound on inputs per request accepted by OpenAI-compatible APIs
+    MAX_BATCH_ITEMS = 2048
+
     class Input(AsyncPipe.Input):
-        message: list[DocumentExtraction]
+        message: Union[
+            list[DocumentExtraction], AsyncGenerator[DocumentExtraction, None]
+        ]
 
     def __init__(
         self,
@@ -39,6 +75,15 @@ class EmbeddingPipe(AsyncPipe[VectorEntry]):
         )
         self.embedding_provider = embedding_provider
         self.embedding_batch_size = embedding_batch_size
+        max_tokens = embedding_provider.config.max_tokens_per_batch
+        self.token_budget = (
+            TokenBudget(
+                max_tokens,
+                embedding_provider.config.target_batch_latency,
+            )
+            if max_tokens
+            else None
+        )
 
     async def embed(
         self, extractions: list[DocumentExtraction]
@@ -67,6 +112,78 @@ class EmbeddingPipe(AsyncPipe[VectorEntry]):
             for raw_vector, extraction in zip(vectors, extraction_batch)
         ]
 
+    async def _batches(
+        self,
+        extractions: Union[
+            list[DocumentExtraction], AsyncGenerator[DocumentExtraction, None]
+        ],
+    ) -> AsyncIterator[list[DocumentExtraction]]:
+        """
+        Yields fixed-size batches, or batches packed up to the current token
+        budget when `max_tokens_per_batch` is configured. Async generator
+        inputs are consumed lazily, one batch at a time.
+        """
+        batch: list[DocumentExtraction] = []
+        batch_tokens = 0
+        async for extraction in (
+            to_async_generator(extractions)
+            if isinstance(extractions, list)
+            else extractions
+        ):
+            if self.token_budget is None:
+                batch.append(extraction)
+                if len(batch) >= self.embedding_batch_size:
+                    yield batch
+                    batch = []
+                continue
+
+            tokens = self.embedding_provider.count_tokens(
+                extraction.data  # type: ignore
+            )
+            if batch and (
+                batch_tokens + tokens > self.token_budget.tokens
+                or len(batch) >= self.MAX_BATCH_ITEMS
+            ):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(extraction)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    async def _timed_process_batch(
+        self, extraction_batch: list[DocumentExtraction], run_id: Any
+    ) -> list[VectorEntry]:
+        start = time.perf_counter()
+        # Batches run concurrently, so only count this batch's rate limits
+        with self.embedding_provider.track_rate_limits() as rate_limits:
+            vector_entries = await self._process_batch(extraction_batch)
+        latency = time.perf_counter() - start
+        rate_limited = rate_limits.events > 0
+
+        if self.token_budget is not None:
+            self.token_budget.observe(latency, rate_limited)
+        logger.debug(
+            f"Embedded batch of {len(extraction_batch)} extractions in {latency:.3f}s"
+        )
+        await self.enqueue_log(
+            run_id=run_id,
+            key="embedding_batch",
+            value=json.dumps(
+                {
+                    "size": len(extraction_batch),
+                    "latency": round(latency, 4),
+                    "rate_limited": rate_limited,
+                    "token_budget": (
+                        self.token_budget.tokens
+                        if self.token_budget is not None
+                        else None
+                    ),
+                }
+            ),
+        )
+        return vector_entries
+
     async def _run_logic(  # type: ignore
         self,
         input: AsyncPipe.Input,
@@ -79,25 +196,17 @@ class EmbeddingPipe(AsyncPipe[VectorEntry]):
             raise ValueError(
                 f"Invalid input type for embedding pipe: {type(input)}"
             )
-        extraction_batch = []
-        batch_size = self.embedding_batch_size
         concurrent_limit = (
             self.embedding_provider.config.concurrent_request_limit
         )
         tasks = set()
 
         async def process_batch(batch):
-            return await self._process_batch(batch)
+            return await self._timed_process_batch(batch, run_id)
 
         try:
-            for item in input.message:
-                extraction_batch.append(item)
-
-                if len(extraction_batch) >= batch_size:
-                    tasks.add(
-                        asyncio.create_task(process_batch(extraction_batch))
-                    )
-                    extraction_batch = []
+            async for extraction_batch in self._batches(input.message):
+                tasks.add(asyncio.create_task(process_batch(extraction_batch)))
 
                 while len(tasks) >= concurrent_limit:
                     done, tasks = await asyncio.wait(
@@ -107,8 +216,13 @@ class EmbeddingPipe(AsyncPipe[VectorEntry]):
                         for vector_entry in await task:
                             yield vector_entry
 
-            if extraction_batch:
-                tasks.add(asyncio.create_task(process_batch(extraction_batch)))
+                # Hand finished batches downstream right away so streamed
+                # results are not held until the concurrency limit is hit
+                done = {task for task in tasks if task.done()}
+                tasks -= done
+                for task in done:
+                    for vector_entry in await task:
+                        yield vector_entry
 
             for future_task in asyncio.as_completed(tasks):
                 for vector_entry in await future_task:
@@ -1,9 +1,10 @@
 import logging
-from typing import Any, AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional, Union
 from uuid import UUID
 
 from core.base import AsyncState, DatabaseProvider, StorageResult, VectorEntry
 from core.base.pipes.base_pipe import AsyncPipe
+from core.base.utils import to_async_generator
 from core.providers.logger.r2r_logger import SqlitePersistentLoggingProvider
 
 logger = logging.getLogger()
@@ -11,7 +12,7 @@ logger = logging.getLogger()
 
 class VectorStoragePipe(AsyncPipe[StorageResult]):
     class Input(AsyncPipe.Input):
-        message: list[VectorEntry]
+        message: Union[list[VectorEntry], AsyncGenerator[VectorEntry, None]]
 
     def __init__(
         self,
@@ -19,6 +20,8 @@ class VectorStoragePipe(AsyncPipe[StorageResult]):
         config: AsyncPipe.PipeConfig,
         logging_provider: SqlitePersistentLoggingProvider,
         storage_batch_size: int = 128,
+        bulk_upsert_threshold: int = 1024,
+        bulk_batch_size: int = 8192,
         *args,
         **kwargs,
     ):
@@ -33,17 +36,25 @@ class VectorStoragePipe(AsyncPipe[StorageResult]):
         )
         self.database_provider = database_provider
         self.storage_batch_size = storage_batch_size
+        self.bulk_upsert_threshold = bulk_upsert_threshold
+        self.bulk_batch_size = bulk_batch_size
 
     async def store(
         self,
         vector_entries: list[VectorEntry],
+        bulk: bool = False,
     ) -> None:
         """
         Stores a batch of vector entries in the database.
         """
 
         try:
-            await self.database_provider.upsert_entries(vector_entries)
+            if bulk:
+                await self.database_provider.upsert_entries_bulk(
+                    vector_entries
+                )
+            else:
+                await self.database_provider.upsert_entries(vector_entries)
         except Exception as e:
             error_message = (
                 f"Failed to store vector entries in the database: {e}"
@@ -61,26 +72,53 @@ class VectorStoragePipe(AsyncPipe[StorageResult]):
     ) -> AsyncGenerator[StorageResult, None]:
         vector_batch = []
         document_counts: dict[UUID, int] = {}
+        streaming = not isinstance(input.message, list)
 
-        for msg in input.message:
+        # Large inputs go through the COPY-based bulk loader. A stream's size
+        # is unknown up front, so it switches over once it crosses the
+        # threshold and keeps batches at that size to bound memory.
+        bulk = (
+            not streaming and len(input.message) >= self.bulk_upsert_threshold
+        )
+        batch_size = (
+            self.bulk_batch_size if bulk else self.storage_batch_size
+        )
+        seen = 0
+
+        async for msg in (
+            to_async_generator(input.message)
+            if isinstance(input.message, list)
+            else input.message
+        ):
             vector_batch.append(msg)
+            seen += 1
             document_counts[msg.document_id] = (
                 document_counts.get(msg.document_id, 0) + 1
             )
+            if streaming and not bulk and seen >= self.bulk_upsert_threshold:
+                bulk = True
+                batch_size = self.bulk_upsert_threshold
 
-            if len(vector_batch) >= self.storage_batch_size:
+            if len(vector_batch) >= batch_size:
                 try:
-                    await self.store(vector_batch)
+                    await self.store(vector_batch, bulk=bulk)
                 except Exception as e:
                     logger.error(f"Failed to store vector batch: {e}")
                 vector_batch.clear()
 
         if vector_batch:
             try:
-                await self.store(vector_batch)
+                await self.store(vector_batch, bulk=bulk)
             except Exception as e:
                 logger.error(f"Failed to store final vector batch: {e}")
 
+        try:
+            await self.database_provider.refresh_document_search_index(
+                list(document_counts.keys())
+            )
+        except Exception as e:
+            logger.error(f"Failed to refresh document search index: {e}")
+
         for document_id, count in document_counts.items():
             logger.info(
                 f"Successful ingestion for document_id: {document_id}, with vector count: {count}"
@@ -1,9 +1,8 @@
-import asyncio
 import json
 import logging
 import random
 import time
-from typing import Any, AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Awaitable
 from uuid import UUID
 
 from core.base import (
@@ -126,10 +125,25 @@ class KGCommunitySummaryPipe(AsyncPipe):
 
         return prompt
 
+    @staticmethod
+    def _estimate_tokens(
+        prompt: str, generation_config: GenerationConfig
+    ) -> int:
+        # four characters per token, plus the completion budget
+        return len(prompt) // 4 + (generation_config.max_tokens_to_sample or 0)
+
+    @staticmethod
+    async def _reserved_job(
+        job: Awaitable[dict], estimate: int
+    ) -> tuple[dict, int]:
+        # pairs a summary with its token estimate, released on completion
+        return await job, estimate
+
     async def process_community(
         self,
         community_number: int,
-        max_summary_input_length: int,
+        community_level: int,
+        prompt: str,
         generation_config: GenerationConfig,
         collection_id: UUID,
     ) -> dict:
@@ -137,41 +151,21 @@ class KGCommunitySummaryPipe(AsyncPipe):
         Process a community by summarizing it and creating a summary embedding and storing it to a database.
         """
 
-        community_level, entities, triples = (
-            await self.database_provider.get_community_details(
-                community_number=community_number,
-                collection_id=collection_id,
-            )
-        )
-
-        if entities == [] and triples == []:
-            raise ValueError(
-                f"Community {community_number} has no entities or triples."
-            )
-
+        tokens_used = 0
         for attempt in range(3):
 
-            description = (
-                (
-                    await self.llm_provider.aget_completion(
-                        messages=await self.database_provider.prompt_handler.get_message_payload(
-                            task_prompt_name=self.database_provider.config.kg_enrichment_settings.community_reports_prompt,
-                            task_inputs={
-                                "input_text": (
-                                    await self.community_summary_prompt(
-                                        entities,
-                                        triples,
-                                        max_summary_input_length,
-                                    )
-                                ),
-                            },
-                        ),
-                        generation_config=generation_config,
-                    )
-                )
-                .choices[0]
-                .message.content
+            response = await self.llm_provider.aget_completion(
+                messages=await self.database_provider.prompt_handler.get_message_payload(
+                    task_prompt_name=self.database_provider.config.kg_enrichment_settings.community_reports_prompt,
+                    task_inputs={"input_text": prompt},
+                ),
+                generation_config=generation_config,
             )
+            usage = getattr(response, "usage", None)
+            tokens_used += getattr(
+                usage, "total_tokens", None
+            ) or self._estimate_tokens(prompt, generation_config)
+            description = response.choices[0].message.content
 
             try:
                 if description and description.startswith("```json"):
@@ -198,6 +192,7 @@ class KGCommunitySummaryPipe(AsyncPipe):
                     return {
                         "community_number": community_number,
                         "error": str(e),
+                        "tokens_used": tokens_used,
                     }
 
         community_report = CommunityReport(
@@ -222,6 +217,7 @@ class KGCommunitySummaryPipe(AsyncPipe):
         return {
             "community_number": community_report.community_number,
             "name": community_report.name,
+            "tokens_used": tokens_used,
         }
 
     async def _run_logic(  # type: ignore
@@ -234,6 +230,16 @@ class KGCommunitySummaryPipe(AsyncPipe):
     ) -> AsyncGenerator[dict, None]:
         """
         Executes the KG community summary pipe: summarizing communities.
+
+        The communities without a report in this window are prefetched in
+        a few queries and summarized coarsest level first, largest first.
+        Windows are ranked over the whole collection, so when they run in
+        order, as in the simple workflow, a run cut short by the token
+        budget still covers the top of the hierarchy. Windows run in
+        parallel, as in the hatchet workflow, share the budget on a first
+        come basis. Token spend is recorded per collection, and every report
+        is stored as soon as it is generated, so an interrupted run resumes
+        from there.
         """
 
         start_time = time.time()
@@ -243,44 +249,72 @@ class KGCommunitySummaryPipe(AsyncPipe):
         generation_config = input.message["generation_config"]
         max_summary_input_length = input.message["max_summary_input_length"]
         collection_id = input.message["collection_id"]
-        community_summary_jobs = []
+        token_budget = input.message.get("token_budget")
         logger = input.message.get("logger", logging.getLogger())
 
-        # check which community summaries exist and don't run them again
-        logger.info(
-            f"KGCommunitySummaryPipe: Checking if community summaries exist for communities {offset} to {offset + limit}"
-        )
-        community_numbers_exist = (
-            await self.database_provider.check_community_reports_exist(
+        communities = (
+            await self.database_provider.get_pending_community_details(
                 collection_id=collection_id, offset=offset, limit=limit
             )
         )
-
         logger.info(
-            f"KGCommunitySummaryPipe: Community summaries exist for communities {len(community_numbers_exist)}"
+            f"KGCommunitySummaryPipe: {len(communities)} communities ranked {offset} to {offset + limit} have no summary yet, prefetched in {time.time() - start_time:.2f} seconds"
         )
 
-        for community_number in range(offset, offset + limit):
-            if community_number not in community_numbers_exist:
-                community_summary_jobs.append(
+        tokens_used = (
+            await self.database_provider.add_community_summary_tokens(
+                collection_id, 0
+            )
+        )
+        # estimated tokens of the summaries in flight
+        tokens_reserved = 0
+        deferred_jobs = 0
+
+        async def community_summary_jobs():
+            nonlocal tokens_reserved, deferred_jobs
+            for index, (number, level, entities, triples) in enumerate(
+                communities
+            ):
+                prompt = await self.community_summary_prompt(
+                    entities, triples, max_summary_input_length
+                )
+                estimate = self._estimate_tokens(prompt, generation_config)
+                if (
+                    token_budget is not None
+                    and tokens_used + tokens_reserved + estimate > token_budget
+                ):
+                    deferred_jobs = len(communities) - index
+                    return
+                tokens_reserved += estimate
+                yield self._reserved_job(
                     self.process_community(
-                        community_number=community_number,
-                        max_summary_input_length=max_summary_input_length,
+                        community_number=number,
+                        community_level=level,
+                        prompt=prompt,
                         generation_config=generation_config,
                         collection_id=collection_id,
-                    )
+                    ),
+                    estimate,
                 )
 
-        total_jobs = len(community_summary_jobs)
+        total_jobs = len(communities)
         total_errors = 0
         completed_community_summary_jobs = 0
-        for community_summary in asyncio.as_completed(community_summary_jobs):
+        async for community_summary in self.llm_provider.limiter.as_completed(
+            community_summary_jobs()
+        ):
 
-            summary = await community_summary
+            summary, estimate = await community_summary
+            tokens_reserved -= estimate
+            tokens_used = (
+                await self.database_provider.add_community_summary_tokens(
+                    collection_id, summary["tokens_used"]
+                )
+            )
             completed_community_summary_jobs += 1
             if completed_community_summary_jobs % 50 == 0:
                 logger.info(
-                    f"KGCommunitySummaryPipe: {completed_community_summary_jobs}/{total_jobs} community summaries completed, elapsed time: {time.time() - start_time:.2f} seconds"
+                    f"KGCommunitySummaryPipe: {completed_community_summary_jobs}/{total_jobs} community summaries completed, {tokens_used} tokens used, elapsed time: {time.time() - start_time:.2f} seconds, LLM throughput: {self.llm_provider.limiter.stats()}"
                 )
 
             if "error" in summary:
@@ -292,6 +326,11 @@ class KGCommunitySummaryPipe(AsyncPipe):
 
             yield summary
 
+        if deferred_jobs:
+            logger.warning(
+                f"KGCommunitySummaryPipe: Token budget of {token_budget} reached after {tokens_used} tokens, {deferred_jobs} communities are left for the next run."
+            )
+
         if total_errors > 0:
             raise ValueError(
                 f"KGCommunitySummaryPipe: Failed to generate community summaries for {total_errors} out of {total_jobs} communities. Please rerun the job if there are too many failures."
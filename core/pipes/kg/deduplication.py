@@ -1,11 +1,18 @@
-import json
+import asyncio
 import logging
+import time
 from typing import Any, Union
 from uuid import UUID
+
+import numpy as np
 from fastapi import HTTPException
 
 from core.base import AsyncState
-from core.base.abstractions import Entity, KGEntityDeduplicationType
+from core.base.abstractions import (
+    Entity,
+    KGEntityDeduplicationType,
+    VectorTableName,
+)
 from core.base.pipes import AsyncPipe
 from core.providers import (
     LiteLLMCompletionProvider,
@@ -20,6 +27,152 @@ from core.providers.logger.r2r_logger import SqlitePersistentLoggingProvider
 logger = logging.getLogger()
 
 
+def _compress(parent: np.ndarray) -> None:
+    # Point every node of the union-find forest straight at its root
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            return
+        parent[:] = grandparent
+
+
+def _union_pairs(parent: np.ndarray, a: np.ndarray, b: np.ndarray) -> None:
+    """
+    Merges the sets of every pair `(a[i], b[i])` of a union-find forest in
+    which each node's parent is never above the node, one vectorized round
+    per chain of merges rather than one Python call per pair.
+    """
+    while len(a):
+        _compress(parent)
+        root_a, root_b = parent[a], parent[b]
+        apart = root_a != root_b
+        if not apart.any():
+            return
+        a, b = a[apart], b[apart]
+        root_a, root_b = root_a[apart], root_b[apart]
+        # Link each root to the smallest root paired with it; roots whose
+        # link lost to another pair's are merged in the next round
+        np.minimum.at(
+            parent,
+            np.maximum(root_a, root_b),
+            np.minimum(root_a, root_b),
+        )
+
+
+def _labels_from_forest(parent: np.ndarray) -> np.ndarray:
+    # Singleton sets are noise (-1); the others are renumbered from zero
+    _compress(parent)
+    labels = np.full(len(parent), -1, dtype=np.int64)
+    _, inverse, counts = np.unique(
+        parent, return_inverse=True, return_counts=True
+    )
+    clustered = counts[inverse] > 1
+    cluster_ids = np.cumsum(counts > 1) - 1
+    labels[clustered] = cluster_ids[inverse[clustered]]
+    return labels
+
+
+def cluster_by_cosine_distance(
+    embeddings: np.ndarray, eps: float, block_size: int = 4096
+) -> np.ndarray:
+    """
+    Labels rows whose cosine distance is within `eps` of each other,
+    transitively, using union-find over neighbour pairs found with blocked
+    matrix products. Matches `DBSCAN(eps, min_samples=2, metric="cosine")`:
+    rows without any neighbour are labelled -1. Normalizes `embeddings` in
+    place.
+
+    The search is exact and compares every pair, so its cost grows with the
+    square of the row count; see `cluster_by_nearest_neighbours` for large
+    collections.
+    """
+    n = len(embeddings)
+    parent = np.arange(n, dtype=np.int64)
+    if n < 2:
+        return _labels_from_forest(parent)
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    embeddings /= norms
+    threshold = np.float32(1.0 - eps)
+
+    for start in range(0, n, block_size):
+        block = embeddings[start : start + block_size]
+        block_rows, block_cols = [], []
+        # Only the upper triangle is needed, the relation is symmetric
+        for other in range(start, n, block_size):
+            similarities = block @ embeddings[other : other + block_size].T
+            rows, cols = np.nonzero(similarities >= threshold)
+            rows += start
+            cols += other
+            upper = rows < cols
+            block_rows.append(rows[upper])
+            block_cols.append(cols[upper])
+        _union_pairs(
+            parent, np.concatenate(block_rows), np.concatenate(block_cols)
+        )
+
+    return _labels_from_forest(parent)
+
+
+async def cluster_by_nearest_neighbours(
+    database_provider: PostgresDBProvider,
+    collection_id: UUID,
+    entity_ids: np.ndarray,
+    eps: float,
+    neighbours: int = 16,
+    batch_size: int = 1000,
+    concurrency: int = 4,
+) -> np.ndarray:
+    """
+    Labels entities like `cluster_by_cosine_distance`, taking the candidate
+    pairs from the ANN index on `description_embedding` instead of
+    comparing every pair, so neither the embeddings nor a quadratic search
+    are needed. Only the `neighbours` nearest entities of each entity are
+    considered, so merges through denser neighbourhoods can be missed.
+
+    Args:
+        entity_ids (np.ndarray): Sorted ids of the entities to label.
+    """
+    n = len(entity_ids)
+    parent = np.arange(n, dtype=np.int64)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def neighbours_of(batch: list[int]) -> list[tuple[int, int]]:
+        async with semaphore:
+            return await database_provider.get_entity_neighbours(
+                collection_id, batch, eps, neighbours
+            )
+
+    def union(pending: list[np.ndarray]) -> None:
+        pairs = np.concatenate(pending)
+        rows = np.searchsorted(entity_ids, pairs)
+        # Drop neighbours that are not among `entity_ids`, e.g. added since
+        known = (entity_ids[np.minimum(rows, n - 1)] == pairs).all(axis=1)
+        _union_pairs(parent, rows[known, 0], rows[known, 1])
+
+    pending: list[np.ndarray] = []
+    pending_pairs = 0
+    for batch_pairs in asyncio.as_completed(
+        [
+            neighbours_of(entity_ids[start : start + batch_size].tolist())
+            for start in range(0, n, batch_size)
+        ]
+    ):
+        pairs = await batch_pairs
+        if pairs:
+            pending.append(np.asarray(pairs, dtype=np.int64))
+            pending_pairs += len(pairs)
+        # Merge in rounds so the pairs held in memory stay around `n`
+        if pending_pairs >= n:
+            union(pending)
+            pending, pending_pairs = [], 0
+    if pending:
+        union(pending)
+
+    return _labels_from_forest(parent)
+
+
 class KGEntityDeduplicationPipe(AsyncPipe):
     def __init__(
         self,
@@ -140,59 +293,62 @@ class KGEntityDeduplicationPipe(AsyncPipe):
             )
 
     async def kg_description_entity_deduplication(
-        self, collection_id: UUID, **kwargs
+        self,
+        collection_id: UUID,
+        description_similarity_eps: float = 0.1,
+        deduplication_block_size: int = 4096,
+        deduplication_ann_threshold: int = 50_000,
+        deduplication_ann_neighbours: int = 16,
+        **kwargs,
     ):
-        from sklearn.cluster import DBSCAN
-
-        entities = (
-            await self.database_provider.get_entities(
+        use_index = await self._use_description_index(
+            collection_id, deduplication_ann_threshold
+        )
+        entities, embeddings = (
+            await self.database_provider.get_entity_embeddings(
                 collection_id=collection_id,
-                offset=0,
-                limit=-1,
-                extra_columns=["description_embedding"],
-            )
-        )["entities"]
-
-        for entity in entities:
-            entity.description_embedding = json.loads(
-                entity.description_embedding
+                include_embeddings=not use_index,
             )
+        )
 
         logger.info(
             f"KGEntityDeduplicationPipe: Got {len(entities)} entities for collection {collection_id}"
         )
 
-        deduplication_source_keys = [
-            "extraction_ids",
-            "document_id",
-            "attributes",
-        ]
-        deduplication_target_keys = [
-            "extraction_ids",
-            "document_ids",
-            "attributes",
-        ]
-
-        deduplication_keys = list(
-            zip(deduplication_source_keys, deduplication_target_keys)
-        )
-
-        embeddings = [entity.description_embedding for entity in entities]
-
-        logger.info(
-            f"KGEntityDeduplicationPipe: Running DBSCAN clustering on {len(embeddings)} embeddings"
-        )
-        # TODO: make eps a config, make it very strict for now
-        clustering = DBSCAN(eps=0.1, min_samples=2, metric="cosine").fit(
-            embeddings
-        )
-        labels = clustering.labels_
+        start_time = time.time()
+        if use_index:
+            logger.info(
+                f"KGEntityDeduplicationPipe: Clustering {len(entities)} entities with eps={description_similarity_eps} over their {deduplication_ann_neighbours} nearest neighbours"
+            )
+            labels = await cluster_by_nearest_neighbours(
+                self.database_provider,
+                collection_id,
+                np.fromiter(
+                    (entity.id for entity in entities),
+                    np.int64,
+                    len(entities),
+                ),
+                description_similarity_eps,
+                deduplication_ann_neighbours,
+            )
+        else:
+            logger.info(
+                f"KGEntityDeduplicationPipe: Clustering {len(entities)} embeddings with eps={description_similarity_eps}, block size {deduplication_block_size}"
+            )
+            # The blocked search is CPU bound, so keep it off the event loop
+            labels = await asyncio.to_thread(
+                cluster_by_cosine_distance,
+                embeddings,
+                description_similarity_eps,
+                deduplication_block_size,
+            )
+        del embeddings
 
         # Log clustering results
-        n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-        n_noise = list(labels).count(-1)
+        n_clusters = int(labels.max()) + 1 if len(labels) else 0
+        n_noise = int((labels == -1).sum())
         logger.info(
-            f"KGEntityDeduplicationPipe: Found {n_clusters} clusters and {n_noise} noise points"
+            f"KGEntityDeduplicationPipe: Found {n_clusters} clusters and {n_noise} noise points in {time.time() - start_time:.2f} seconds"
         )
 
         # for all labels in the same cluster, we can deduplicate them by name
@@ -257,6 +413,32 @@ class KGEntityDeduplicationPipe(AsyncPipe):
             "num_entities": len(deduplicated_entities),
         }
 
+    async def _use_description_index(
+        self, collection_id: UUID, threshold: int
+    ) -> bool:
+        """
+        Whether to find candidate pairs through the ANN index rather than
+        comparing every pair: only above `threshold` entities, and only if
+        a cosine index, the one `get_entity_neighbours` can use, exists.
+        """
+        if threshold <= 0:
+            return False
+        entity_count = await self.database_provider.get_entity_count(
+            collection_id=collection_id
+        )
+        if entity_count <= threshold:
+            return False
+
+        indices = await self.database_provider.list_indices(
+            VectorTableName.ENTITIES_DOCUMENT
+        )
+        if any("_cosine_ops" in index["definition"] for index in indices):
+            return True
+        logger.warning(
+            f"KGEntityDeduplicationPipe: {entity_count} entities but no cosine index on description_embedding, comparing every pair"
+        )
+        return False
+
     async def kg_llm_entity_deduplication(self, collection_id: UUID, **kwargs):
         # TODO: implement LLM based entity deduplication
         raise NotImplementedError(
@@ -296,7 +478,20 @@ class KGEntityDeduplicationPipe(AsyncPipe):
                 f"KGEntityDeduplicationPipe: Running description entity deduplication for collection {collection_id}"
             )
             async for result in self.kg_description_entity_deduplication(  # type: ignore
-                collection_id, **kwargs
+                collection_id,
+                description_similarity_eps=input.message.get(
+                    "description_similarity_eps", 0.1
+                ),
+                deduplication_block_size=input.message.get(
+                    "deduplication_block_size", 4096
+                ),
+                deduplication_ann_threshold=input.message.get(
+                    "deduplication_ann_threshold", 50_000
+                ),
+                deduplication_ann_neighbours=input.message.get(
+                    "deduplication_ann_neighbours", 16
+                ),
+                **kwargs,
             ):
                 yield result
 
@@ -1,6 +1,5 @@
 # pipe to extract nodes/triples etc
 
-import asyncio
 import logging
 import random
 import time
@@ -77,22 +76,23 @@ class KGEntityDescriptionPipe(AsyncPipe):
         ):
 
             entity_info = [
-                f"{entity.name}, {entity.description}" for entity in entities
+                f"{entity['name']}, {entity['description']}"
+                for entity in entities
             ]
 
             triples_txt = [
-                f"{i+1}: {triple.subject}, {triple.object}, {triple.predicate} - Summary: {triple.description}"
+                f"{i+1}: {triple['subject']}, {triple['object']}, {triple['predicate']} - Summary: {triple['description']}"
                 for i, triple in enumerate(triples)
             ]
 
             # potentially slow at scale, but set to avoid duplicates
             unique_extraction_ids = set()
             for entity in entities:
-                for extraction_id in entity.extraction_ids:
+                for extraction_id in entity["extraction_ids"]:
                     unique_extraction_ids.add(extraction_id)
 
             out_entity = Entity(
-                name=entities[0].name,
+                name=entities[0]["name"],
                 extraction_ids=list(unique_extraction_ids),
                 document_ids=[document_id],
             )
@@ -146,48 +146,36 @@ class KGEntityDescriptionPipe(AsyncPipe):
 
             return out_entity.name
 
-        offset = input.message["offset"]
-        limit = input.message["limit"]
         document_id = input.message["document_id"]
+        batch_size = input.message.get("batch_size", 256)
         logger = input.message["logger"]
 
         logger.info(
-            f"KGEntityDescriptionPipe: Getting entity map for document {document_id}",
+            f"KGEntityDescriptionPipe: Streaming entity map for document {document_id}",
         )
 
-        entity_map = await self.database_provider.get_entity_map(
-            offset, limit, document_id
-        )
-        total_entities = len(entity_map)
-
-        logger.info(
-            f"KGEntityDescriptionPipe: Got entity map for document {document_id}, total entities: {total_entities}, time from start: {time.time() - start_time:.2f} seconds",
+        # entities are fetched page by page as the LLM limiter frees slots
+        workflows = (
+            process_entity(
+                entity_info["entities"],
+                entity_info["triples"],
+                input.message["max_description_input_length"],
+                document_id,
+            )
+            async for _, entity_info in self.database_provider.stream_entity_map(
+                document_id, batch_size
+            )
         )
 
-        workflows = []
-
-        for i, (entity_name, entity_info) in enumerate(entity_map.items()):
-            try:
-                workflows.append(
-                    process_entity(
-                        entity_info["entities"],
-                        entity_info["triples"],
-                        input.message["max_description_input_length"],
-                        document_id,
-                    )
-                )
-            except Exception as e:
-                logger.error(f"Error processing entity {entity_name}: {e}")
-
         completed_entities = 0
-        for result in asyncio.as_completed(workflows):
+        async for result in self.llm_provider.limiter.as_completed(workflows):
             if completed_entities % 100 == 0:
                 logger.info(
-                    f"KGEntityDescriptionPipe: Completed {completed_entities+1} of {total_entities} entities for document {document_id}",
+                    f"KGEntityDescriptionPipe: Completed {completed_entities+1} entities for document {document_id}, LLM throughput: {self.llm_provider.limiter.stats()}",
                 )
             yield await result
             completed_entities += 1
 
         logger.info(
-            f"KGEntityDescriptionPipe: Processed {total_entities} entities for document {document_id}, time from start: {time.time() - start_time:.2f} seconds",
+            f"KGEntityDescriptionPipe: Processed {completed_entities} entities for document {document_id}, time from start: {time.time() - start_time:.2f} seconds",
         )
@@ -1,6 +1,5 @@
-import asyncio
 import logging
-from typing import Any, AsyncGenerator, List, Optional
+from typing import Any, AsyncGenerator, Awaitable, List
 from uuid import UUID
 
 from core.base import (
@@ -26,7 +25,7 @@ class KGStoragePipe(AsyncPipe):
         database_provider: DatabaseProvider,
         config: AsyncPipe.PipeConfig,
         logging_provider: SqlitePersistentLoggingProvider,
-        storage_batch_size: int = 1,
+        storage_batch_size: int = 5_000,
         *args,
         **kwargs,
     ):
@@ -44,6 +43,7 @@ class KGStoragePipe(AsyncPipe):
             **kwargs,
         )
         self.database_provider = database_provider
+        # Number of buffered entity and triple rows that triggers a flush
         self.storage_batch_size = storage_batch_size
 
     async def store(
@@ -53,9 +53,13 @@ class KGStoragePipe(AsyncPipe):
         """
         Stores a batch of knowledge graph extractions in the graph database.
         """
+        await self._write(
+            self.database_provider.add_kg_extractions(kg_extractions)
+        )
+
+    async def _write(self, operation: Awaitable[None]) -> None:
         try:
-            await self.database_provider.add_kg_extractions(kg_extractions)
-            return
+            await operation
         except Exception as e:
             error_message = f"Failed to store knowledge graph extractions in the database: {e}"
             logger.error(error_message)
@@ -73,36 +77,20 @@ class KGStoragePipe(AsyncPipe):
         Executes the async knowledge graph storage pipe: storing knowledge graph extractions in the graph database.
         """
 
-        batch_tasks = []
-        kg_batch: list[KGExtraction] = []
         errors = []
+        writer = self.database_provider.kg_batch_writer(
+            flush_size=self.storage_batch_size
+        )
 
         async for kg_extraction in input.message:
             if isinstance(kg_extraction, R2RDocumentProcessingError):
                 errors.append(kg_extraction)
                 continue
 
-            kg_batch.append(kg_extraction)  # type: ignore
-            if len(kg_batch) >= self.storage_batch_size:
-                # Schedule the storage task
-                batch_tasks.append(
-                    asyncio.create_task(
-                        self.store(kg_batch.copy()),
-                        name=f"kg-store-{self.config.name}",
-                    )
-                )
-                kg_batch.clear()
-
-        if kg_batch:  # Process any remaining extractions
-            batch_tasks.append(
-                asyncio.create_task(
-                    self.store(kg_batch.copy()),
-                    name=f"kg-store-{self.config.name}",
-                )
-            )
+            await self._write(writer.add(kg_extraction))  # type: ignore
 
-        # Wait for all storage tasks to complete
-        await asyncio.gather(*batch_tasks)
+        # Flush any remaining extractions
+        await self._write(writer.flush())
 
         for error in errors:
             yield error
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import logging
+import random
 import re
 import time
 from typing import Any, AsyncGenerator, Optional, Union
@@ -75,7 +76,6 @@ class KGTriplesExtractionPipe(AsyncPipe[dict]):
         retries: int = 5,
         delay: int = 2,
         task_id: Optional[int] = None,
-        total_tasks: Optional[int] = None,
     ) -> KGExtraction:
         """
         Extracts NER triples from a extraction with retries.
@@ -193,7 +193,9 @@ class KGTriplesExtractionPipe(AsyncPipe[dict]):
                 R2RException,
             ) as e:
                 if attempt < retries - 1:
-                    await asyncio.sleep(delay)
+                    # Jittered exponential backoff so that failed requests
+                    # from many tasks do not retry in lockstep
+                    await asyncio.sleep(random.uniform(0, delay * 2**attempt))
                 else:
                     logger.error(
                         f"Failed after retries with for extraction {extractions[0].id} of document {extractions[0].document_id}: {e}"
@@ -202,7 +204,7 @@ class KGTriplesExtractionPipe(AsyncPipe[dict]):
         # add metadata to entities and triples
 
         logger.info(
-            f"KGExtractionPipe: Completed task number {task_id} of {total_tasks} for document {extractions[0].document_id}",
+            f"KGExtractionPipe: Completed task number {task_id} for document {extractions[0].document_id}",
         )
 
         return KGExtraction(
@@ -240,97 +242,47 @@ class KGTriplesExtractionPipe(AsyncPipe[dict]):
             f"KGTriplesExtractionPipe: Processing document {document_id} for KG extraction",
         )
 
-        # First get the chunks response
-        chunks_response = await self.database_provider.get_document_chunks(
-            document_id=document_id
-        )
-
-        # Then create the extractions from the results
-        extractions = [
-            DocumentExtraction(
-                id=extraction["extraction_id"],
-                document_id=extraction["document_id"],
-                user_id=extraction["user_id"],
-                collection_ids=extraction["collection_ids"],
-                data=extraction["text"],
-                metadata=extraction["metadata"],
+        async def extraction_tasks():
+            # Chunks arrive in chunk order, already filtered and grouped by
+            # the database, so extraction starts with the first group
+            chunk_groups = self.database_provider.stream_document_chunk_groups(
+                document_id=document_id,
+                group_size=extraction_merge_count,
+                filter_out_existing_chunks=filter_out_existing_chunks,
             )
-            for extraction in (
-                await self.database_provider.get_document_chunks(
-                    document_id=document_id
-                )
-            )["results"]
-        ]
-
-        logger.info(
-            f"Found {len(extractions)} extractions for document {document_id}"
-        )
-
-        if filter_out_existing_chunks:
-            existing_extraction_ids = await self.database_provider.get_existing_entity_extraction_ids(
-                document_id=document_id
-            )
-            extractions = [
-                extraction
-                for extraction in extractions
-                if extraction.id not in existing_extraction_ids
-            ]
-            logger.info(
-                f"Filtered out {len(existing_extraction_ids)} existing extractions, remaining {len(extractions)} extractions for document {document_id}"
-            )
-
-            if len(extractions) == 0:
-                logger.info(f"No extractions left for document {document_id}")
-                return
-
-        logger.info(
-            f"KGTriplesExtractionPipe: Obtained {len(extractions)} extractions to process, time from start: {time.time() - start_time:.2f} seconds",
-        )
-
-        # sort the extractions accroding to chunk_order field in metadata in ascending order
-        extractions = sorted(
-            extractions, key=lambda x: x.metadata["chunk_order"]
-        )
-
-        # group these extractions into groups of extraction_merge_count
-        extractions_groups = [
-            extractions[i : i + extraction_merge_count]
-            for i in range(0, len(extractions), extraction_merge_count)
-        ]
-
-        logger.info(
-            f"KGTriplesExtractionPipe: Extracting KG Triples for document and created {len(extractions_groups)} tasks, time from start: {time.time() - start_time:.2f} seconds",
-        )
-
-        tasks = [
-            asyncio.create_task(
-                self.extract_kg(
-                    extractions=extractions_group,
+            task_id = 0
+            async for chunk_group in chunk_groups:
+                yield self.extract_kg(
+                    extractions=[
+                        DocumentExtraction(
+                            id=extraction["extraction_id"],
+                            document_id=extraction["document_id"],
+                            user_id=extraction["user_id"],
+                            collection_ids=extraction["collection_ids"],
+                            data=extraction["text"],
+                            metadata=extraction["metadata"],
+                        )
+                        for extraction in chunk_group
+                    ],
                     generation_config=generation_config,
                     max_knowledge_triples=max_knowledge_triples,
                     entity_types=entity_types,
                     relation_types=relation_types,
                     task_id=task_id,
-                    total_tasks=len(extractions_groups),
                 )
-            )
-            for task_id, extractions_group in enumerate(extractions_groups)
-        ]
+                task_id += 1
 
         completed_tasks = 0
-        total_tasks = len(tasks)
-
-        logger.info(
-            f"KGTriplesExtractionPipe: Waiting for {total_tasks} KG extraction tasks to complete",
-        )
 
-        for completed_task in asyncio.as_completed(tasks):
+        async for completed_task in self.llm_provider.limiter.as_completed(
+            extraction_tasks()
+        ):
             try:
                 yield await completed_task
                 completed_tasks += 1
                 if completed_tasks % 100 == 0:
                     logger.info(
-                        f"KGTriplesExtractionPipe: Completed {completed_tasks}/{total_tasks} KG extraction tasks",
+                        f"KGTriplesExtractionPipe: Completed {completed_tasks} KG extraction tasks, LLM throughput: {self.llm_provider.limiter.stats()}",
                     )
             except Exception as e:
                 logger.error(f"Error in Extracting KG Triples: {e}")
@@ -339,6 +291,8 @@ class KGTriplesExtractionPipe(AsyncPipe[dict]):
                     error_message=str(e),
                 )
 
+        if completed_tasks == 0:
+            logger.info(f"No extractions left for document {document_id}")
         logger.info(
-            f"KGTriplesExtractionPipe: Completed {completed_tasks}/{total_tasks} KG extraction tasks, time from start: {time.time() - start_time:.2f} seconds",
+            f"KGTriplesExtractionPipe: Completed {completed_tasks} KG extraction tasks, time from start: {time.time() - start_time:.2f} seconds",
         )
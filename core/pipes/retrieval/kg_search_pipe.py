@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import Any, AsyncGenerator, Optional
@@ -103,78 +104,41 @@ class KGSearchSearchPipe(GeneratorPipe):
         # search over communities and
         # do 3 searches. One over entities, one over relationships, one over communities
 
-        async for message in input.message:
-            query_embedding = (
-                await self.embedding_provider.async_get_embedding(message)
-            )
+        messages = [message async for message in input.message]
+        if not messages:
+            return
 
-            # entity search
-            search_type = "__Entity__"
-            async for search_result in await self.database_provider.vector_query(  # type: ignore
-                message,
-                search_type=search_type,
+        # All queries from query transformation are embedded together and
+        # searched in one batched query per search type, with the entity
+        # and community searches running concurrently.
+        query_embeddings = await self.embedding_provider.async_get_embeddings(
+            messages
+        )
+
+        entity_results, community_results = await asyncio.gather(
+            self.database_provider.batched_vector_query(
+                query_embeddings,
+                search_type="__Entity__",
                 search_type_limits=kg_search_settings.local_search_limits[
-                    search_type
+                    "__Entity__"
                 ],
-                query_embedding=query_embedding,
                 property_names=[
                     "name",
                     "description",
                     "extraction_ids",
                 ],
                 filters=kg_search_settings.filters,
+                ef_search=kg_search_settings.ef_search,
+                probes=kg_search_settings.probes,
                 entities_level=kg_search_settings.entities_level,
-            ):
-                yield KGSearchResult(
-                    content=KGEntityResult(
-                        name=search_result["name"],
-                        description=search_result["description"],
-                    ),
-                    method=KGSearchMethod.LOCAL,
-                    result_type=KGSearchResultType.ENTITY,
-                    extraction_ids=search_result["extraction_ids"],
-                    metadata={"associated_query": message},
-                )
-
-            # relationship search
-            # disabled for now. We will check evaluations and see if we need it
-            # search_type = "__Relationship__"
-            # async for search_result in self.database_provider.vector_query(  # type: ignore
-            #     input,
-            #     search_type=search_type,
-            #     search_type_limits=kg_search_settings.local_search_limits[
-            #         search_type
-            #     ],
-            #     query_embedding=query_embedding,
-            #     property_names=[
-            #         "name",
-            #         "description",
-            #         "extraction_ids",
-            #         "document_ids",
-            #     ],
-            # ):
-            #     yield KGSearchResult(
-            #         content=KGRelationshipResult(
-            #             name=search_result["name"],
-            #             description=search_result["description"],
-            #         ),
-            #         method=KGSearchMethod.LOCAL,
-            #         result_type=KGSearchResultType.RELATIONSHIP,
-            #         # extraction_ids=search_result["extraction_ids"],
-            #         # document_ids=search_result["document_ids"],
-            #         metadata={"associated_query": message},
-            #     )
-
-            # community search
-            search_type = "__Community__"
-            async for search_result in await self.database_provider.vector_query(  # type: ignore
-                message,
-                search_type=search_type,
+            ),
+            self.database_provider.batched_vector_query(
+                query_embeddings,
+                search_type="__Community__",
                 search_type_limits=kg_search_settings.local_search_limits[
-                    search_type
+                    "__Community__"
                 ],
                 embedding_type="embedding",
-                query_embedding=query_embedding,
                 property_names=[
                     "community_number",
                     "name",
@@ -184,7 +148,30 @@ class KGSearchSearchPipe(GeneratorPipe):
                     "summary",
                 ],
                 filters=kg_search_settings.filters,
-            ):
+                ef_search=kg_search_settings.ef_search,
+                probes=kg_search_settings.probes,
+            ),
+        )
+
+        # relationship search is disabled for now. We will check evaluations
+        # and see if we need it (search_type="__Relationship__")
+
+        for message, entities, communities in zip(
+            messages, entity_results, community_results
+        ):
+            for search_result in entities:
+                yield KGSearchResult(
+                    content=KGEntityResult(
+                        name=search_result["name"],
+                        description=search_result["description"],
+                    ),
+                    method=KGSearchMethod.LOCAL,
+                    result_type=KGSearchResultType.ENTITY,
+                    extraction_ids=search_result["extraction_ids"],
+                    metadata={"associated_query": message},
+                )
+
+            for search_result in communities:
                 yield KGSearchResult(
                     content=KGCommunityResult(
                         name=search_result["name"],
@@ -1,4 +1,5 @@
 import logging
+from contextlib import aclosing
 from datetime import datetime
 from typing import Any, AsyncGenerator, Generator, Optional
 from uuid import UUID
@@ -72,12 +73,17 @@ class StreamingSearchRAGPipe(GeneratorPipe):
         )
         yield f"<{self.COMPLETION_STREAM_MARKER}>"
         response = ""
-        for chunk in self.llm_provider.get_completion_stream(
-            messages=messages, generation_config=rag_generation_config
-        ):
-            chunk_txt = StreamingSearchRAGPipe._process_chunk(chunk)
-            response += chunk_txt
-            yield chunk_txt
+        # `aclosing` closes the upstream completion as soon as this generator
+        # is closed, e.g. when the client disconnects mid-answer
+        async with aclosing(
+            self.llm_provider.aget_completion_stream(
+                messages=messages, generation_config=rag_generation_config
+            )
+        ) as stream:
+            async for chunk in stream:
+                chunk_txt = StreamingSearchRAGPipe._process_chunk(chunk)
+                response += chunk_txt
+                yield chunk_txt
 
         yield f"</{self.COMPLETION_STREAM_MARKER}>"
 
@@ -1,6 +1,11 @@
+import asyncio
 import logging
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 from fastapi import HTTPException
 
 import jwt
@@ -28,6 +33,72 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 DEFAULT_R2R_SK = "wNFbczH3QhUVcPALwtWZCPi0lrDlGV3P1DPRVEQCPbM"
 
 
+def _token_expiry(token: str) -> float:
+    try:
+        payload = jwt.decode(token, options={"verify_signature": False})
+        return float(payload.get("exp", 0))
+    except jwt.InvalidTokenError:
+        # Tokens that do not decode are rejected before the blacklist
+        return 0.0
+
+
+class TokenBlacklistMirror:
+    """
+    Local copy of a project's blacklisted tokens. It is refreshed with the
+    rows blacklisted since the last refresh, at most every
+    `refresh_seconds`, so a logout served by another process takes effect
+    here within that window.
+    """
+
+    # Rows can arrive with a `blacklisted_at` slightly older than ones
+    # already seen, e.g. from a process whose clock lags
+    OVERLAP = timedelta(minutes=1)
+
+    def __init__(
+        self, database_provider: DatabaseProvider, refresh_seconds: float
+    ):
+        self.database_provider = database_provider
+        self.refresh_seconds = refresh_seconds
+        self._tokens: dict[str, float] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_seconds
+
+    def add(self, token: str) -> None:
+        self._tokens[token] = _token_expiry(token)
+
+    async def contains(self, token: str) -> bool:
+        if self._is_stale():
+            await self.refresh()
+        return token in self._tokens
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            if not self._is_stale():
+                return
+            since = (
+                None
+                if self._watermark is None
+                else self._watermark - self.OVERLAP
+            )
+            rows = await self.database_provider.get_blacklisted_tokens(since)
+            for token, blacklisted_at in rows:
+                if token not in self._tokens:
+                    self.add(token)
+                if self._watermark is None or blacklisted_at > self._watermark:
+                    self._watermark = blacklisted_at
+
+            # Expired tokens fail to decode anyway
+            now = time.time()
+            self._tokens = {
+                token: exp for token, exp in self._tokens.items() if exp > now
+            }
+            self._refreshed_at = time.monotonic()
+
+
 class R2RAuthProvider(AuthProvider):
     def __init__(
         self,
@@ -52,6 +123,19 @@ class R2RAuthProvider(AuthProvider):
             or os.getenv("R2R_REFRESH_LIFE_IN_MINUTES")
         )
         self.config: AuthConfig = config
+        # Users resolved from a token are reused for a short while, which
+        # bounds how stale their roles and collections can be
+        self.token_cache_seconds = float(
+            os.getenv("R2R_TOKEN_CACHE_SECONDS", "30")
+        )
+        self.token_cache_size = int(os.getenv("R2R_TOKEN_CACHE_SIZE", "10000"))
+        self.blacklist_refresh_seconds = float(
+            os.getenv("R2R_TOKEN_BLACKLIST_REFRESH_SECONDS", "10")
+        )
+        self._users: OrderedDict[
+            tuple[str, str], tuple[float, UserResponse]
+        ] = OrderedDict()
+        self._blacklists: dict[str, TokenBlacklistMirror] = {}
 
     async def initialize(self):
         try:
@@ -84,14 +168,38 @@ class R2RAuthProvider(AuthProvider):
         to_encode |= {"exp": expire, "token_type": "refresh"}
         return jwt.encode(to_encode, self.secret_key, algorithm="HS256")
 
+    def _blacklist(self) -> TokenBlacklistMirror:
+        project_name = self.database_provider.project_name
+        blacklist = self._blacklists.get(project_name)
+        if blacklist is None:
+            blacklist = self._blacklists[project_name] = TokenBlacklistMirror(
+                self.database_provider, self.blacklist_refresh_seconds
+            )
+        return blacklist
+
+    def _cached_user(self, key: tuple[str, str]) -> Optional[UserResponse]:
+        entry = self._users.get(key)
+        if entry is None:
+            return None
+        if time.time() >= entry[0]:
+            del self._users[key]
+            return None
+        self._users.move_to_end(key)
+        return entry[1]
+
+    def _cache_user(
+        self, key: tuple[str, str], exp: datetime, user: UserResponse
+    ) -> None:
+        self._users[key] = (
+            min(exp.timestamp(), time.time() + self.token_cache_seconds),
+            user,
+        )
+        self._users.move_to_end(key)
+        while len(self._users) > self.token_cache_size:
+            self._users.popitem(last=False)
+
     async def decode_token(self, token: str) -> TokenData:
         try:
-            # First, check if the token is blacklisted
-            if await self.database_provider.is_token_blacklisted(token):
-                raise R2RException(
-                    status_code=401, message="Token has been invalidated"
-                )
-
             payload = jwt.decode(token, self.secret_key, algorithms=["HS256"])
             email: str = payload.get("sub")
             token_type: str = payload.get("token_type")
@@ -104,6 +212,11 @@ class R2RAuthProvider(AuthProvider):
                 or exp_datetime < datetime.now(timezone.utc)
             ):
                 raise R2RException(status_code=401, message="Invalid token")
+
+            if await self._blacklist().contains(token):
+                raise R2RException(
+                    status_code=401, message="Token has been invalidated"
+                )
             return TokenData(
                 email=email, token_type=token_type, exp=exp_datetime
             )
@@ -115,6 +228,16 @@ class R2RAuthProvider(AuthProvider):
             raise R2RException(status_code=401, message="Invalid token") from e
 
     async def user(self, token: str = Depends(oauth2_scheme)) -> UserResponse:
+        key = (self.database_provider.project_name, token)
+        user = self._cached_user(key)
+        if user is not None:
+            if await self._blacklist().contains(token):
+                self._users.pop(key, None)
+                raise R2RException(
+                    status_code=401, message="Token has been invalidated"
+                )
+            return user
+
         token_data = await self.decode_token(token)
         if not token_data.email:
             raise R2RException(
@@ -125,6 +248,7 @@ class R2RAuthProvider(AuthProvider):
             raise R2RException(
                 status_code=401, message="Invalid authentication credentials"
             )
+        self._cache_user(key, token_data.exp, user)
         return user
 
     def get_current_active_user(
@@ -250,9 +374,15 @@ class R2RAuthProvider(AuthProvider):
             raise R2RException(
                 status_code=401, message="Invalid refresh token"
             )
+        # Refresh tokens are single use, so do not trust a stale mirror
+        if await self.database_provider.is_token_blacklisted(refresh_token):
+            raise R2RException(
+                status_code=401, message="Token has been invalidated"
+            )
 
         # Invalidate the old refresh token and create a new one
         await self.database_provider.blacklist_token(refresh_token)
+        self._blacklist().add(refresh_token)
 
         new_access_token = self.create_access_token(
             data={"sub": token_data.email}
@@ -336,6 +466,8 @@ class R2RAuthProvider(AuthProvider):
     async def logout(self, token: str) -> dict[str, str]:
         # Add the token to a blacklist
         await self.database_provider.blacklist_token(token)
+        self._blacklist().add(token)
+        self._users.pop((self.database_provider.project_name, token), None)
         return {"message": "Logged out successfully"}
 
     async def clean_expired_blacklisted_tokens(self):
@@ -1,5 +1,7 @@
 import asyncio
+import bisect
 import logging
+import time
 from contextlib import asynccontextmanager
 from typing import Any, Optional, Sequence, Union
 
@@ -10,10 +12,138 @@ from core.base import DatabaseConnectionManager
 logger = logging.getLogger()
 
 
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, in milliseconds."""
+
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound containing the `q` quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.max_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(self.BUCKETS_MS, self.counts)
+                },
+                "le_inf": self.counts[-1],
+            },
+        }
+
+
+class PoolMetrics:
+    """
+    Acquire-wait and query-latency histograms keyed by query name, which
+    defaults to the handler method that issued the query.
+    """
+
+    def __init__(self, slow_acquire_threshold: float = 0.5):
+        self.slow_acquire_threshold = slow_acquire_threshold
+        self.acquire_wait: dict[str, LatencyHistogram] = {}
+        self.query_latency: dict[str, LatencyHistogram] = {}
+        self.slow_acquires = 0
+
+    def observe_acquire(self, query_name: str, seconds: float) -> None:
+        self.acquire_wait.setdefault(query_name, LatencyHistogram()).observe(
+            seconds
+        )
+        if seconds > self.slow_acquire_threshold:
+            self.slow_acquires += 1
+            logger.warning(
+                f"Waited {seconds:.3f}s for a database connection in `{query_name}`."
+            )
+
+    def observe_query(self, query_name: str, seconds: float) -> None:
+        self.query_latency.setdefault(query_name, LatencyHistogram()).observe(
+            seconds
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "slow_acquires": self.slow_acquires,
+            "acquire_wait": {
+                name: histogram.snapshot()
+                for name, histogram in self.acquire_wait.items()
+            },
+            "query_latency": {
+                name: histogram.snapshot()
+                for name, histogram in self.query_latency.items()
+            },
+        }
+
+
 class SemaphoreConnectionPool:
-    def __init__(self, connection_string, postgres_configuration_settings):
+    # Used for the pool settings left unset in the config and environment
+    DEFAULT_MIN_CONNECTIONS = 10
+    DEFAULT_MAX_INACTIVE_CONNECTION_LIFETIME = 300.0
+    DEFAULT_STATEMENT_CACHE_SIZE = 100
+    DEFAULT_MAX_CACHED_STATEMENT_LIFETIME = 300
+
+    def __init__(
+        self,
+        connection_string,
+        postgres_configuration_settings,
+        metrics: Optional[PoolMetrics] = None,
+    ):
         self.connection_string = connection_string
         self.postgres_configuration_settings = postgres_configuration_settings
+        self.metrics = metrics or PoolMetrics()
+
+    @staticmethod
+    def _setting(value: Any, default: Any) -> Any:
+        # `0` is meaningful, e.g. `statement_cache_size = 0` behind a
+        # transaction-mode pooler such as pgbouncer or RDS Proxy
+        return default if value is None else value
+
+    def _pool_kwargs(self) -> dict[str, Any]:
+        settings = self.postgres_configuration_settings
+        min_connections = self._setting(
+            settings.min_connections, self.DEFAULT_MIN_CONNECTIONS
+        )
+        return {
+            "min_size": min(min_connections, settings.max_connections),
+            "max_size": settings.max_connections,
+            "max_inactive_connection_lifetime": self._setting(
+                settings.max_inactive_connection_lifetime,
+                self.DEFAULT_MAX_INACTIVE_CONNECTION_LIFETIME,
+            ),
+            "statement_cache_size": self._setting(
+                settings.statement_cache_size,
+                self.DEFAULT_STATEMENT_CACHE_SIZE,
+            ),
+            "max_cached_statement_lifetime": self._setting(
+                settings.max_cached_statement_lifetime,
+                self.DEFAULT_MAX_CACHED_STATEMENT_LIFETIME,
+            ),
+        }
 
     async def initialize(self):
         try:
@@ -26,8 +156,7 @@ class SemaphoreConnectionPool:
             )
 
             self.pool = await asyncpg.create_pool(
-                self.connection_string,
-                max_size=self.postgres_configuration_settings.max_connections,
+                self.connection_string, **self._pool_kwargs()
             )
 
             logger.info(
@@ -39,11 +168,26 @@ class SemaphoreConnectionPool:
             ) from e
 
     @asynccontextmanager
-    async def get_connection(self):
+    async def get_connection(self, query_name: str = "unnamed"):
+        start = time.perf_counter()
         async with self.semaphore:
             async with self.pool.acquire() as conn:
+                self.metrics.observe_acquire(
+                    query_name, time.perf_counter() - start
+                )
                 yield conn
 
+    def stats(self) -> dict[str, Any]:
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return {
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+        }
+
     async def close(self):
         await self.pool.close()
 
@@ -108,14 +252,54 @@ class PostgresConnectionManager(DatabaseConnectionManager):
 
     def __init__(self):
         self.pool: Optional[SemaphoreConnectionPool] = None
+        self.read_pool: Optional[SemaphoreConnectionPool] = None
+        self.metrics = PoolMetrics()
 
-    async def initialize(self, pool: SemaphoreConnectionPool):
+    async def initialize(
+        self,
+        pool: SemaphoreConnectionPool,
+        read_pool: Optional[SemaphoreConnectionPool] = None,
+    ):
         self.pool = pool
+        self.read_pool = read_pool
 
-    async def execute_query(self, query, params=None, isolation_level=None):
+    @asynccontextmanager
+    async def get_connection(
+        self, read_only: bool = False, query_name: str = "unnamed"
+    ):
+        """
+        Acquires a pooled connection and records, under `query_name`, how
+        long the caller waited for it and held it. Read-only callers are
+        routed to the read replica when one is configured.
+        """
         if not self.pool:
             raise ValueError("PostgresConnectionManager is not initialized.")
-        async with self.pool.get_connection() as conn:
+        pool = (self.read_pool or self.pool) if read_only else self.pool
+        async with pool.get_connection(query_name) as conn:
+            start = time.perf_counter()
+            try:
+                yield conn
+            finally:
+                self.metrics.observe_query(
+                    query_name, time.perf_counter() - start
+                )
+
+    def pool_stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {"metrics": self.metrics.snapshot()}
+        if self.pool:
+            stats["primary"] = self.pool.stats()
+        if self.read_pool:
+            stats["read_replica"] = self.read_pool.stats()
+        return stats
+
+    async def execute_query(
+        self,
+        query,
+        params=None,
+        isolation_level=None,
+        query_name: str = "unnamed",
+    ):
+        async with self.get_connection(query_name=query_name) as conn:
             if isolation_level:
                 async with conn.transaction(isolation=isolation_level):
                     if params:
@@ -128,10 +312,14 @@ class PostgresConnectionManager(DatabaseConnectionManager):
                 else:
                     return await conn.execute(query)
 
-    async def execute_many(self, query, params=None, batch_size=1000):
-        if not self.pool:
-            raise ValueError("PostgresConnectionManager is not initialized.")
-        async with self.pool.get_connection() as conn:
+    async def execute_many(
+        self,
+        query,
+        params=None,
+        batch_size=1000,
+        query_name: str = "unnamed",
+    ):
+        async with self.get_connection(query_name=query_name) as conn:
             async with conn.transaction():
                 if params:
                     for i in range(0, len(params), batch_size):
@@ -140,10 +328,16 @@ class PostgresConnectionManager(DatabaseConnectionManager):
                 else:
                     await conn.executemany(query)
 
-    async def fetch_query(self, query, params=None):
-        if not self.pool:
-            raise ValueError("PostgresConnectionManager is not initialized.")
-        async with self.pool.get_connection() as conn:
+    async def fetch_query(
+        self,
+        query,
+        params=None,
+        read_only=False,
+        query_name: str = "unnamed",
+    ):
+        async with self.get_connection(
+            read_only=read_only, query_name=query_name
+        ) as conn:
             async with conn.transaction():
                 return (
                     await conn.fetch(query, *params)
@@ -151,10 +345,16 @@ class PostgresConnectionManager(DatabaseConnectionManager):
                     else await conn.fetch(query)
                 )
 
-    async def fetchrow_query(self, query, params=None):
-        if not self.pool:
-            raise ValueError("PostgresConnectionManager is not initialized.")
-        async with self.pool.get_connection() as conn:
+    async def fetchrow_query(
+        self,
+        query,
+        params=None,
+        read_only=False,
+        query_name: str = "unnamed",
+    ):
+        async with self.get_connection(
+            read_only=read_only, query_name=query_name
+        ) as conn:
             async with conn.transaction():
                 if params:
                     return await conn.fetchrow(query, *params)
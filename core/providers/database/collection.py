@@ -1,5 +1,6 @@
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Optional, Union
 from uuid import UUID, uuid4
@@ -26,6 +27,11 @@ logger = logging.getLogger()
 
 class PostgresCollectionHandler(CollectionHandler):
     TABLE_NAME = "collections"
+    # Seconds a collection's document ids are served from memory. Changes
+    # made through this handler invalidate the entry right away; the TTL
+    # bounds staleness for documents ingested or changed elsewhere.
+    DOCUMENT_IDS_CACHE_TTL = 60.0
+    DOCUMENT_IDS_CACHE_SIZE = 1024
 
     def __init__(
         self,
@@ -34,8 +40,59 @@ class PostgresCollectionHandler(CollectionHandler):
         config: DatabaseConfig,
     ):
         self.config = config
+        # Keyed by project too, as one handler serves every tenant schema
+        self._document_ids_cache: dict[
+            tuple[str, frozenset[UUID]], tuple[float, list[UUID]]
+        ] = {}
         super().__init__(project_name, connection_manager)
 
+    async def get_document_ids_for_collections(
+        self, collection_ids: list[UUID]
+    ) -> list[UUID]:
+        """
+        Returns the ids of documents in any of the given collections,
+        cached per set of collection ids.
+        """
+        key = (self.project_name, frozenset(collection_ids))
+        cached = self._document_ids_cache.get(key)
+        if (
+            cached is not None
+            and time.monotonic() - cached[0] < self.DOCUMENT_IDS_CACHE_TTL
+        ):
+            return cached[1]
+
+        query = f"""
+            SELECT DISTINCT document_id FROM {self._get_table_name('document_info')}
+            WHERE collection_ids && $1::uuid[]
+        """
+        document_ids = [
+            row["document_id"]
+            for row in await self.connection_manager.fetch_query(
+                query,
+                [list(key[1])],
+                read_only=True,
+                query_name="get_document_ids_for_collections",
+            )
+        ]
+
+        if len(self._document_ids_cache) >= self.DOCUMENT_IDS_CACHE_SIZE:
+            self._document_ids_cache.pop(next(iter(self._document_ids_cache)))
+        self._document_ids_cache[key] = (time.monotonic(), document_ids)
+        return document_ids
+
+    def invalidate_document_ids_cache(
+        self, collection_id: Optional[UUID] = None
+    ) -> None:
+        """Drops the current project's entries for `collection_id`, or all."""
+        project_name = self.project_name
+        for key in [
+            key
+            for key in self._document_ids_cache
+            if key[0] == project_name
+            and (collection_id is None or collection_id in key[1])
+        ]:
+            del self._document_ids_cache[key]
+
     async def create_tables(self) -> None:
         query = f"""
         CREATE TABLE IF NOT EXISTS {self._get_table_name(PostgresCollectionHandler.TABLE_NAME)} (
@@ -213,6 +270,7 @@ class PostgresCollectionHandler(CollectionHandler):
         await self.connection_manager.fetchrow_query(
             document_update_query, [collection_id]
         )
+        self.invalidate_document_ids_cache(collection_id)
 
         # Delete the collection
         delete_query = f"""
@@ -482,6 +540,7 @@ class PostgresCollectionHandler(CollectionHandler):
             result = await self.connection_manager.fetchrow_query(
                 assign_query, [collection_id, document_id]
             )
+            self.invalidate_document_ids_cache(collection_id)
 
             if not result:
                 # Document exists but was already assigned to the collection
@@ -560,6 +619,7 @@ class PostgresCollectionHandler(CollectionHandler):
         result = await self.connection_manager.fetchrow_query(
             query, [collection_id, document_id]
         )
+        self.invalidate_document_ids_cache(collection_id)
 
         if not result:
             raise R2RException(
@@ -67,7 +67,9 @@ class PostgresDocumentHandler(DocumentHandler):
             retries = 0
             while retries < max_retries:
                 try:
-                    async with self.connection_manager.pool.get_connection() as conn:  # type: ignore
+                    async with self.connection_manager.get_connection(
+                        query_name="upsert_documents_overview"
+                    ) as conn:
                         async with conn.transaction():
                             # Lock the row for update
                             check_query = f"""
@@ -256,7 +258,9 @@ class PostgresDocumentHandler(DocumentHandler):
             SET {status_type} = $1
             WHERE {column_name} = Any($2)
         """
-        await self.connection_manager.execute_query(query, [status, ids])
+        await self.connection_manager.execute_query(
+            query, [status, ids], query_name="set_document_status"
+        )
 
     def _get_status_model(self, status_type: str):
         """
@@ -402,7 +406,9 @@ class PostgresDocumentHandler(DocumentHandler):
             param_index += 1
 
         try:
-            results = await self.connection_manager.fetch_query(query, params)
+            results = await self.connection_manager.fetch_query(
+                query, params, query_name="get_documents_overview"
+            )
             total_entries = results[0]["total_entries"] if results else 0
 
             documents = [
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from core.base import EmbeddingCacheHandler
+
+from .base import PostgresConnectionManager
+
+
+class PostgresEmbeddingCacheHandler(EmbeddingCacheHandler):
+    TABLE_NAME = "embedding_cache"
+
+    def __init__(
+        self, project_name: str, connection_manager: PostgresConnectionManager
+    ):
+        super().__init__(project_name, connection_manager)
+
+    async def create_tables(self):
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)} (
+            cache_key TEXT PRIMARY KEY,
+            embedding REAL[] NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresEmbeddingCacheHandler.TABLE_NAME}_created_at
+        ON {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)} (created_at);
+        """
+        await self.connection_manager.execute_query(query)
+
+    async def get_cached_embeddings(
+        self, cache_keys: list[str]
+    ) -> dict[str, list[float]]:
+        if not cache_keys:
+            return {}
+
+        query = f"""
+        SELECT cache_key, embedding
+        FROM {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)}
+        WHERE cache_key = ANY($1)
+        """
+        results = await self.connection_manager.fetch_query(
+            query, [cache_keys], query_name="get_cached_embeddings"
+        )
+        return {row["cache_key"]: list(row["embedding"]) for row in results}
+
+    async def cache_embeddings(self, entries: dict[str, list[float]]) -> None:
+        if not entries:
+            return
+
+        query = f"""
+        INSERT INTO {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)} (cache_key, embedding)
+        VALUES ($1, $2)
+        ON CONFLICT (cache_key) DO NOTHING
+        """
+        await self.connection_manager.execute_many(
+            query,
+            [(key, list(embedding)) for key, embedding in entries.items()],
+            query_name="cache_embeddings",
+        )
+
+    async def clean_embedding_cache(
+        self,
+        max_age_hours: int = 30 * 24,
+        current_time: Optional[datetime] = None,
+    ) -> None:
+        if current_time is None:
+            current_time = datetime.utcnow()
+        expiry_time = current_time - timedelta(hours=max_age_hours)
+
+        query = f"""
+        DELETE FROM {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)}
+        WHERE created_at < $1
+        """
+        await self.connection_manager.execute_query(
+            query, [expiry_time], query_name="clean_embedding_cache"
+        )
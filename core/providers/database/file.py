@@ -84,7 +84,9 @@ class PostgresFileHandler(FileHandler):
         """Store a new file in the database."""
         file_size = file_content.getbuffer().nbytes
 
-        async with self.connection_manager.pool.get_connection() as conn:  # type: ignore
+        async with self.connection_manager.get_connection(
+            query_name="store_file"
+        ) as conn:
             async with conn.transaction():
                 oid = await conn.fetchval("SELECT lo_create(0)")
                 await self._write_lobject(conn, oid, file_content)
@@ -126,7 +128,7 @@ class PostgresFileHandler(FileHandler):
         """
 
         result = await self.connection_manager.fetchrow_query(
-            query, [document_id]
+            query, [document_id], query_name="retrieve_file"
         )
         if not result:
             raise R2RException(
@@ -140,7 +142,9 @@ class PostgresFileHandler(FileHandler):
             result["file_size"],
         )
 
-        async with self.connection_manager.pool.get_connection() as conn:  # type: ignore
+        async with self.connection_manager.get_connection(
+            query_name="retrieve_file"
+        ) as conn:
             file_content = await self._read_lobject(conn, oid)
             return file_name, io.BytesIO(file_content), file_size
 
@@ -195,7 +199,7 @@ class PostgresFileHandler(FileHandler):
         WHERE document_id = $1
         """
 
-        async with self.connection_manager.pool.get_connection() as conn:  # type: ignore
+        async with self.connection_manager.get_connection() as conn:
             async with conn.transaction():
                 oid = await conn.fetchval(query, document_id)
                 if not oid:
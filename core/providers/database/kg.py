@@ -1,21 +1,28 @@
 import json
 import logging
+import math
 import time
-from typing import Any, AsyncGenerator, Optional, Tuple
+from typing import Any, AsyncGenerator, Optional, Tuple, Union
 from uuid import UUID
 from fastapi import HTTPException
 
 import asyncpg
+import numpy as np
 from asyncpg.exceptions import PostgresError, UndefinedTableError
 
 from core.base import (
     CommunityReport,
     Entity,
+    IndexArgsHNSW,
+    IndexArgsIVFFlat,
+    IndexMeasure,
+    IndexMethod,
     KGExtraction,
     KGExtractionStatus,
     KGHandler,
     R2RException,
     Triple,
+    VectorTableName,
 )
 from core.base.abstractions import (
     CommunityInfo,
@@ -35,13 +42,51 @@ from core.base.utils import _decorate_vector_type, llm_cost_per_million_tokens
 
 from .base import PostgresConnectionManager
 from .collection import PostgresCollectionHandler
+from .kg_clustering import (
+    TripleGraph,
+    clustering_stage,
+    match_community_ids,
+    run_hierarchical_leiden,
+)
+from .kg_writer import PostgresKGBatchWriter
+from .vecs.exc import ArgError
+from .vector import (
+    LIST_VECTOR_INDICES_QUERY,
+    execute_index_ddl,
+    index_measure_to_ops,
+    index_options,
+    validate_index_arguments,
+)
 
 logger = logging.getLogger()
 
+# Embedding column of every knowledge graph table that supports ANN indices
+KG_VECTOR_COLUMNS = {
+    VectorTableName.ENTITIES_DOCUMENT: "description_embedding",
+    VectorTableName.ENTITIES_COLLECTION: "description_embedding",
+    VectorTableName.COMMUNITIES: "embedding",
+}
+
+# Largest dimension pgvector's HNSW and IVFFlat indices accept per type
+MAX_INDEX_DIMENSIONS = {
+    VectorQuantizationType.FP32: 2_000,
+    VectorQuantizationType.FP16: 4_000,
+    VectorQuantizationType.INT1: 64_000,
+}
+
 
 class PostgresKGHandler(KGHandler):
     """Handler for Knowledge Graph operations in PostgreSQL."""
 
+    # Seconds the planner statistics used to estimate filter selectivity
+    # are kept in memory
+    FILTER_STATS_CACHE_TTL = 300.0
+    # pgvector caps `hnsw.ef_search` at 1000
+    MAX_EF_SEARCH = 1000
+    # Bounds of `hnsw.max_scan_tuples` for iterative index scans
+    MIN_SCAN_TUPLES = 20_000
+    MAX_SCAN_TUPLES = 1_000_000
+
     def __init__(
         self,
         project_name: str,
@@ -57,14 +102,10 @@ class PostgresKGHandler(KGHandler):
         self.collection_handler = collection_handler
         self.dimension = dimension
         self.quantization_type = quantization_type
-        try:
-            import networkx as nx
-
-            self.nx = nx
-        except ImportError as exc:
-            raise ImportError(
-                "NetworkX is not installed. Please install it to use this module."
-            ) from exc
+        self._pgvector_version: Optional[tuple[int, ...]] = None
+        self._filter_stats_cache: dict[
+            tuple[str, str, str], tuple[float, float, float]
+        ] = {}
 
     def _get_table_name(self, base_name: str) -> str:
         """Get the fully qualified table name."""
@@ -108,6 +149,19 @@ class PostgresKGHandler(KGHandler):
         """
         await self.connection_manager.execute_query(query)
 
+        # lookups by document and entity name, used to build entity maps
+        query = f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.project_name}_chunk_entity_document_id_name
+            ON {self._get_table_name("chunk_entity")} (document_id, name);
+            CREATE INDEX IF NOT EXISTS idx_{self.project_name}_chunk_entity_name
+            ON {self._get_table_name("chunk_entity")} (name);
+            CREATE INDEX IF NOT EXISTS idx_{self.project_name}_chunk_triple_subject
+            ON {self._get_table_name("chunk_triple")} (subject);
+            CREATE INDEX IF NOT EXISTS idx_{self.project_name}_chunk_triple_object
+            ON {self._get_table_name("chunk_triple")} (object);
+        """
+        await self.connection_manager.execute_query(query)
+
         # embeddings tables
         query = f"""
             CREATE TABLE IF NOT EXISTS {self._get_table_name("document_entity")} (
@@ -173,6 +227,27 @@ class PostgresKGHandler(KGHandler):
 
         await self.connection_manager.execute_query(query)
 
+        # tokens spent on community summaries in the current enrichment run
+        query = f"""
+            CREATE TABLE IF NOT EXISTS {self._get_table_name("community_summary_progress")} (
+            collection_id UUID PRIMARY KEY,
+            tokens_used BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );"""
+
+        await self.connection_manager.execute_query(query)
+
+        # filter columns of the vector searches in `batched_vector_query`
+        query = f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.project_name}_document_entity_document_id
+            ON {self._get_table_name("document_entity")} (document_id);
+            CREATE INDEX IF NOT EXISTS idx_{self.project_name}_collection_entity_collection_id
+            ON {self._get_table_name("collection_entity")} (collection_id);
+            CREATE INDEX IF NOT EXISTS idx_{self.project_name}_community_report_collection_id
+            ON {self._get_table_name("community_report")} (collection_id);
+        """
+        await self.connection_manager.execute_query(query)
+
     async def _add_objects(
         self,
         objects: list[Any],
@@ -203,17 +278,23 @@ class PostgresKGHandler(KGHandler):
             {on_conflict_query}
         """
 
-        # Filter out null values for each object
+        # Read every object through the same column list so that a row
+        # missing one of the first object's attributes stays aligned
         params = [
             tuple(
-                (json.dumps(v) if isinstance(v, dict) else v)
-                for v in obj.values()
-                if v is not None
+                (
+                    json.dumps(obj.get(column))
+                    if isinstance(obj.get(column), dict)
+                    else obj.get(column)
+                )
+                for column in non_null_attrs
             )
             for obj in objects
         ]
 
-        return await self.connection_manager.execute_many(QUERY, params)  # type: ignore
+        return await self.connection_manager.execute_many(  # type: ignore
+            QUERY, params, query_name="kg_add_objects"
+        )
 
     async def add_entities(
         self,
@@ -286,123 +367,129 @@ class PostgresKGHandler(KGHandler):
             total_relationships: int: total number of relationships upserted
         """
 
-        total_entities, total_relationships = 0, 0
-
-        for extraction in kg_extractions:
+        async with self.batch_writer(table_prefix=table_prefix) as writer:
+            for extraction in kg_extractions:
+                await writer.add(extraction)
 
-            total_entities, total_relationships = (
-                total_entities + len(extraction.entities),
-                total_relationships + len(extraction.triples),
-            )
-
-            if extraction.entities:
-                if not extraction.entities[0].extraction_ids:
-                    for i in range(len(extraction.entities)):
-                        extraction.entities[i].extraction_ids = (
-                            extraction.extraction_ids
-                        )
-                        extraction.entities[i].document_id = (
-                            extraction.document_id
-                        )
-
-                await self.add_entities(
-                    extraction.entities, table_name=f"{table_prefix}entity"
-                )
+        return (writer.total_entities, writer.total_relationships)
 
-            if extraction.triples:
-                if not extraction.triples[0].extraction_ids:
-                    for i in range(len(extraction.triples)):
-                        extraction.triples[i].extraction_ids = (
-                            extraction.extraction_ids
-                        )
-                    extraction.triples[i].document_id = extraction.document_id
-
-                await self.add_triples(
-                    extraction.triples, table_name=f"{table_prefix}triple"
-                )
-
-        return (total_entities, total_relationships)
-
-    async def get_entity_map(
-        self, offset: int, limit: int, document_id: UUID
-    ) -> dict[str, dict[str, list[dict[str, Any]]]]:
-
-        QUERY1 = f"""
-            WITH entities_list AS (
-                SELECT DISTINCT name
-                FROM {self._get_table_name("chunk_entity")}
-                WHERE document_id = $1
-                ORDER BY name ASC
-                LIMIT {limit} OFFSET {offset}
-            )
-            SELECT e.name, e.description, e.category,
-                   (SELECT array_agg(DISTINCT x) FROM unnest(e.extraction_ids) x) AS extraction_ids,
-                   e.document_id
-            FROM {self._get_table_name("chunk_entity")} e
-            JOIN entities_list el ON e.name = el.name
-            GROUP BY e.name, e.description, e.category, e.extraction_ids, e.document_id
-            ORDER BY e.name;"""
-
-        entities_list = await self.connection_manager.fetch_query(
-            QUERY1, [document_id]
+    def batch_writer(
+        self, table_prefix: str = "chunk_", flush_size: int = 5_000
+    ) -> PostgresKGBatchWriter:
+        """
+        Returns a writer that buffers KG extractions and bulk-loads their
+        entities and triples with `COPY` every `flush_size` rows.
+        """
+        return PostgresKGBatchWriter(
+            self.project_name,
+            self.connection_manager,
+            table_prefix=table_prefix,
+            flush_size=flush_size,
         )
-        entities_list = [
-            Entity(
-                name=entity["name"],
-                description=entity["description"],
-                category=entity["category"],
-                extraction_ids=entity["extraction_ids"],
-                document_id=entity["document_id"],
-            )
-            for entity in entities_list
-        ]
 
-        QUERY2 = f"""
+    def _entity_map_query(self, page_clause: str) -> str:
+        """
+        One row per entity name with its entity records and the triples it
+        takes part in, deduplicated and grouped by the database.
+        """
+        return f"""
             WITH entities_list AS (
-
                 SELECT DISTINCT name
                 FROM {self._get_table_name("chunk_entity")}
                 WHERE document_id = $1
-                ORDER BY name ASC
-                LIMIT {limit} OFFSET {offset}
+                {page_clause}
             )
-
-            SELECT DISTINCT t.subject, t.predicate, t.object, t.weight, t.description,
-                   (SELECT array_agg(DISTINCT x) FROM unnest(t.extraction_ids) x) AS extraction_ids, t.document_id
-            FROM {self._get_table_name("chunk_triple")} t
-            JOIN entities_list el ON t.subject = el.name
-            ORDER BY t.subject, t.predicate, t.object;
+            SELECT el.name, ent.entities, COALESCE(tr.triples, '[]'::json) AS triples
+            FROM entities_list el
+            CROSS JOIN LATERAL (
+                SELECT json_agg(json_build_object(
+                    'name', e.name,
+                    'description', e.description,
+                    'category', e.category,
+                    'extraction_ids', e.extraction_ids,
+                    'document_id', e.document_id
+                )) AS entities
+                FROM (
+                    SELECT DISTINCT name, description, category,
+                        (SELECT array_agg(DISTINCT x) FROM unnest(extraction_ids) x) AS extraction_ids,
+                        document_id
+                    FROM {self._get_table_name("chunk_entity")}
+                    WHERE name = el.name
+                ) e
+            ) ent
+            CROSS JOIN LATERAL (
+                SELECT json_agg(json_build_object(
+                    'subject', t.subject,
+                    'predicate', t.predicate,
+                    'object', t.object,
+                    'weight', t.weight,
+                    'description', t.description,
+                    'extraction_ids', t.extraction_ids,
+                    'document_id', t.document_id
+                ) ORDER BY t.subject, t.predicate, t.object) AS triples
+                FROM (
+                    SELECT DISTINCT subject, predicate, object, weight, description,
+                        (SELECT array_agg(DISTINCT x) FROM unnest(extraction_ids) x) AS extraction_ids,
+                        document_id
+                    FROM {self._get_table_name("chunk_triple")}
+                    WHERE subject = el.name OR object = el.name
+                ) t
+            ) tr
+            ORDER BY el.name;
         """
 
-        triples_list = await self.connection_manager.fetch_query(
-            QUERY2, [document_id]
+    async def stream_entity_map(
+        self, document_id: UUID, batch_size: int = 256
+    ) -> AsyncGenerator[Tuple[str, dict[str, list[dict[str, Any]]]], None]:
+        """
+        Yields `(name, {"entities": [...], "triples": [...]})` for every
+        entity of a document, in name order. Pages are fetched with keyset
+        pagination on the entity name, one round trip per page, and the
+        entities and triples arrive as plain dicts.
+        """
+        QUERY = self._entity_map_query(
+            """AND ($2::text IS NULL OR name > $2)
+                ORDER BY name ASC
+                LIMIT $3"""
         )
-        triples_list = [
-            Triple(
-                subject=triple["subject"],
-                predicate=triple["predicate"],
-                object=triple["object"],
-                weight=triple["weight"],
-                description=triple["description"],
-                extraction_ids=triple["extraction_ids"],
-                document_id=triple["document_id"],
-            )
-            for triple in triples_list
-        ]
-
-        entity_map: dict[str, dict[str, list[Any]]] = {}
-        for entity in entities_list:
-            if entity.name not in entity_map:
-                entity_map[entity.name] = {"entities": [], "triples": []}
-            entity_map[entity.name]["entities"].append(entity)
+        last_name = None
+        while True:
+            rows = await self.connection_manager.fetch_query(
+                QUERY,
+                [document_id, last_name, batch_size],
+                query_name="kg_entity_map",
+            )
+            for row in rows:
+                yield row["name"], {
+                    "entities": json.loads(row["entities"]),
+                    "triples": json.loads(row["triples"]),
+                }
+            if len(rows) < batch_size:
+                return
+            last_name = rows[-1]["name"]
 
-        for triple in triples_list:
-            if triple.subject in entity_map:
-                entity_map[triple.subject]["triples"].append(triple)
-            if triple.object in entity_map:
-                entity_map[triple.object]["triples"].append(triple)
+    async def get_entity_map(
+        self, offset: int, limit: int, document_id: UUID
+    ) -> dict[str, dict[str, list[dict[str, Any]]]]:
 
-        return entity_map
+        QUERY = self._entity_map_query(
+            """ORDER BY name ASC
+                LIMIT $2 OFFSET $3"""
+        )
+        rows = await self.connection_manager.fetch_query(
+            QUERY, [document_id, limit, offset], query_name="kg_entity_map"
+        )
+        return {
+            row["name"]: {
+                "entities": [
+                    Entity(**entity) for entity in json.loads(row["entities"])
+                ],
+                "triples": [
+                    Triple(**triple) for triple in json.loads(row["triples"])
+                ],
+            }
+            for row in rows
+        }
 
     async def upsert_embeddings(
         self,
@@ -418,7 +505,9 @@ class PostgresKGHandler(KGHandler):
                 extraction_ids = EXCLUDED.extraction_ids,
                 document_id = EXCLUDED.document_id
             """
-        return await self.connection_manager.execute_many(QUERY, data)
+        return await self.connection_manager.execute_many(
+            QUERY, data, query_name="kg_upsert_embeddings"
+        )
 
     async def upsert_entities(self, entities: list[Entity]) -> None:
         QUERY = """
@@ -434,7 +523,20 @@ class PostgresKGHandler(KGHandler):
         self, query: str, **kwargs: Any
     ) -> AsyncGenerator[Any, None]:
 
-        query_embedding = kwargs.get("query_embedding", None)
+        query_embedding = kwargs.pop("query_embedding", None)
+        results = await self.batched_vector_query([query_embedding], **kwargs)
+        for result in results[0]:
+            yield result
+
+    async def batched_vector_query(
+        self, query_embeddings: list[list[float]], **kwargs: Any
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Nearest-neighbour search for several query embeddings in a single
+        round trip: the embeddings are unnested into rows and each row runs
+        its own `ORDER BY ... LIMIT` through a lateral join. Returns one
+        result list per embedding, in input order.
+        """
         search_type = kwargs.get("search_type", "__Entity__")
         embedding_type = kwargs.get("embedding_type", "description_embedding")
         property_names = kwargs.get("property_names", ["name", "description"])
@@ -442,6 +544,9 @@ class PostgresKGHandler(KGHandler):
         entities_level = kwargs.get("entities_level", EntityLevel.DOCUMENT)
         limit = kwargs.get("limit", 10)
 
+        if not query_embeddings:
+            return []
+
         table_name = ""
         if search_type == "__Entity__":
             table_name = (
@@ -456,12 +561,18 @@ class PostgresKGHandler(KGHandler):
         else:
             raise ValueError(f"Invalid search type: {search_type}")
 
-        property_names_str = ", ".join(property_names)
+        property_names_str = ", ".join(f"r.{name}" for name in property_names)
 
         collection_ids_dict = filters.get("collection_ids", {})
         filter_query = ""
+        filter_column: Optional[str] = None
+        params: list[Any] = [
+            [str(embedding) for embedding in query_embeddings],
+            limit,
+        ]
         if collection_ids_dict:
             filter_query = "WHERE collection_id = ANY($3)"
+            filter_column = "collection_id"
             filter_ids = collection_ids_dict["$overlap"]
 
             if (
@@ -472,36 +583,167 @@ class PostgresKGHandler(KGHandler):
 
             elif search_type in ["__Entity__", "__Relationship__"]:
                 filter_query = "WHERE document_id = ANY($3)"
+                filter_column = "document_id"
                 # TODO - This seems like a hack, we will need a better way to filter by collection ids for entities and relationships
-                query = f"""
-                    SELECT distinct document_id FROM {self._get_table_name('document_info')} WHERE $1 = ANY(collection_ids)
-                """
-                filter_ids = [
-                    doc_id["document_id"]
-                    for doc_id in await self.connection_manager.fetch_query(
-                        query, filter_ids
-                    )
-                ]
+                filter_ids = await self.collection_handler.get_document_ids_for_collections(
+                    filter_ids
+                )
                 logger.info(f"Searching in document ids: {filter_ids}")
+            params.append(filter_ids)
 
+        vector_type = _decorate_vector_type(
+            f"({self.dimension})", self.quantization_type
+        )
         QUERY = f"""
-            SELECT {property_names_str} FROM {self._get_table_name(table_name)} {filter_query} ORDER BY {embedding_type} <=> $1 LIMIT $2;
+            SELECT q.idx, {property_names_str}
+            FROM unnest($1::text[]) WITH ORDINALITY AS q(embedding, idx)
+            CROSS JOIN LATERAL (
+                SELECT {", ".join(property_names)},
+                    {embedding_type} <=> q.embedding::{vector_type} AS distance
+                FROM {self._get_table_name(table_name)}
+                {filter_query}
+                ORDER BY distance
+                LIMIT $2
+            ) r
+            ORDER BY q.idx, r.distance;
         """
 
-        if filter_query != "":
-            results = await self.connection_manager.fetch_query(
-                QUERY, (str(query_embedding), limit, filter_ids)
+        settings = await self._plan_vector_search(
+            table_name,
+            filter_column=filter_column,
+            num_filter_values=len(params[2]) if filter_column else 0,
+            limit=limit,
+            ef_search=kwargs.get("ef_search", 40),
+            probes=kwargs.get("probes", 10),
+        )
+        async with self.connection_manager.get_connection(
+            read_only=True, query_name="kg_vector_query"
+        ) as conn:
+            async with conn.transaction():
+                for name, value in settings.items():
+                    await conn.execute(f"SET LOCAL {name} = {value}")
+                rows = await conn.fetch(QUERY, *params)
+
+        results: list[list[dict[str, Any]]] = [[] for _ in query_embeddings]
+        for row in rows:
+            results[row["idx"] - 1].append(
+                {
+                    property_name: row[property_name]
+                    for property_name in property_names
+                }
             )
-        else:
-            results = await self.connection_manager.fetch_query(
-                QUERY, (str(query_embedding), limit)
+        return results
+
+    async def _get_pgvector_version(self) -> tuple[int, ...]:
+        if self._pgvector_version is None:
+            row = await self.connection_manager.fetchrow_query(
+                "SELECT extversion FROM pg_extension WHERE extname = 'vector'",
+                read_only=True,
+                query_name="kg_pgvector_version",
             )
+            self._pgvector_version = tuple(
+                int(part)
+                for part in (row["extversion"] if row else "0").split(".")
+                if part.isdigit()
+            )
+        return self._pgvector_version
 
-        for result in results:
-            yield {
-                property_name: result[property_name]
-                for property_name in property_names
-            }
+    async def _estimate_filter_selectivity(
+        self, table_name: str, column: str, num_values: int
+    ) -> float:
+        """
+        Estimates the fraction of rows of `table_name` whose `column` takes
+        one of `num_values` values, from the planner statistics rather than
+        by scanning the table. Tables that were never analyzed count as
+        unfiltered.
+        """
+        # Keyed by project too, as one handler serves every tenant schema
+        key = (self.project_name, table_name, column)
+        cached = self._filter_stats_cache.get(key)
+        if (
+            cached is None
+            or time.monotonic() - cached[0] >= self.FILTER_STATS_CACHE_TTL
+        ):
+            query = """
+                SELECT c.reltuples, s.n_distinct
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                LEFT JOIN pg_stats s ON s.schemaname = n.nspname
+                    AND s.tablename = c.relname
+                    AND s.attname = $3
+                WHERE n.nspname = $1 AND c.relname = $2
+            """
+            row = await self.connection_manager.fetchrow_query(
+                query,
+                [self.project_name, table_name, column],
+                read_only=True,
+                query_name="kg_filter_stats",
+            )
+            reltuples = float(row["reltuples"]) if row else 0.0
+            n_distinct = (
+                float(row["n_distinct"])
+                if row and row["n_distinct"] is not None
+                else 0.0
+            )
+            # A negative `n_distinct` is a fraction of the row count
+            distinct = (
+                -n_distinct * reltuples if n_distinct < 0 else n_distinct
+            )
+            cached = (time.monotonic(), reltuples, distinct)
+            self._filter_stats_cache[key] = cached
+
+        _, reltuples, distinct = cached
+        if reltuples <= 0 or distinct <= 0:
+            return 1.0
+        return min(num_values / distinct, 1.0)
+
+    async def _plan_vector_search(
+        self,
+        table_name: str,
+        filter_column: Optional[str],
+        num_filter_values: int,
+        limit: int,
+        ef_search: int,
+        probes: int,
+    ) -> dict[str, Any]:
+        """
+        Chooses the ANN index parameters for one search, applied with
+        `SET LOCAL`. An HNSW scan yields at most `hnsw.ef_search` rows before
+        the filter is applied, so a selective filter would otherwise return
+        fewer than `limit` results. pgvector 0.8 and later keep scanning the
+        index until enough rows pass the filter; older versions get a wider
+        candidate list instead.
+        """
+        ef_search = min(max(ef_search, limit), self.MAX_EF_SEARCH)
+        settings: dict[str, Any] = {}
+
+        selectivity = 1.0
+        if filter_column is not None:
+            selectivity = await self._estimate_filter_selectivity(
+                table_name, filter_column, num_filter_values
+            )
+        if selectivity < 1.0:
+            # rows the index has to produce to find `limit` matches
+            fraction = max(selectivity, 1e-6)
+            expected_scan = math.ceil(limit / fraction)
+            probes = min(math.ceil(probes / fraction), self.MAX_EF_SEARCH)
+            if await self._get_pgvector_version() >= (0, 8):
+                settings["hnsw.iterative_scan"] = "strict_order"
+                settings["hnsw.max_scan_tuples"] = min(
+                    max(self.MIN_SCAN_TUPLES, 2 * expected_scan),
+                    self.MAX_SCAN_TUPLES,
+                )
+            else:
+                ef_search = min(
+                    max(ef_search, expected_scan), self.MAX_EF_SEARCH
+                )
+
+        settings["hnsw.ef_search"] = int(ef_search)
+        settings["ivfflat.probes"] = int(probes)
+        logger.debug(
+            f"KG vector search on {table_name} with filter selectivity {selectivity:.4f}: {settings}"
+        )
+        return settings
 
     async def get_all_triples(
         self, collection_id: UUID, document_ids: Optional[list[UUID]] = None
@@ -527,6 +769,41 @@ class PostgresKGHandler(KGHandler):
         )
         return [Triple(**triple) for triple in triples]
 
+    async def get_triple_graph(
+        self,
+        collection_id: UUID,
+        document_ids: Optional[list[UUID]] = None,
+        fetch_size: int = 50_000,
+    ) -> TripleGraph:
+        """
+        Loads the collection's triples as an integer-encoded edge list,
+        streaming rows through a server-side cursor instead of building a
+        `Triple` per row.
+        """
+        if document_ids is None:
+            QUERY = f"""
+                select distinct document_id from {self._get_table_name("document_info")} where $1 = ANY(collection_ids)
+            """
+            document_ids = [
+                row["document_id"]
+                for row in await self.connection_manager.fetch_query(
+                    QUERY, [collection_id], query_name="kg_triple_graph"
+                )
+            ]
+
+        QUERY = f"""
+            SELECT id, subject, object, weight FROM {self._get_table_name("chunk_triple")} WHERE document_id = ANY($1)
+        """
+        builder = TripleGraph.builder()
+        async with self.connection_manager.get_connection(
+            query_name="kg_triple_graph"
+        ) as conn:
+            async with conn.transaction():
+                cursor = await conn.cursor(QUERY, document_ids)
+                while rows := await cursor.fetch(fetch_size):
+                    builder.add_rows(rows)
+        return builder.build()
+
     async def add_community_info(
         self, communities: list[CommunityInfo]
     ) -> None:
@@ -629,34 +906,37 @@ class PostgresKGHandler(KGHandler):
             """
 
         await self.connection_manager.execute_many(
-            QUERY, [tuple(non_null_attrs.values())]
+            QUERY,
+            [tuple(non_null_attrs.values())],
+            query_name="kg_add_community_report",
         )
 
     async def _create_graph_and_cluster(
-        self, triples: list[Triple], leiden_params: dict[str, Any]
+        self,
+        triples: Union[list[Triple], TripleGraph],
+        leiden_params: dict[str, Any],
+        timings: Optional[dict[str, dict[str, float]]] = None,
     ) -> Any:
 
-        G = self.nx.Graph()
-        for triple in triples:
-            G.add_edge(
-                triple.subject,
-                triple.object,
-                weight=triple.weight,
-                id=triple.id,
-            )
+        graph = (
+            triples
+            if isinstance(triples, TripleGraph)
+            else TripleGraph.from_triples(triples)
+        )
 
         hierarchical_communities = await self._compute_leiden_communities(
-            G, leiden_params
+            graph, leiden_params, timings
         )
 
         return hierarchical_communities
 
     async def _cluster_and_add_community_info(
         self,
-        triples: list[Triple],
+        triples: Union[list[Triple], TripleGraph],
         triple_ids_cache: dict[str, list[int]],
         leiden_params: dict[str, Any],
         collection_id: UUID,
+        timings: Optional[dict[str, dict[str, float]]] = None,
     ) -> int:
 
         # clear if there is any old information
@@ -673,7 +953,7 @@ class PostgresKGHandler(KGHandler):
         start_time = time.time()
 
         hierarchical_communities = await self._create_graph_and_cluster(
-            triples, leiden_params
+            triples, leiden_params, timings
         )
 
         logger.info(
@@ -701,7 +981,8 @@ class PostgresKGHandler(KGHandler):
             for item in hierarchical_communities
         ]
 
-        await self.add_community_info(inputs)
+        with clustering_stage("store_communities", timings or {}):
+            await self.add_community_info(inputs)
 
         num_communities = (
             max([item.cluster for item in hierarchical_communities]) + 1
@@ -713,9 +994,7 @@ class PostgresKGHandler(KGHandler):
 
         return num_communities
 
-    async def _use_community_cache(
-        self, collection_id: UUID, triple_ids_cache: dict[str, list[int]]
-    ) -> bool:
+    async def _use_community_cache(self, collection_id: UUID) -> bool:
 
         # check if status is enriched or stale
         QUERY = f"""
@@ -729,141 +1008,177 @@ class PostgresKGHandler(KGHandler):
         if status == KGEnrichmentStatus.PENDING:
             return False
 
-        # check the number of entities in the cache.
+        # incremental clustering only needs a previous assignment to seed from
         QUERY = f"""
-            SELECT COUNT(distinct node) FROM {self._get_table_name("community_info")} WHERE collection_id = $1
+            SELECT EXISTS (
+                SELECT 1 FROM {self._get_table_name("community_info")} WHERE collection_id = $1
+            )
         """
-        num_entities = (
+        return (
             await self.connection_manager.fetchrow_query(
                 QUERY, [collection_id]
             )
-        )["count"]
-
-        # a hard threshold of 80% of the entities in the cache.
-        if num_entities > 0.8 * len(triple_ids_cache):
-            return True
-        else:
-            return False
-
-    async def _get_triple_ids_cache(
-        self, triples: list[Triple]
-    ) -> dict[str, list[int]]:
-
-        # caching the triple ids
-        triple_ids_cache = dict[str, list[int]]()
-        for triple in triples:
-            if (
-                triple.subject not in triple_ids_cache
-                and triple.subject is not None
-            ):
-                triple_ids_cache[triple.subject] = []
-            if (
-                triple.object not in triple_ids_cache
-                and triple.object is not None
-            ):
-                triple_ids_cache[triple.object] = []
-            if triple.subject is not None and triple.id is not None:
-                triple_ids_cache[triple.subject].append(triple.id)
-            if triple.object is not None and triple.id is not None:
-                triple_ids_cache[triple.object].append(triple.id)
-
-        return triple_ids_cache
+        )["exists"]
 
     async def _incremental_clustering(
         self,
+        graph: TripleGraph,
         triple_ids_cache: dict[str, list[int]],
         leiden_params: dict[str, Any],
         collection_id: UUID,
+        timings: Optional[dict[str, dict[str, float]]] = None,
     ) -> int:
         """
-        Performs incremental clustering on new triples by:
-        1. Getting all triples and new triples
-        2. Getting community mapping for all existing triples
-        3. For each new triple:
-            - Check if subject/object exists in community mapping
-            - If exists, add its cluster to updated communities set
-            - If not, append triple to new_triple_ids list for clustering
-        4. Run hierarchical clustering on new_triple_ids list
-        5. Update community info table with new clusters, offsetting IDs by max_cluster_id
-        """
-
-        QUERY = f"""
-            SELECT node, cluster, is_final_cluster FROM {self._get_table_name("community_info")} WHERE collection_id = $1
+        Re-clusters only the part of the graph that changed since the last
+        clustering, keeping community numbers stable:
+        1. Nodes whose triples changed (new, removed or rewired) are found by
+           comparing `triple_ids_cache` to the persisted `community_info`
+        2. Every top-level community containing such a node is re-clustered
+           together with the new nodes, seeded with the persisted top-level
+           assignment through Leiden's `starting_communities`
+        3. New clusters inherit the number of the old community they overlap
+           most, unmatched clusters get fresh numbers
+        4. Reports are deleted only for communities whose nodes or triples
+           changed, so only those are summarized again
         """
+        timings = {} if timings is None else timings
 
-        communities = await self.connection_manager.fetch_query(
-            QUERY, [collection_id]
-        )
-        max_cluster_id = max(
-            [community["cluster"] for community in communities]
-        )
-
-        # TODO: modify above query to get a dict grouped by node (without aggregation)
-        communities_dict = {}  # type: ignore
-        for community in communities:
-            if community["node"] not in communities_dict:
-                communities_dict[community["node"]] = []
-            communities_dict[community["node"]].append(community)
+        with clustering_stage("load_communities", timings):
+            QUERY = f"""
+                SELECT node, cluster, parent_cluster, level, is_final_cluster, triple_ids
+                FROM {self._get_table_name("community_info")}
+                WHERE collection_id = $1
+            """
+            rows = await self.connection_manager.fetch_query(
+                QUERY, [collection_id]
+            )
 
-        QUERY = f"""
-            SELECT document_id FROM {self._get_table_name("document_info")} WHERE $1 = ANY(collection_ids) and kg_extraction_status = $2
-        """
+        rows_by_node: dict[str, list[Any]] = {}
+        top_level: dict[int, set[str]] = {}
+        for row in rows:
+            rows_by_node.setdefault(row["node"], []).append(row)
+            if row["level"] == 0:
+                top_level.setdefault(row["cluster"], set()).add(row["node"])
+        next_id = max(row["cluster"] for row in rows) + 1
+
+        persisted_triple_ids = {
+            node: set(node_rows[0]["triple_ids"])
+            for node, node_rows in rows_by_node.items()
+        }
+        changed_nodes = {
+            node
+            for node in set(triple_ids_cache) | set(persisted_triple_ids)
+            if set(triple_ids_cache.get(node, []))
+            != persisted_triple_ids.get(node, set())
+        }
+        if not changed_nodes:
+            logger.info(
+                f"No triples changed in collection {collection_id}, keeping existing communities."
+            )
+            return next_id
+
+        # whole top-level communities are replaced, so the hierarchy below
+        # them never mixes old and new cluster ids
+        replaced_nodes = set(changed_nodes)
+        for node in changed_nodes:
+            for row in rows_by_node.get(node, []):
+                if row["level"] == 0:
+                    replaced_nodes |= top_level[row["cluster"]]
+        affected_nodes = {
+            node for node in replaced_nodes if node in triple_ids_cache
+        }
 
-        new_document_ids = await self.connection_manager.fetch_query(
-            QUERY, [collection_id, KGExtractionStatus.SUCCESS]
+        logger.info(
+            f"Incremental clustering: {len(changed_nodes)} changed nodes, re-clustering {len(affected_nodes)} of {len(triple_ids_cache)} nodes."
         )
 
-        new_triple_ids = await self.get_all_triples(
-            collection_id, new_document_ids
+        starting_communities = {
+            row["node"]: row["cluster"]
+            for node in affected_nodes
+            for row in rows_by_node.get(node, [])
+            if row["level"] == 0
+        }
+        clustered = await self._create_graph_and_cluster(
+            graph.subgraph(affected_nodes),
+            {**leiden_params, "starting_communities": starting_communities},
+            timings,
         )
 
-        # community mapping for new triples
-        updated_communities = set()
-        new_triples = []
-        for triple in new_triple_ids:
-            # bias towards subject
-            if triple.subject in communities_dict:
-                for community in communities_dict[triple.subject]:
-                    updated_communities.add(community["cluster"])
-            elif triple.object in communities_dict:
-                for community in communities_dict[triple.object]:
-                    updated_communities.add(community["cluster"])
-            else:
-                new_triples.append(triple)
+        previous: dict[int, tuple[int, set[str]]] = {}
+        for node in replaced_nodes:
+            for row in rows_by_node.get(node, []):
+                _, members = previous.setdefault(
+                    row["cluster"], (row["level"], set())
+                )
+                members.add(node)
+        mapping = match_community_ids(previous, clustered, next_id)
 
-        # delete the communities information for the updated communities
-        QUERY = f"""
-            DELETE FROM {self._get_table_name("community_report")} WHERE collection_id = $1 AND community_number = ANY($2)
-        """
-        await self.connection_manager.execute_query(
-            QUERY, [collection_id, updated_communities]
-        )
+        community_info = [
+            CommunityInfo(
+                node=item.node,
+                cluster=mapping[item.cluster],
+                parent_cluster=(
+                    mapping[item.parent_cluster]
+                    if item.parent_cluster is not None
+                    else None
+                ),
+                level=item.level,
+                is_final_cluster=item.is_final_cluster,
+                triple_ids=triple_ids_cache.get(item.node, []),
+                collection_id=collection_id,
+            )
+            for item in clustered
+        ]
 
-        hierarchical_communities_output = await self._create_graph_and_cluster(
-            new_triples, leiden_params
+        # nodes whose edges all lead outside the re-clustered communities
+        # drop out of the subgraph; they keep their previous assignment
+        clustered_nodes = {item.node for item in clustered}
+        community_info.extend(
+            CommunityInfo(
+                node=node,
+                cluster=row["cluster"],
+                parent_cluster=row["parent_cluster"],
+                level=row["level"],
+                is_final_cluster=row["is_final_cluster"],
+                triple_ids=triple_ids_cache[node],
+                collection_id=collection_id,
+            )
+            for node in affected_nodes - clustered_nodes
+            for row in rows_by_node.get(node, [])
         )
 
-        community_info = []
-        for community in hierarchical_communities_output:
-            community_info.append(
-                CommunityInfo(
-                    node=community.node,
-                    cluster=community.cluster + max_cluster_id,
-                    parent_cluster=(
-                        community.parent_cluster + max_cluster_id
-                        if community.parent_cluster is not None
-                        else None
-                    ),
-                    level=community.level,
-                    triple_ids=[],  # FIXME: need to get the triple ids for the community
-                    is_final_cluster=community.is_final_cluster,
-                    collection_id=collection_id,
-                )
+        current: dict[int, set[str]] = {}
+        for info in community_info:
+            current.setdefault(info.cluster, set()).add(info.node)
+        changed_communities = []
+        for cluster in set(previous) | set(current):
+            _, previous_members = previous.get(cluster, (None, set()))
+            members = current.get(cluster, set())
+            if previous_members != members or members & changed_nodes:
+                changed_communities.append(cluster)
+
+        with clustering_stage("store_communities", timings):
+            QUERY = f"""
+                DELETE FROM {self._get_table_name("community_info")} WHERE collection_id = $1 AND node = ANY($2)
+            """
+            await self.connection_manager.execute_query(
+                QUERY, [collection_id, list(replaced_nodes)]
             )
+            if community_info:
+                await self.add_community_info(community_info)
 
-        await self.add_community_info(community_info)
-        num_communities = max([item.cluster for item in community_info]) + 1
-        return num_communities
+            QUERY = f"""
+                DELETE FROM {self._get_table_name("community_report")} WHERE collection_id = $1 AND community_number = ANY($2)
+            """
+            await self.connection_manager.execute_query(
+                QUERY, [collection_id, changed_communities]
+            )
+
+        logger.info(
+            f"Incremental clustering updated {len(changed_communities)} communities in collection {collection_id}."
+        )
+
+        return max([next_id - 1, *mapping.values()]) + 1
 
     async def perform_graph_clustering(
         self,
@@ -888,52 +1203,118 @@ class PostgresKGHandler(KGHandler):
         """
 
         start_time = time.time()
+        timings: dict[str, dict[str, float]] = {}
 
-        triples = await self.get_all_triples(collection_id)
+        with clustering_stage("load_triples", timings):
+            graph = await self.get_triple_graph(collection_id)
 
-        logger.info(f"Clustering with settings: {leiden_params}")
+        logger.info(
+            f"Clustering {len(graph)} triples over {len(graph.nodes)} nodes with settings: {leiden_params}"
+        )
 
-        triple_ids_cache = await self._get_triple_ids_cache(triples)
+        with clustering_stage("index_triple_ids", timings):
+            triple_ids_cache = graph.triple_ids_by_node()
 
-        if await self._use_community_cache(collection_id, triple_ids_cache):
+        if await self._use_community_cache(collection_id):
             num_communities = await self._incremental_clustering(
-                triple_ids_cache, leiden_params, collection_id
+                graph, triple_ids_cache, leiden_params, collection_id, timings
             )
         else:
             num_communities = await self._cluster_and_add_community_info(
-                triples, triple_ids_cache, leiden_params, collection_id
+                graph, triple_ids_cache, leiden_params, collection_id, timings
             )
 
+        logger.info(
+            f"Graph clustering finished in {time.time() - start_time:.2f} seconds, stages: {timings}"
+        )
+
         return num_communities
 
     async def _compute_leiden_communities(
         self,
-        graph: Any,
+        graph: TripleGraph,
         leiden_params: dict[str, Any],
+        timings: Optional[dict[str, dict[str, float]]] = None,
     ) -> Any:
-        """Compute Leiden communities."""
-        try:
-            from graspologic.partition import hierarchical_leiden
+        """Compute Leiden communities in a worker process."""
+        if "random_seed" not in leiden_params:
+            leiden_params["random_seed"] = (
+                7272  # add seed to control randomness
+            )
 
-            if "random_seed" not in leiden_params:
-                leiden_params["random_seed"] = (
-                    7272  # add seed to control randomness
-                )
+        start_time = time.time()
+        logger.info(f"Running Leiden clustering with params: {leiden_params}")
 
-            start_time = time.time()
-            logger.info(
-                f"Running Leiden clustering with params: {leiden_params}"
-            )
+        community_mapping = await run_hierarchical_leiden(
+            graph, leiden_params, timings
+        )
 
-            community_mapping = hierarchical_leiden(graph, **leiden_params)
+        logger.info(
+            f"Leiden clustering completed in {time.time() - start_time:.2f} seconds."
+        )
+        return community_mapping
 
-            logger.info(
-                f"Leiden clustering completed in {time.time() - start_time:.2f} seconds."
+    async def _get_community_members(
+        self, collection_id: UUID, community_numbers: list[int]
+    ) -> dict[int, Tuple[list[Entity], list[Triple]]]:
+        """
+        Fetches the entities and triples of several communities, one query
+        for each.
+        """
+        # selecting table name based on entity level
+        # check if there are any entities in the community that are not in the entity_embedding table
+        QUERY = f"""
+            SELECT EXISTS (
+                SELECT 1 FROM {self._get_table_name("collection_entity")} WHERE collection_id = $1
             )
-            return community_mapping
+        """
+        has_collection_entities = (
+            await self.connection_manager.fetchrow_query(
+                QUERY, [collection_id]
+            )
+        )["exists"]
+        table_name = (
+            "collection_entity"
+            if has_collection_entities
+            else "document_entity"
+        )
+
+        members: dict[int, Tuple[list[Entity], list[Triple]]] = {
+            community_number: ([], [])
+            for community_number in community_numbers
+        }
 
-        except ImportError as e:
-            raise ImportError("Please install the graspologic package.") from e
+        QUERY = f"""
+            SELECT DISTINCT
+                ci.cluster AS cluster,
+                e.id AS id,
+                e.name AS name,
+                e.description AS description
+            FROM {self._get_table_name("community_info")} ci
+            JOIN {self._get_table_name(table_name)} e ON e.name = ci.node
+            WHERE ci.cluster = ANY($1) AND ci.collection_id = $2;
+        """
+        for row in await self.connection_manager.fetch_query(
+            QUERY, [community_numbers, collection_id]
+        ):
+            entity = dict(row)
+            members[entity.pop("cluster")][0].append(Entity(**entity))
+
+        QUERY = f"""
+            SELECT DISTINCT
+                ci.cluster AS cluster,
+                t.id, t.subject, t.predicate, t.object, t.weight, t.description
+            FROM {self._get_table_name("community_info")} ci
+            JOIN {self._get_table_name("chunk_triple")} t ON t.id = ANY(ci.triple_ids)
+            WHERE ci.cluster = ANY($1) AND ci.collection_id = $2;
+        """
+        for row in await self.connection_manager.fetch_query(
+            QUERY, [community_numbers, collection_id]
+        ):
+            triple = dict(row)
+            members[triple.pop("cluster")][1].append(Triple(**triple))
+
+        return members
 
     async def get_community_details(
         self, community_number: int, collection_id: UUID
@@ -943,59 +1324,107 @@ class PostgresKGHandler(KGHandler):
             SELECT level FROM {self._get_table_name("community_info")} WHERE cluster = $1 AND collection_id = $2
             LIMIT 1
         """
-        level = (
-            await self.connection_manager.fetch_query(
-                QUERY, [community_number, collection_id]
+        levels = await self.connection_manager.fetch_query(
+            QUERY,
+            [community_number, collection_id],
+            query_name="kg_community_details",
+        )
+        if not levels:
+            # incremental clustering retires the numbers of merged communities
+            raise R2RException(
+                f"Community {community_number} not found in collection {collection_id}.",
+                404,
             )
-        )[0]["level"]
+        level = levels[0]["level"]
 
-        # selecting table name based on entity level
-        # check if there are any entities in the community that are not in the entity_embedding table
-        query = f"""
-            SELECT COUNT(*) FROM {self._get_table_name("collection_entity")} WHERE collection_id = $1
-        """
-        entity_count = (
-            await self.connection_manager.fetch_query(query, [collection_id])
-        )[0]["count"]
-        table_name = (
-            "collection_entity" if entity_count > 0 else "document_entity"
-        )
+        entities, triples = (
+            await self._get_community_members(
+                collection_id, [community_number]
+            )
+        )[community_number]
 
+        return level, entities, triples
+
+    async def get_pending_community_details(
+        self, collection_id: UUID, offset: int, limit: int
+    ) -> list[Tuple[int, int, list[Entity], list[Triple]]]:
+        """
+        Returns `(community_number, level, entities, triples)` for the
+        communities that have no report yet among those ranked `offset` to
+        `offset + limit` in the whole collection, coarsest level first and
+        largest first within a level. The ranking covers reported
+        communities too, so it does not shift as reports are stored and
+        consecutive windows go down the hierarchy. Reports are stored as
+        soon as they are generated, so an interrupted summary run picks up
+        where it stopped.
+        """
         QUERY = f"""
-            WITH node_triple_ids AS (
-                SELECT node, triple_ids
-                FROM {self._get_table_name("community_info")}
-                WHERE cluster = $1 AND collection_id = $2
+            WITH ranked AS (
+                SELECT ci.cluster, MIN(ci.level) AS level, COUNT(*) AS size
+                FROM {self._get_table_name("community_info")} ci
+                WHERE ci.collection_id = $1
+                GROUP BY ci.cluster
+                ORDER BY level ASC, size DESC, ci.cluster ASC
+                OFFSET $2 LIMIT $3
             )
-            SELECT DISTINCT
-                e.id AS id,
-                e.name AS name,
-                e.description AS description
-            FROM node_triple_ids nti
-            JOIN {self._get_table_name(table_name)} e ON e.name = nti.node;
+            SELECT cluster, level, size
+            FROM ranked
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self._get_table_name("community_report")} r
+                WHERE r.collection_id = $1 AND r.community_number = ranked.cluster
+            )
+            ORDER BY level ASC, size DESC, cluster ASC
         """
-        entities = await self.connection_manager.fetch_query(
-            QUERY, [community_number, collection_id]
+        communities = await self.connection_manager.fetch_query(
+            QUERY,
+            [collection_id, offset, limit],
+            query_name="kg_pending_communities",
         )
-        entities = [Entity(**entity) for entity in entities]
+        if not communities:
+            return []
 
-        QUERY = f"""
-            WITH node_triple_ids AS (
-                SELECT node, triple_ids
-                FROM {self._get_table_name("community_info")}
-                WHERE cluster = $1 and collection_id = $2
+        members = await self._get_community_members(
+            collection_id, [community["cluster"] for community in communities]
+        )
+        return [
+            (
+                community["cluster"],
+                community["level"],
+                *members[community["cluster"]],
             )
-            SELECT DISTINCT
-                t.id, t.subject, t.predicate, t.object, t.weight, t.description
-            FROM node_triple_ids nti
-            JOIN {self._get_table_name("chunk_triple")} t ON t.id = ANY(nti.triple_ids);
+            for community in communities
+        ]
+
+    async def add_community_summary_tokens(
+        self, collection_id: UUID, tokens: int
+    ) -> int:
         """
-        triples = await self.connection_manager.fetch_query(
-            QUERY, [community_number, collection_id]
+        Adds to the tokens spent on community summaries in the current
+        enrichment run and returns the new total, shared by all summary
+        jobs of the collection.
+        """
+        QUERY = f"""
+            INSERT INTO {self._get_table_name("community_summary_progress")} (collection_id, tokens_used)
+            VALUES ($1, $2)
+            ON CONFLICT (collection_id) DO UPDATE
+            SET tokens_used = {self._get_table_name("community_summary_progress")}.tokens_used + EXCLUDED.tokens_used,
+                updated_at = NOW()
+            RETURNING tokens_used
+        """
+        result = await self.connection_manager.fetchrow_query(
+            QUERY,
+            [collection_id, tokens],
+            query_name="kg_community_summary_tokens",
         )
-        triples = [Triple(**triple) for triple in triples]
+        return result["tokens_used"]
 
-        return level, entities, triples
+    async def reset_community_summary_tokens(
+        self, collection_id: UUID
+    ) -> None:
+        QUERY = f"""
+            DELETE FROM {self._get_table_name("community_summary_progress")} WHERE collection_id = $1
+        """
+        await self.connection_manager.execute_query(QUERY, [collection_id])
 
     # async def client(self):
     #     return None
@@ -1154,6 +1583,77 @@ class PostgresKGHandler(KGHandler):
             )
         ]
 
+    async def stream_document_chunk_groups(
+        self,
+        document_id: UUID,
+        group_size: int = 1,
+        filter_out_existing_chunks: bool = True,
+        prefetch: int = 256,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        """
+        Yields the chunks of a document in `chunk_order`, `group_size` at a
+        time, for triples extraction. Chunks whose entities were already
+        extracted are dropped by an anti-join in SQL. Rows are read from the
+        primary, as ingestion may have written them moments ago, in keyset
+        pages of `prefetch` rows, so neither a connection nor a snapshot is
+        held while the caller waits on the LLM.
+        """
+        anti_join = ""
+        if filter_out_existing_chunks:
+            anti_join = f"""
+                AND NOT EXISTS (
+                    SELECT 1 FROM existing
+                    WHERE existing.extraction_id = v.extraction_id
+                )
+            """
+        QUERY = f"""
+            WITH existing AS (
+                SELECT DISTINCT unnest(extraction_ids) AS extraction_id
+                FROM {self._get_table_name("chunk_entity")}
+                WHERE document_id = $1
+            )
+            SELECT v.extraction_id, v.document_id, v.user_id,
+                v.collection_ids, v.text, v.metadata,
+                (v.metadata->>'chunk_order')::integer AS chunk_order
+            FROM {self._get_table_name("vectors")} v
+            WHERE v.document_id = $1
+            AND ((v.metadata->>'chunk_order')::integer, v.extraction_id)
+                > ($2, $3)
+            {anti_join}
+            ORDER BY (v.metadata->>'chunk_order')::integer, v.extraction_id
+            LIMIT $4
+        """
+
+        prefetch = max(prefetch, 1)
+        group: list[dict[str, Any]] = []
+        last_chunk_order, last_extraction_id = -(2**31), UUID(int=0)
+        while True:
+            rows = await self.connection_manager.fetch_query(
+                QUERY,
+                [document_id, last_chunk_order, last_extraction_id, prefetch],
+                query_name="kg_document_chunks",
+            )
+            for row in rows:
+                group.append(
+                    {
+                        "extraction_id": row["extraction_id"],
+                        "document_id": row["document_id"],
+                        "user_id": row["user_id"],
+                        "collection_ids": row["collection_ids"],
+                        "text": row["text"],
+                        "metadata": json.loads(row["metadata"]),
+                    }
+                )
+                if len(group) >= group_size:
+                    yield group
+                    group = []
+            if len(rows) < prefetch:
+                break
+            last_chunk_order = rows[-1]["chunk_order"]
+            last_extraction_id = rows[-1]["extraction_id"]
+        if group:
+            yield group
+
     async def get_creation_estimate(
         self, collection_id: UUID, kg_creation_settings: KGCreationSettings
     ) -> KGCreationEstimationResponse:
@@ -1307,10 +1807,183 @@ class PostgresKGHandler(KGHandler):
             + self._get_str_estimation_output(estimated_total_time),
         )
 
-    async def create_vector_index(self):
-        # need to implement this. Just call vector db provider's create_vector_index method.
-        # this needs to be run periodically for every collection.
-        raise NotImplementedError
+    def _get_vector_table(
+        self, table_name: VectorTableName
+    ) -> tuple[str, str]:
+        col_name = KG_VECTOR_COLUMNS.get(table_name)
+        if col_name is None:
+            raise ArgError("invalid table name")
+        return self._get_table_name(table_name), col_name
+
+    async def create_index(
+        self,
+        table_name: VectorTableName,
+        index_measure: IndexMeasure = IndexMeasure.cosine_distance,
+        index_method: IndexMethod = IndexMethod.auto,
+        index_arguments: Optional[
+            Union[IndexArgsIVFFlat, IndexArgsHNSW]
+        ] = None,
+        index_name: Optional[str] = None,
+        concurrently: bool = True,
+    ) -> None:
+        """
+        Creates an ANN index on the embedding column of a knowledge graph
+        table. Searches rank by cosine distance (`<=>`), so only a
+        `cosine_distance` index serves them; binary quantized embeddings
+        accept only hamming and jaccard indices, which they cannot use.
+
+        Raises:
+            ArgError: If the table, measure or index arguments are invalid
+            Exception: If index creation fails
+        """
+        table_name_str, col_name = self._get_vector_table(table_name)
+        validate_index_arguments(index_method, index_arguments)
+
+        if index_method == IndexMethod.auto:
+            index_method = IndexMethod.hnsw
+
+        binary_measures = (
+            IndexMeasure.hamming_distance,
+            IndexMeasure.jaccard_distance,
+        )
+        if self.quantization_type == VectorQuantizationType.INT1:
+            if index_measure not in binary_measures:
+                raise ArgError(
+                    "Binary vector indices support only hamming_distance and jaccard_distance."
+                )
+        elif index_measure in binary_measures:
+            raise ArgError(f"{index_measure} requires INT1 quantization.")
+
+        ops = index_measure_to_ops(index_measure, self.quantization_type)
+        concurrently_sql = "CONCURRENTLY" if concurrently else ""
+        index_name = (
+            index_name
+            or f"ix_{index_method}__{table_name}_{time.strftime('%Y%m%d%H%M%S')}"
+        )
+
+        query = f"""
+        CREATE INDEX {concurrently_sql} {index_name}
+        ON {table_name_str}
+        USING {index_method} ({col_name} {ops}) {index_options(index_method, index_arguments)};
+        """
+
+        try:
+            await execute_index_ddl(
+                self.connection_manager, query, concurrently
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create index: {e}")
+
+    async def list_indices(
+        self, table_name: VectorTableName
+    ) -> list[dict[str, Any]]:
+        """Lists the vector indices on a knowledge graph table."""
+        table_name_str, col_name = self._get_vector_table(table_name)
+        results = await self.connection_manager.fetch_query(
+            LIST_VECTOR_INDICES_QUERY, (table_name_str, f"%({col_name} %")
+        )
+        return [
+            {
+                "name": result["name"],
+                "definition": result["definition"],
+                "method": result["method"],
+                "size_in_bytes": result["size_in_bytes"],
+                "number_of_scans": result["number_of_scans"],
+                "tuples_read": result["tuples_read"],
+                "tuples_fetched": result["tuples_fetched"],
+            }
+            for result in results
+        ]
+
+    async def delete_index(
+        self,
+        index_name: str,
+        table_name: VectorTableName,
+        concurrently: bool = True,
+    ) -> None:
+        """
+        Deletes a vector index from a knowledge graph table.
+
+        Raises:
+            ArgError: If table name is invalid or index doesn't exist
+            Exception: If index deletion fails
+        """
+        table_name_str, _ = self._get_vector_table(table_name)
+        indices = await self.list_indices(table_name)
+        if index_name not in {index["name"] for index in indices}:
+            raise ArgError(
+                f"Vector index '{index_name}' does not exist on table {table_name_str}"
+            )
+
+        concurrently_sql = "CONCURRENTLY" if concurrently else ""
+        query = (
+            f"DROP INDEX {concurrently_sql} {self.project_name}.{index_name}"
+        )
+        try:
+            await execute_index_ddl(
+                self.connection_manager, query, concurrently
+            )
+        except Exception as e:
+            raise Exception(f"Failed to delete index: {e}")
+
+    async def create_vector_index(
+        self,
+        index_measure: Optional[IndexMeasure] = None,
+        index_method: IndexMethod = IndexMethod.hnsw,
+        index_arguments: Optional[
+            Union[IndexArgsIVFFlat, IndexArgsHNSW]
+        ] = None,
+        concurrently: bool = True,
+    ) -> list[str]:
+        """
+        Creates an ANN index on every knowledge graph embedding column that
+        does not have one yet, so it is safe to call after each graph
+        build. Defaults to cosine distance, the measure searches rank by.
+
+        Indexing is best effort: embeddings too wide for pgvector's indices,
+        and binary embeddings without an explicit measure, are left
+        unindexed, since no binary operator class serves `<=>`. Failures
+        are logged. Returns the tables that were indexed.
+        """
+        if index_measure is None:
+            if self.quantization_type == VectorQuantizationType.INT1:
+                logger.info(
+                    "Skipping knowledge graph vector indices: no binary index serves cosine distance searches."
+                )
+                return []
+            index_measure = IndexMeasure.cosine_distance
+
+        max_dimension = MAX_INDEX_DIMENSIONS.get(self.quantization_type)
+        if max_dimension is not None and self.dimension > max_dimension:
+            logger.warning(
+                f"Skipping knowledge graph vector indices: {self.quantization_type} embeddings of dimension {self.dimension} exceed the {max_dimension} dimensions pgvector can index."
+            )
+            return []
+
+        indexed = []
+        for table_name in KG_VECTOR_COLUMNS:
+            try:
+                if await self.list_indices(table_name):
+                    continue
+                await self.create_index(
+                    table_name,
+                    index_measure=index_measure,
+                    index_method=index_method,
+                    index_arguments=index_arguments,
+                    concurrently=concurrently,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to create a vector index on {table_name}: {e}"
+                )
+                continue
+            indexed.append(str(table_name))
+
+        if indexed:
+            logger.info(
+                f"Created {index_method} indices on {', '.join(indexed)} in {self.project_name}."
+            )
+        return indexed
 
     async def delete_triples(self, triple_ids: list[int]):
         # need to implement this.
@@ -1379,7 +2052,9 @@ class PostgresKGHandler(KGHandler):
             {pagination_clause}
             """
 
-        results = await self.connection_manager.fetch_query(query, params)
+        results = await self.connection_manager.fetch_query(
+            query, params, query_name="kg_get_entities"
+        )
         entities = [Entity(**entity) for entity in results]
 
         total_entries = await self.get_entity_count(
@@ -1388,6 +2063,127 @@ class PostgresKGHandler(KGHandler):
 
         return {"entities": entities, "total_entries": total_entries}
 
+    async def get_entity_embeddings(
+        self,
+        collection_id: UUID,
+        entity_table_name: str = "document_entity",
+        fetch_size: int = 10_000,
+        include_embeddings: bool = True,
+    ) -> Tuple[list[Entity], np.ndarray]:
+        """
+        Streams entities with a description embedding through a server-side
+        cursor, decoding embeddings straight into a float32 matrix whose rows
+        line up with the returned entities. Entities are ordered by id.
+        Without `include_embeddings` the matrix is left empty.
+        """
+        embedding_column = (
+            ", description_embedding::real[] AS embedding"
+            if include_embeddings
+            else ""
+        )
+        query = f"""
+            SELECT id, name, description, extraction_ids, document_id{embedding_column}
+            FROM {self._get_table_name(entity_table_name)}
+            WHERE document_id = ANY(
+                SELECT document_id FROM {self._get_table_name("document_info")}
+                WHERE $1 = ANY(collection_ids)
+            )
+            AND description_embedding IS NOT NULL
+            ORDER BY id
+        """
+        entities: list[Entity] = []
+        blocks: list[np.ndarray] = []
+        async with self.connection_manager.get_connection(
+            query_name="kg_entity_embeddings"
+        ) as conn:
+            async with conn.transaction():
+                cursor = await conn.cursor(query, collection_id)
+                while rows := await cursor.fetch(fetch_size):
+                    if include_embeddings:
+                        blocks.append(
+                            np.asarray(
+                                [row["embedding"] for row in rows],
+                                dtype=np.float32,
+                            )
+                        )
+                    entities.extend(
+                        Entity(
+                            id=row["id"],
+                            name=row["name"],
+                            description=row["description"],
+                            extraction_ids=row["extraction_ids"],
+                            document_id=row["document_id"],
+                        )
+                        for row in rows
+                    )
+
+        embeddings = (
+            np.concatenate(blocks)
+            if blocks
+            else np.empty((0, self.dimension), dtype=np.float32)
+        )
+        return entities, embeddings
+
+    async def get_entity_neighbours(
+        self,
+        collection_id: UUID,
+        entity_ids: list[int],
+        max_distance: float,
+        limit: int = 16,
+        entity_table_name: str = "document_entity",
+        ef_search: int = 40,
+    ) -> list[tuple[int, int]]:
+        """
+        Finds, through the ANN index on `description_embedding`, up to
+        `limit` entities of the collection near each of `entity_ids`, and
+        returns the `(entity_id, neighbour_id)` pairs within `max_distance`
+        cosine distance. The search is approximate; neighbours beyond the
+        `limit` nearest are missed.
+        """
+        if not entity_ids:
+            return []
+
+        document_ids = (
+            await self.collection_handler.get_document_ids_for_collections(
+                [collection_id]
+            )
+        )
+        table_name = self._get_table_name(entity_table_name)
+        query = f"""
+            SELECT e.id AS entity_id, n.id AS neighbour_id
+            FROM {table_name} e
+            CROSS JOIN LATERAL (
+                SELECT o.id,
+                    o.description_embedding <=> e.description_embedding AS distance
+                FROM {table_name} o
+                WHERE o.document_id = ANY($2)
+                ORDER BY distance
+                LIMIT $3
+            ) n
+            WHERE e.id = ANY($1)
+            AND n.id <> e.id
+            AND n.distance <= $4;
+        """
+
+        settings = await self._plan_vector_search(
+            entity_table_name,
+            filter_column="document_id",
+            num_filter_values=len(document_ids),
+            limit=limit,
+            ef_search=ef_search,
+            probes=10,
+        )
+        async with self.connection_manager.get_connection(
+            read_only=True, query_name="kg_entity_neighbours"
+        ) as conn:
+            async with conn.transaction():
+                for name, value in settings.items():
+                    await conn.execute(f"SET LOCAL {name} = {value}")
+                rows = await conn.fetch(
+                    query, entity_ids, document_ids, limit, max_distance
+                )
+        return [(row["entity_id"], row["neighbour_id"]) for row in rows]
+
     async def get_triples(
         self,
         collection_id: Optional[UUID] = None,
@@ -1437,7 +2233,9 @@ class PostgresKGHandler(KGHandler):
             {pagination_clause}
         """
 
-        triples = await self.connection_manager.fetch_query(query, params)
+        triples = await self.connection_manager.fetch_query(
+            query, params, query_name="kg_get_triples"
+        )
         triples = [Triple(**triple) for triple in triples]
         total_entries = await self.get_triple_count(
             collection_id=collection_id
@@ -0,0 +1,378 @@
+import asyncio
+import logging
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from core.base import Triple
+
+logger = logging.getLogger()
+
+
+def _peak_rss_mb() -> float:
+    # `ru_maxrss` is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextmanager
+def clustering_stage(name: str, timings: dict[str, dict[str, float]]):
+    """Records wall time and peak RSS of one clustering stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = {
+            "seconds": round(time.perf_counter() - start, 3),
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        }
+        logger.info(
+            f"Graph clustering stage `{name}` took {timings[name]['seconds']}s, peak RSS {timings[name]['peak_rss_mb']} MB."
+        )
+
+
+class TripleGraph:
+    """
+    Integer-encoded edge list of a knowledge graph: a node name dictionary
+    plus parallel NumPy columns for source, destination, weight and triple id.
+    """
+
+    def __init__(
+        self,
+        nodes: list[str],
+        src: np.ndarray,
+        dst: np.ndarray,
+        weight: np.ndarray,
+        triple_ids: np.ndarray,
+    ):
+        self.nodes = nodes
+        self.src = src
+        self.dst = dst
+        self.weight = weight
+        self.triple_ids = triple_ids
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    @classmethod
+    def builder(cls) -> "TripleGraphBuilder":
+        return TripleGraphBuilder()
+
+    @classmethod
+    def from_triples(cls, triples: Iterable[Triple]) -> "TripleGraph":
+        builder = cls.builder()
+        builder.add_rows(
+            (triple.id, triple.subject, triple.object, triple.weight)
+            for triple in triples
+        )
+        return builder.build()
+
+    def triple_ids_by_node(self) -> dict[str, list[int]]:
+        """Maps every node to the ids of the triples it takes part in."""
+        node_index = np.concatenate([self.src, self.dst])
+        ids = np.concatenate([self.triple_ids, self.triple_ids])
+        order = np.argsort(node_index, kind="stable")
+        node_index, ids = node_index[order], ids[order]
+        boundaries = np.flatnonzero(np.diff(node_index)) + 1
+        cache: dict[str, list[int]] = {node: [] for node in self.nodes}
+        for group in np.split(np.arange(len(node_index)), boundaries):
+            if not len(group):
+                continue
+            cache[self.nodes[node_index[group[0]]]] = [
+                int(triple_id) for triple_id in ids[group] if triple_id >= 0
+            ]
+        return cache
+
+    def subgraph(self, nodes: Iterable[str]) -> "TripleGraph":
+        """
+        Keeps the edges with both endpoints in `nodes`. The node dictionary
+        is shared, so clustering results decode to the same names.
+        """
+        index = {name: i for i, name in enumerate(self.nodes)}
+        keep = np.zeros(len(self.nodes), dtype=bool)
+        keep[[index[node] for node in nodes if node in index]] = True
+        mask = keep[self.src] & keep[self.dst]
+        return TripleGraph(
+            self.nodes,
+            self.src[mask],
+            self.dst[mask],
+            self.weight[mask],
+            self.triple_ids[mask],
+        )
+
+    def undirected_edges(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Collapses parallel and reversed edges the way `networkx.Graph` does,
+        keeping the weight of the last occurrence.
+        """
+        lo = np.minimum(self.src, self.dst).astype(np.int64)
+        hi = np.maximum(self.src, self.dst).astype(np.int64)
+        keys = lo * max(len(self.nodes), 1) + hi
+        # np.unique returns first occurrences, so search the reversed keys
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        return lo[last], hi[last], self.weight[last]
+
+
+class TripleGraphBuilder:
+    """Accumulates `(id, subject, object, weight)` rows in column chunks."""
+
+    def __init__(self, chunk_size: int = 65536):
+        self.chunk_size = chunk_size
+        self.node_ids: dict[str, int] = {}
+        self._chunks: list[tuple[np.ndarray, ...]] = []
+        self._pending: list[tuple[int, int, float, int]] = []
+
+    def _node(self, name: str) -> int:
+        node_id = self.node_ids.get(name)
+        if node_id is None:
+            node_id = self.node_ids[name] = len(self.node_ids)
+        return node_id
+
+    def add_rows(self, rows: Iterable[Any]) -> None:
+        for triple_id, subject, object, weight in rows:
+            if subject is None or object is None:
+                continue
+            self._pending.append(
+                (
+                    self._node(subject),
+                    self._node(object),
+                    1.0 if weight is None else weight,
+                    -1 if triple_id is None else triple_id,
+                )
+            )
+            if len(self._pending) >= self.chunk_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        src, dst, weight, ids = zip(*self._pending)
+        self._chunks.append(
+            (
+                np.asarray(src, dtype=np.int32),
+                np.asarray(dst, dtype=np.int32),
+                np.asarray(weight, dtype=np.float32),
+                np.asarray(ids, dtype=np.int64),
+            )
+        )
+        self._pending = []
+
+    def build(self) -> TripleGraph:
+        self._flush()
+        nodes = [""] * len(self.node_ids)
+        for name, node_id in self.node_ids.items():
+            nodes[node_id] = name
+        if not self._chunks:
+            empty_int = np.empty(0, dtype=np.int32)
+            return TripleGraph(
+                nodes,
+                empty_int,
+                empty_int,
+                np.empty(0, dtype=np.float32),
+                np.empty(0, dtype=np.int64),
+            )
+        columns = [
+            np.concatenate([chunk[i] for chunk in self._chunks])
+            for i in range(4)
+        ]
+        return TripleGraph(nodes, *columns)
+
+
+def _hierarchical_leiden_worker(
+    src: np.ndarray,
+    dst: np.ndarray,
+    weight: np.ndarray,
+    leiden_params: dict[str, Any],
+) -> tuple[list[tuple[int, int, Optional[int], int, bool]], float]:
+    """
+    Runs in a worker process. Nodes are passed as integers so that only the
+    three edge columns cross the process boundary.
+    """
+    try:
+        from graspologic.partition import hierarchical_leiden
+    except ImportError as e:
+        raise ImportError("Please install the graspologic package.") from e
+
+    edges = list(zip(src.tolist(), dst.tolist(), weight.tolist()))
+    communities = hierarchical_leiden(edges, **leiden_params)
+    return [
+        (
+            item.node,
+            item.cluster,
+            item.parent_cluster,
+            item.level,
+            item.is_final_cluster,
+        )
+        for item in communities
+    ], _peak_rss_mb()
+
+
+# Worker process shared by every clustering run, started on first use
+_leiden_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_leiden_executor() -> ProcessPoolExecutor:
+    global _leiden_executor
+    if _leiden_executor is None:
+        # Forking the multi-threaded server can copy a lock held by another
+        # thread into the child, so start the worker from a clean process
+        method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        _leiden_executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context(method)
+        )
+    return _leiden_executor
+
+
+def _discard_leiden_executor() -> None:
+    global _leiden_executor
+    if _leiden_executor is not None:
+        _leiden_executor.shutdown(wait=False, cancel_futures=True)
+        _leiden_executor = None
+
+
+class ClusteredNode:
+    """A node's community assignment at one level of the hierarchy."""
+
+    __slots__ = (
+        "node",
+        "cluster",
+        "parent_cluster",
+        "level",
+        "is_final_cluster",
+    )
+
+    def __init__(
+        self,
+        node: str,
+        cluster: int,
+        parent_cluster: Optional[int],
+        level: int,
+        is_final_cluster: bool,
+    ):
+        self.node = node
+        self.cluster = cluster
+        self.parent_cluster = parent_cluster
+        self.level = level
+        self.is_final_cluster = is_final_cluster
+
+
+async def run_hierarchical_leiden(
+    graph: TripleGraph,
+    leiden_params: dict[str, Any],
+    timings: Optional[dict[str, dict[str, float]]] = None,
+) -> list[ClusteredNode]:
+    """
+    Runs graspologic's `hierarchical_leiden` on `graph` in a worker process
+    so the event loop stays responsive. The worker is shared across runs,
+    which therefore queue behind each other, and its reported peak RSS
+    covers its whole lifetime. Falls back to a worker thread where process
+    pools are unavailable, e.g. AWS Lambda, which has no /dev/shm.
+    """
+    timings = {} if timings is None else timings
+    if not len(graph):
+        return []
+
+    if leiden_params.get("starting_communities"):
+        # The worker sees integer nodes, so translate the seeds as well
+        index = {name: i for i, name in enumerate(graph.nodes)}
+        leiden_params = {
+            **leiden_params,
+            "starting_communities": {
+                index[node]: cluster
+                for node, cluster in leiden_params[
+                    "starting_communities"
+                ].items()
+                if node in index
+            },
+        }
+
+    with clustering_stage("prepare_edges", timings):
+        src, dst, weight = graph.undirected_edges()
+
+    with clustering_stage("leiden", timings):
+        loop = asyncio.get_running_loop()
+        try:
+            raw, worker_peak_rss_mb = await loop.run_in_executor(
+                _get_leiden_executor(),
+                _hierarchical_leiden_worker,
+                src,
+                dst,
+                weight,
+                leiden_params,
+            )
+        except BrokenProcessPool:
+            # e.g. the worker was OOM-killed; start a fresh one next time
+            _discard_leiden_executor()
+            raise
+        except (OSError, NotImplementedError) as e:
+            logger.warning(
+                f"Process pool unavailable ({e}), running Leiden in a thread."
+            )
+            raw, worker_peak_rss_mb = await asyncio.to_thread(
+                _hierarchical_leiden_worker, src, dst, weight, leiden_params
+            )
+    timings["leiden"]["worker_peak_rss_mb"] = round(worker_peak_rss_mb, 1)
+
+    with clustering_stage("decode_communities", timings):
+        return [
+            ClusteredNode(
+                graph.nodes[node], cluster, parent_cluster, level, is_final
+            )
+            for node, cluster, parent_cluster, level, is_final in raw
+        ]
+
+
+def match_community_ids(
+    previous: dict[int, tuple[int, set[str]]],
+    clustered: list[ClusteredNode],
+    next_id: int,
+) -> dict[int, int]:
+    """
+    Maps the cluster ids of a fresh Leiden run onto persisted community ids
+    so that community numbers survive re-clustering.
+
+    `previous` holds `cluster -> (level, members)` for the communities being
+    replaced. New and old clusters on the same level are paired greedily by
+    the number of nodes they share; a new cluster that shares no node with a
+    remaining old one gets a fresh id from `next_id` on. Ids of old
+    communities that found no successor are retired rather than reused.
+    """
+    previous_by_member = {
+        (level, node): cluster
+        for cluster, (level, members) in previous.items()
+        for node in members
+    }
+    overlap: dict[tuple[int, int], int] = {}
+    new_clusters: dict[int, int] = {}
+    for item in clustered:
+        new_clusters[item.cluster] = item.level
+        old = previous_by_member.get((item.level, item.node))
+        if old is not None:
+            overlap[(item.cluster, old)] = (
+                overlap.get((item.cluster, old), 0) + 1
+            )
+
+    mapping: dict[int, int] = {}
+    matched: set[int] = set()
+    for (new, old), _ in sorted(
+        overlap.items(), key=lambda pair: (-pair[1], pair[0][1], pair[0][0])
+    ):
+        if new not in mapping and old not in matched:
+            mapping[new] = old
+            matched.add(old)
+
+    for new in sorted(new_clusters, key=lambda c: (new_clusters[c], c)):
+        if new not in mapping:
+            mapping[new] = next_id
+            next_id += 1
+    return mapping
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+
+from core.base import Entity, KGExtraction, Triple
+
+from .base import PostgresConnectionManager
+
+logger = logging.getLogger()
+
+
+def _jsonb(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+class PostgresKGBatchWriter:
+    """
+    Accumulates chunk-level entities and triples across KG extractions and
+    writes them with `COPY` once `flush_size` rows are pending.
+
+    Every row is encoded against a fixed column list, so rows with missing
+    optional attributes can no longer shift values into the wrong column.
+    """
+
+    ENTITY_COLUMNS = (
+        "category",
+        "name",
+        "description",
+        "extraction_ids",
+        "document_id",
+        "attributes",
+    )
+    TRIPLE_COLUMNS = (
+        "subject",
+        "predicate",
+        "object",
+        "weight",
+        "description",
+        "extraction_ids",
+        "document_id",
+        "attributes",
+    )
+
+    def __init__(
+        self,
+        project_name: str,
+        connection_manager: PostgresConnectionManager,
+        table_prefix: str = "chunk_",
+        flush_size: int = 5_000,
+    ):
+        self.project_name = project_name
+        self.connection_manager = connection_manager
+        self.entity_table = f"{table_prefix}entity"
+        self.triple_table = f"{table_prefix}triple"
+        self.flush_size = max(flush_size, 1)
+        self.total_entities = 0
+        self.total_relationships = 0
+        self._entities: list[tuple] = []
+        self._triples: list[tuple] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._entities) + len(self._triples)
+
+    @staticmethod
+    def _entity_record(entity: Entity, extraction: KGExtraction) -> tuple:
+        return (
+            entity.category,
+            entity.name,
+            entity.description,
+            entity.extraction_ids or extraction.extraction_ids,
+            entity.document_id or extraction.document_id,
+            _jsonb(entity.attributes),
+        )
+
+    @staticmethod
+    def _triple_record(triple: Triple, extraction: KGExtraction) -> tuple:
+        return (
+            triple.subject,
+            triple.predicate,
+            triple.object,
+            1.0 if triple.weight is None else triple.weight,
+            triple.description,
+            triple.extraction_ids or extraction.extraction_ids,
+            triple.document_id or extraction.document_id,
+            _jsonb(triple.attributes or {}),
+        )
+
+    async def add(self, extraction: KGExtraction) -> None:
+        """Buffers an extraction, flushing if the buffer is full."""
+        self._entities.extend(
+            self._entity_record(entity, extraction)
+            for entity in extraction.entities
+        )
+        self._triples.extend(
+            self._triple_record(triple, extraction)
+            for triple in extraction.triples
+        )
+        if self.pending >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Writes all buffered rows in a single transaction."""
+        async with self._lock:
+            entities, self._entities = self._entities, []
+            triples, self._triples = self._triples, []
+            if not entities and not triples:
+                return
+
+            async with self.connection_manager.get_connection(
+                query_name="kg_batch_writer"
+            ) as conn:
+                async with conn.transaction():
+                    if entities:
+                        await conn.copy_records_to_table(
+                            self.entity_table,
+                            records=entities,
+                            columns=self.ENTITY_COLUMNS,
+                            schema_name=self.project_name,
+                        )
+                    if triples:
+                        await conn.copy_records_to_table(
+                            self.triple_table,
+                            records=triples,
+                            columns=self.TRIPLE_COLUMNS,
+                            schema_name=self.project_name,
+                        )
+
+            self.total_entities += len(entities)
+            self.total_relationships += len(triples)
+            logger.debug(
+                f"Flushed {len(entities)} entities and {len(triples)} triples to {self.project_name}."
+            )
+
+    async def __aenter__(self) -> "PostgresKGBatchWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
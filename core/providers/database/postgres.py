@@ -15,6 +15,9 @@ from core.providers import BCryptProvider
 from core.providers.database.base import PostgresConnectionManager
 from core.providers.database.collection import PostgresCollectionHandler
 from core.providers.database.document import PostgresDocumentHandler
+from core.providers.database.embedding_cache import (
+    PostgresEmbeddingCacheHandler,
+)
 from core.providers.database.file import PostgresFileHandler
 from core.providers.database.kg import PostgresKGHandler
 from core.providers.database.logging import PostgresLoggingHandler
@@ -67,6 +70,7 @@ class PostgresDBProvider(DatabaseProvider):
     prompt_handler: PostgresPromptHandler
     file_handler: PostgresFileHandler
     logging_handler: PostgresLoggingHandler
+    embedding_cache_handler: PostgresEmbeddingCacheHandler
 
     def __init__(
         self,
@@ -119,9 +123,20 @@ class PostgresDBProvider(DatabaseProvider):
             self.connection_string = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.db_name}"
             logger.info("Connecting to Postgres via TCP/IP")
 
+        # Search queries are routed to a read replica when one is configured
+        self.read_replica_host = os.getenv(
+            "R2R_POSTGRES_READ_REPLICA_HOST", config.read_replica_host
+        )
+        self.read_connection_string = (
+            f"postgresql://{self.user}:{self.password}@{self.read_replica_host}:{self.port}/{self.db_name}"
+            if self.read_replica_host
+            else None
+        )
+
         self.dimension = dimension
         self.quantization_type = quantization_type
         self.conn = None
+        self.read_pool: Optional[SemaphoreConnectionPool] = None
         self.config: DatabaseConfig = config
         self.crypto_provider = crypto_provider
         self.postgres_configuration_settings: PostgresConfigurationSettings = (
@@ -171,14 +186,27 @@ class PostgresDBProvider(DatabaseProvider):
         self.logging_handler = PostgresLoggingHandler(
             self.project_name, self.connection_manager
         )
+        self.embedding_cache_handler = PostgresEmbeddingCacheHandler(
+            self.project_name, self.connection_manager
+        )
 
     async def initialize(self):
         logger.info("Initializing `PostgresDBProvider`.")
         self.pool = SemaphoreConnectionPool(
-            self.connection_string, self.postgres_configuration_settings
+            self.connection_string,
+            self.postgres_configuration_settings,
+            self.connection_manager.metrics,
         )
         await self.pool.initialize()
-        await self.connection_manager.initialize(self.pool)
+        if self.read_connection_string:
+            logger.info("Routing search queries to the Postgres read replica")
+            self.read_pool = SemaphoreConnectionPool(
+                self.read_connection_string,
+                self.postgres_configuration_settings,
+                self.connection_manager.metrics,
+            )
+            await self.read_pool.initialize()
+        await self.connection_manager.initialize(self.pool, self.read_pool)
 
         async with self.pool.get_connection() as conn:
             await conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";')
@@ -200,6 +228,7 @@ class PostgresDBProvider(DatabaseProvider):
         await self.file_handler.create_tables()
         await self.kg_handler.create_tables()
         await self.logging_handler.create_tables()
+        await self.embedding_cache_handler.create_tables()
 
     def _get_postgres_configuration_settings(
         self, config: DatabaseConfig
@@ -224,12 +253,20 @@ class PostgresDBProvider(DatabaseProvider):
             "max_parallel_workers_per_gather": "R2R_POSTGRES_MAX_PARALLEL_WORKERS_PER_GATHER",
             "max_parallel_workers": "R2R_POSTGRES_MAX_PARALLEL_WORKERS",
             "max_parallel_maintenance_workers": "R2R_POSTGRES_MAX_PARALLEL_MAINTENANCE_WORKERS",
+            "min_connections": "R2R_POSTGRES_MIN_CONNECTIONS",
+            "max_inactive_connection_lifetime": "R2R_POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME",
+            "statement_cache_size": "R2R_POSTGRES_STATEMENT_CACHE_SIZE",
+            "max_cached_statement_lifetime": "R2R_POSTGRES_MAX_CACHED_STATEMENT_LIFETIME",
         }
 
         for setting, env_var in env_mapping.items():
             value = getattr(
                 config.postgres_configuration_settings, setting, None
-            ) or os.getenv(env_var)
+            )
+            # `0` is meaningful here, e.g. `statement_cache_size = 0` behind
+            # a transaction-mode pooler such as pgbouncer or RDS Proxy
+            if value is None or value == "":
+                value = os.getenv(env_var)
 
             if value is not None and value != "":
                 field_type = settings.__annotations__[setting]
@@ -242,9 +279,18 @@ class PostgresDBProvider(DatabaseProvider):
 
         return settings
 
+    def pool_stats(self) -> dict[str, Any]:
+        """
+        Returns pool sizes and the acquire-wait and query-latency histograms
+        collected per query name.
+        """
+        return self.connection_manager.pool_stats()
+
     async def close(self):
         if self.pool:
             await self.pool.close()
+        if self.read_pool:
+            await self.read_pool.close()
 
     async def __aenter__(self):
         await self.initialize()
@@ -118,10 +118,29 @@ class CacheablePromptHandler(PromptHandler):
         cache_ttl: Optional[timedelta] = timedelta(hours=1),
         max_cache_size: Optional[int] = 1000,
     ):
-        self._prompt_cache = Cache[str](ttl=cache_ttl, max_size=max_cache_size)
-        self._template_cache = Cache[dict](
-            ttl=cache_ttl, max_size=max_cache_size
-        )
+        self._cache_ttl = cache_ttl
+        self._max_cache_size = max_cache_size
+        # Prompts can be customised per project, so each gets its caches
+        self._project_caches: dict[str, tuple[Cache[str], Cache[dict]]] = {}
+
+    def _caches(self) -> tuple[Cache[str], Cache[dict]]:
+        caches = self._project_caches.get(self.project_name)
+        if caches is None:
+            caches = self._project_caches[self.project_name] = (
+                Cache[str](ttl=self._cache_ttl, max_size=self._max_cache_size),
+                Cache[dict](
+                    ttl=self._cache_ttl, max_size=self._max_cache_size
+                ),
+            )
+        return caches
+
+    @property
+    def _prompt_cache(self) -> Cache[str]:
+        return self._caches()[0]
+
+    @property
+    def _template_cache(self) -> Cache[dict]:
+        return self._caches()[1]
 
     def _cache_key(
         self, prompt_name: str, inputs: Optional[dict] = None
@@ -220,7 +239,14 @@ class PostgresPromptHandler(CacheablePromptHandler):
         )
         self.connection_manager = connection_manager
         self.project_name = project_name
-        self.prompts: dict[str, dict[str, Union[str, dict[str, str]]]] = {}
+        self._project_prompts: dict[
+            str, dict[str, dict[str, Union[str, dict[str, str]]]]
+        ] = {}
+
+    @property
+    def prompts(self) -> dict[str, dict[str, Union[str, dict[str, str]]]]:
+        """Prompts loaded for the current project."""
+        return self._project_prompts.setdefault(self.project_name, {})
 
     async def _load_prompts(self) -> None:
         """Load prompts from both database and YAML files."""
@@ -48,9 +48,28 @@ class PostgresTokenHandler(TokenHandler):
         WHERE token = $1
         LIMIT 1
         """
-        result = await self.connection_manager.fetchrow_query(query, [token])
+        result = await self.connection_manager.fetchrow_query(
+            query, [token], query_name="is_token_blacklisted"
+        )
         return bool(result)
 
+    async def get_blacklisted_tokens(
+        self, since: Optional[datetime] = None
+    ) -> list[tuple[str, datetime]]:
+        """Tokens blacklisted after `since`, or all of them, oldest first."""
+        query = f"""
+        SELECT token, blacklisted_at
+        FROM {self._get_table_name(PostgresTokenHandler.TABLE_NAME)}
+        {"" if since is None else "WHERE blacklisted_at > $1"}
+        ORDER BY blacklisted_at
+        """
+        results = await self.connection_manager.fetch_query(
+            query,
+            None if since is None else [since],
+            query_name="get_blacklisted_tokens",
+        )
+        return [(row["token"], row["blacklisted_at"]) for row in results]
+
     async def clean_expired_blacklisted_tokens(
         self,
         max_age_hours: int = 7 * 24,
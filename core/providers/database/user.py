@@ -69,7 +69,9 @@ class PostgresUserHandler(UserHandler):
             .where("user_id = $1")
             .build()
         )
-        result = await self.connection_manager.fetchrow_query(query, [user_id])
+        result = await self.connection_manager.fetchrow_query(
+            query, [user_id], query_name="get_user_by_id"
+        )
 
         if not result:
             raise R2RException(status_code=404, message="User not found")
@@ -111,7 +113,9 @@ class PostgresUserHandler(UserHandler):
             .where("email = $1")
             .build()
         )
-        result = await self.connection_manager.fetchrow_query(query, [email])
+        result = await self.connection_manager.fetchrow_query(
+            query, [email], query_name="get_user_by_email"
+        )
         if not result:
             raise R2RException(status_code=404, message="User not found")
 
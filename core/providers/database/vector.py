@@ -1,11 +1,11 @@
-import copy
+import asyncio
 import json
 import logging
 import time
-import uuid
-from typing import Any, Optional, Tuple, TypedDict, Union
-from uuid import UUID
+from typing import Any, Optional, Tuple, Union
+from uuid import UUID, uuid4
 
+import asyncpg
 import numpy as np
 
 from core.base import (
@@ -45,42 +45,217 @@ def index_measure_to_ops(
     return _decorate_vector_type(measure.ops, quantization_type)
 
 
+def index_options(
+    method: IndexMethod,
+    index_arguments: Optional[Union[IndexArgsIVFFlat, IndexArgsHNSW]],
+) -> str:
+    if method == IndexMethod.ivfflat:
+        if isinstance(index_arguments, IndexArgsIVFFlat):
+            return f"WITH (lists={index_arguments.n_lists})"
+        else:
+            # Default value if no arguments provided
+            return "WITH (lists=100)"
+    elif method == IndexMethod.hnsw:
+        if isinstance(index_arguments, IndexArgsHNSW):
+            return f"WITH (m={index_arguments.m}, ef_construction={index_arguments.ef_construction})"
+        else:
+            # Default values if no arguments provided
+            return "WITH (m=16, ef_construction=64)"
+    else:
+        return ""  # No options for other methods
+
+
+def validate_index_arguments(
+    index_method: IndexMethod,
+    index_arguments: Optional[Union[IndexArgsIVFFlat, IndexArgsHNSW]],
+) -> None:
+    if index_method not in (
+        IndexMethod.ivfflat,
+        IndexMethod.hnsw,
+        IndexMethod.auto,
+    ):
+        raise ArgError("invalid index method")
+
+    if index_arguments:
+        # Disallow case where user submits index arguments but uses the
+        # IndexMethod.auto index (index build arguments should only be
+        # used with a specific index)
+        if index_method == IndexMethod.auto:
+            raise ArgError(
+                "Index build parameters are not allowed when using the IndexMethod.auto index."
+            )
+        # Disallow case where user specifies one index type but submits
+        # index build arguments for the other index type
+        if (
+            isinstance(index_arguments, IndexArgsHNSW)
+            and index_method != IndexMethod.hnsw
+        ) or (
+            isinstance(index_arguments, IndexArgsIVFFlat)
+            and index_method != IndexMethod.ivfflat
+        ):
+            raise ArgError(
+                f"{index_arguments.__class__.__name__} build parameters were supplied but {index_method} index was specified."
+            )
+
+
+async def execute_index_ddl(
+    connection_manager: PostgresConnectionManager,
+    query: str,
+    concurrently: bool,
+) -> None:
+    """
+    Runs `CREATE/DROP INDEX`. The concurrent forms cannot run inside a
+    transaction block, so they go straight to a pooled connection.
+    """
+    if concurrently:
+        async with connection_manager.get_connection() as conn:
+            # Disable automatic transaction management
+            await conn.execute(
+                "SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL READ COMMITTED"
+            )
+            await conn.execute(query)
+    else:
+        # Non-concurrent index creation can use normal query execution
+        await connection_manager.execute_query(query)
+
+
+# Vector indices on the table `$1` whose definition matches the pattern `$2`
+LIST_VECTOR_INDICES_QUERY = """
+SELECT
+    i.indexname as name,
+    i.indexdef as definition,
+    am.amname as method,
+    pg_relation_size(c.oid) as size_in_bytes,
+    COALESCE(psat.idx_scan, 0) as number_of_scans,
+    COALESCE(psat.idx_tup_read, 0) as tuples_read,
+    COALESCE(psat.idx_tup_fetch, 0) as tuples_fetched
+FROM pg_indexes i
+JOIN pg_class c ON c.relname = i.indexname
+JOIN pg_am am ON c.relam = am.oid
+LEFT JOIN pg_stat_user_indexes psat ON psat.indexrelname = i.indexname
+    AND psat.schemaname = i.schemaname
+WHERE i.schemaname || '.' || i.tablename = $1
+AND i.indexdef LIKE $2;
+"""
+
+
+def quantize_vectors_to_binary(
+    vectors: Union[list[list[float]], np.ndarray], threshold: float = 0.0
+) -> list[asyncpg.BitString]:
+    """
+    Quantizes a batch of float vectors to packed bit strings for the
+    PostgreSQL bit type. Used when quantization_type is INT1.
+
+    Args:
+        vectors (Union[list[list[float]], np.ndarray]): An (N, dim) matrix of floats
+        threshold (float, optional): Threshold for binarization. Defaults to 0.0.
+
+    Returns:
+        list[asyncpg.BitString]: One packed bit string of length dim per vector
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+
+    # One bit per dimension (1 where value > threshold), packed 8 per byte
+    packed = np.packbits(matrix > threshold, axis=1)
+    dimension = matrix.shape[1]
+    return [
+        asyncpg.BitString.frombytes(row.tobytes(), dimension) for row in packed
+    ]
+
+
 def quantize_vector_to_binary(
     vector: Union[list[float], np.ndarray], threshold: float = 0.0
-) -> bytes:
+) -> asyncpg.BitString:
     """
-    Quantizes a float vector to a binary vector string for PostgreSQL bit type.
-    Used when quantization_type is INT1.
+    Quantizes a single float vector to a packed bit string for the
+    PostgreSQL bit type. Used when quantization_type is INT1.
 
     Args:
         vector (Union[List[float], np.ndarray]): Input vector of floats
         threshold (float, optional): Threshold for binarization. Defaults to 0.0.
 
     Returns:
-        str: Binary string representation for PostgreSQL bit type
+        asyncpg.BitString: Packed bit string of length dim
+    """
+    return quantize_vectors_to_binary([vector], threshold)[0]
+
+
+def reciprocal_rank_fusion(
+    semantic_ids: list[UUID],
+    full_text_ids: list[UUID],
+    semantic_limit: int,
+    full_text_limit: int,
+    semantic_weight: float,
+    full_text_weight: float,
+    rrf_k: int,
+) -> list[Tuple[UUID, int, int, float]]:
     """
-    # Convert input to numpy array if it isn't already
-    if not isinstance(vector, np.ndarray):
-        vector = np.array(vector)
+    Fuses two ranked id lists with weighted Reciprocal Rank Fusion.
 
-    # Convert to binary (1 where value > threshold, 0 otherwise)
-    binary_vector = (vector > threshold).astype(int)
+    Ids missing from one leg are assigned that leg's limit as their rank.
+    Scores are computed over NumPy rank arrays rather than per-row dicts.
 
-    # Convert to string of 1s and 0s
-    # Convert to string of 1s and 0s, then to bytes
-    binary_string = "".join(map(str, binary_vector))
-    return binary_string.encode("ascii")
+    Returns:
+        list[Tuple[UUID, int, int, float]]: (id, semantic_rank, full_text_rank,
+            rrf_score) tuples sorted by descending score.
+    """
+    ids = list(dict.fromkeys([*semantic_ids, *full_text_ids]))
+    if not ids:
+        return []
+
+    position = {id_: i for i, id_ in enumerate(ids)}
+    semantic_ranks = np.full(len(ids), semantic_limit, dtype=np.int64)
+    full_text_ranks = np.full(len(ids), full_text_limit, dtype=np.int64)
+    if semantic_ids:
+        semantic_ranks[[position[id_] for id_ in semantic_ids]] = np.arange(
+            1, len(semantic_ids) + 1
+        )
+    if full_text_ids:
+        full_text_ranks[[position[id_] for id_ in full_text_ids]] = (
+            np.arange(1, len(full_text_ids) + 1)
+        )
+
+    keep = (semantic_ranks <= semantic_limit * 2) & (
+        full_text_ranks <= full_text_limit * 2
+    )
+    scores = (
+        semantic_weight / (rrf_k + semantic_ranks)
+        + full_text_weight / (rrf_k + full_text_ranks)
+    ) / (semantic_weight + full_text_weight)
+
+    # Stable sort keeps semantic results ahead of ties, as before
+    order = [i for i in np.argsort(-scores, kind="stable") if keep[i]]
+    return [
+        (
+            ids[i],
+            int(semantic_ranks[i]),
+            int(full_text_ranks[i]),
+            float(scores[i]),
+        )
+        for i in order
+    ]
 
 
-class HybridSearchIntermediateResult(TypedDict):
-    semantic_rank: int
-    full_text_rank: int
-    data: VectorSearchResult
-    rrf_score: float
+def encode_vector_binary(vector: Union[list[float], np.ndarray]) -> bytes:
+    """
+    Encodes a float vector in the pgvector binary wire format, which is a
+    big-endian uint16 dimension, a reserved uint16 and the float4 values.
+    """
+    values = np.asarray(vector, dtype=">f4")
+    return (
+        np.array([values.shape[0], 0], dtype=">u2").tobytes()
+        + values.tobytes()
+    )
 
 
 class PostgresVectorHandler(VectorHandler):
     TABLE_NAME = VectorTableName.VECTORS
+    DOCUMENT_SEARCH_TABLE_NAME = "document_search_index"
+    # Bytes of distinct lexemes kept in a document's body tsvector.
+    # PostgreSQL rejects tsvectors whose lexemes add up to 1MB or more
+    DOCUMENT_SEARCH_MAX_LEXEME_BYTES = 1_000_000
 
     COLUMN_VARS = [
         "extraction_id",
@@ -101,6 +276,9 @@ class PostgresVectorHandler(VectorHandler):
         self.dimension = dimension
         self.quantization_type = quantization_type
         self.enable_fts = enable_fts
+        # Candidate multiplier for the binary stage of INT1 searches, used
+        # when a request does not set one; see `tune_binary_oversampling`
+        self.binary_oversampling_factor = 20
 
     async def create_tables(self):
         # Check for old table name first
@@ -152,6 +330,151 @@ class PostgresVectorHandler(VectorHandler):
             """
 
         await self.connection_manager.execute_query(query)
+        await self._create_document_search_table()
+
+    async def _create_document_search_table(self) -> None:
+        """
+        Creates the per-document search table used by `search_documents`,
+        backfilling it from the stored chunks when it is first created.
+        """
+        search_table = self._get_table_name(
+            PostgresVectorHandler.DOCUMENT_SEARCH_TABLE_NAME
+        )
+        exists = await self.connection_manager.fetchrow_query(
+            "SELECT to_regclass($1) IS NOT NULL AS exists;", (search_table,)
+        )
+
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {search_table} (
+            document_id UUID PRIMARY KEY,
+            metadata JSONB,
+            metadata_tsv tsvector,
+            body_tsv tsvector,
+            body_truncated BOOLEAN NOT NULL DEFAULT FALSE,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        ALTER TABLE {search_table} ADD COLUMN IF NOT EXISTS body_truncated BOOLEAN NOT NULL DEFAULT FALSE;
+        CREATE INDEX IF NOT EXISTS idx_document_search_metadata_tsv ON {search_table} USING GIN (metadata_tsv);
+        CREATE INDEX IF NOT EXISTS idx_document_search_body_tsv ON {search_table} USING GIN (body_tsv);
+        """
+        await self.connection_manager.execute_query(query)
+
+        if not exists or not exists["exists"]:
+            logger.info(f"Backfilling document search table {search_table}")
+            try:
+                await self.refresh_document_search_index()
+            except Exception as e:
+                # Documents are indexed again as they are ingested or changed
+                logger.error(f"Failed to backfill {search_table}: {e}")
+
+    async def refresh_document_search_index(
+        self, document_ids: Optional[list[UUID]] = None
+    ) -> None:
+        """
+        Rebuilds the document search rows for the given documents from their
+        chunks and `document_info` metadata. Documents without any remaining
+        chunks are removed from the index.
+
+        The body tsvector holds each distinct lexeme of the document's chunks
+        once, without positions, and only serves to find candidates. When
+        its lexemes exceed `DOCUMENT_SEARCH_MAX_LEXEME_BYTES`, the lexemes
+        found in the fewest chunks are dropped and the row is marked
+        `body_truncated`, so `search_documents` falls back to its chunks.
+
+        Args:
+            document_ids (list[UUID], optional): Documents to refresh. If None,
+                every document is refreshed.
+        """
+        if document_ids is not None and not document_ids:
+            return
+
+        search_table = self._get_table_name(
+            PostgresVectorHandler.DOCUMENT_SEARCH_TABLE_NAME
+        )
+        document_filter = (
+            "WHERE v.document_id = ANY($1)" if document_ids is not None else ""
+        )
+        removed_filter = (
+            "document_id = ANY($1) AND" if document_ids is not None else ""
+        )
+
+        query = f"""
+        WITH documents AS (
+            SELECT DISTINCT v.document_id
+            FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)} v
+            {document_filter}
+        ),
+        document_lexemes AS (
+            SELECT v.document_id, l.lexeme, COUNT(*) AS chunk_frequency
+            FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)} v
+            CROSS JOIN LATERAL unnest(to_tsvector('english', COALESCE(v.text, ''))) AS l
+            {document_filter}
+            GROUP BY v.document_id, l.lexeme
+        ),
+        budgeted_lexemes AS (
+            SELECT
+                document_id,
+                lexeme,
+                SUM(octet_length(lexeme)) OVER (
+                    PARTITION BY document_id
+                    ORDER BY chunk_frequency DESC, lexeme
+                    ROWS UNBOUNDED PRECEDING
+                ) <= {PostgresVectorHandler.DOCUMENT_SEARCH_MAX_LEXEME_BYTES} AS kept
+            FROM document_lexemes
+        ),
+        chunk_stats AS (
+            SELECT
+                d.document_id,
+                COALESCE(
+                    array_to_tsvector(array_agg(b.lexeme) FILTER (WHERE b.kept)),
+                    ''::tsvector
+                ) AS body_tsv,
+                COALESCE(bool_or(NOT b.kept), FALSE) AS body_truncated
+            FROM documents d
+            LEFT JOIN budgeted_lexemes b ON b.document_id = d.document_id
+            GROUP BY d.document_id
+        ),
+        removed AS (
+            DELETE FROM {search_table}
+            WHERE {removed_filter} document_id NOT IN (SELECT document_id FROM chunk_stats)
+        )
+        INSERT INTO {search_table}
+        (document_id, metadata, metadata_tsv, body_tsv, body_truncated, updated_at)
+        SELECT
+            c.document_id,
+            COALESCE(d.metadata, '{{}}'::jsonb),
+            setweight(to_tsvector('english', COALESCE(d.title, '')), 'A')
+                || setweight(jsonb_to_tsvector('english', COALESCE(d.metadata, '{{}}'::jsonb), '["string"]'), 'B'),
+            c.body_tsv,
+            c.body_truncated,
+            NOW()
+        FROM chunk_stats c
+        LEFT JOIN {self._get_table_name('document_info')} d ON c.document_id = d.document_id
+        ON CONFLICT (document_id) DO UPDATE SET
+            metadata = EXCLUDED.metadata,
+            metadata_tsv = EXCLUDED.metadata_tsv,
+            body_tsv = EXCLUDED.body_tsv,
+            body_truncated = EXCLUDED.body_truncated,
+            updated_at = EXCLUDED.updated_at;
+        """
+
+        await self.connection_manager.execute_query(
+            query,
+            [document_ids] if document_ids is not None else None,
+            query_name="refresh_document_search_index",
+        )
+
+    async def _refresh_document_search_index_after_delete(
+        self, document_ids: list[UUID]
+    ) -> None:
+        # The chunks are already deleted, so a failed refresh must not fail
+        # the delete; the rows are rebuilt on the document's next change
+        try:
+            await self.refresh_document_search_index(document_ids)
+        except Exception as e:
+            logger.error(
+                f"Failed to refresh document search index after delete: {e}"
+            )
 
     async def upsert(self, entry: VectorEntry) -> None:
         """
@@ -182,12 +505,11 @@ class PostgresVectorHandler(VectorHandler):
                     entry.user_id,
                     entry.collection_ids,
                     str(entry.vector.data),
-                    quantize_vector_to_binary(
-                        entry.vector.data
-                    ),  # Convert to binary
+                    quantize_vector_to_binary(entry.vector.data),
                     entry.text,
                     json.dumps(entry.metadata),
                 ),
+                query_name="vector_upsert",
             )
         else:
             # For regular vectors, use vec column only
@@ -215,6 +537,7 @@ class PostgresVectorHandler(VectorHandler):
                     entry.text,
                     json.dumps(entry.metadata),
                 ),
+                query_name="vector_upsert",
             )
 
     async def upsert_entries(self, entries: list[VectorEntry]) -> None:
@@ -237,6 +560,9 @@ class PostgresVectorHandler(VectorHandler):
             text = EXCLUDED.text,
             metadata = EXCLUDED.metadata;
             """
+            binary_vectors = quantize_vectors_to_binary(
+                [entry.vector.data for entry in entries]
+            )
             bin_params = [
                 (
                     entry.extraction_id,
@@ -244,15 +570,15 @@ class PostgresVectorHandler(VectorHandler):
                     entry.user_id,
                     entry.collection_ids,
                     str(entry.vector.data),
-                    quantize_vector_to_binary(
-                        entry.vector.data
-                    ),  # Convert to binary
+                    binary_vector,
                     entry.text,
                     json.dumps(entry.metadata),
                 )
-                for entry in entries
+                for entry, binary_vector in zip(entries, binary_vectors)
             ]
-            await self.connection_manager.execute_many(query, bin_params)
+            await self.connection_manager.execute_many(
+                query, bin_params, query_name="vector_upsert_entries"
+            )
 
         else:
             # For regular vectors, use vec column only
@@ -281,11 +607,162 @@ class PostgresVectorHandler(VectorHandler):
                 for entry in entries
             ]
 
-            await self.connection_manager.execute_many(query, params)
+            await self.connection_manager.execute_many(
+                query, params, query_name="vector_upsert_entries"
+            )
+
+    async def upsert_entries_bulk(self, entries: list[VectorEntry]) -> None:
+        """
+        Bulk upsert for large batches of vector entries.
+
+        Rows are streamed with a binary COPY into a temporary staging table
+        and merged into the vectors table with a single `INSERT ... ON CONFLICT`
+        statement, avoiding per-row text encoding and round-trips. When a
+        batch repeats an `extraction_id`, its last entry wins.
+        """
+        if not entries:
+            return
+
+        staging_table = f"vectors_staging_{uuid4().hex}"
+        is_binary = self.quantization_type == VectorQuantizationType.INT1
+
+        columns = [
+            "extraction_id",
+            "document_id",
+            "user_id",
+            "collection_ids",
+            "vec",
+        ]
+        if is_binary:
+            columns.append("vec_binary")
+        columns.extend(["text", "metadata"])
+
+        vectors = np.asarray(
+            [entry.vector.data for entry in entries], dtype=np.float32
+        )
+        binary_vectors = (
+            quantize_vectors_to_binary(vectors) if is_binary else []
+        )
+
+        records = []
+        for i, entry in enumerate(entries):
+            record = [
+                entry.extraction_id,
+                entry.document_id,
+                entry.user_id,
+                entry.collection_ids,
+                vectors[i],
+            ]
+            if is_binary:
+                record.append(binary_vectors[i])
+            # The ordinal lets the last of duplicate entries win the merge
+            record.extend([entry.text, json.dumps(entry.metadata), i])
+            records.append(tuple(record))
+
+        async with self.connection_manager.get_connection(
+            query_name="vector_bulk_upsert"
+        ) as conn:
+            vector_schema = await self._register_vector_codec(conn)
+            try:
+                await self._copy_and_merge(
+                    conn, staging_table, columns, records, is_binary
+                )
+            finally:
+                # Pooled connections are shared with queries that expect the
+                # default text representation of `vector`
+                await conn.reset_type_codec("vector", schema=vector_schema)
+
+    async def _copy_and_merge(
+        self,
+        conn: Any,
+        staging_table: str,
+        columns: list[str],
+        records: list[tuple],
+        is_binary: bool,
+    ) -> None:
+        table_name = self._get_table_name(PostgresVectorHandler.TABLE_NAME)
+        update_clause = ",\n            ".join(
+            f"{column} = EXCLUDED.{column}" for column in columns[1:]
+        )
+        async with conn.transaction():
+            await conn.execute(
+                f"""
+                CREATE TEMP TABLE {staging_table} (
+                    extraction_id UUID,
+                    document_id UUID,
+                    user_id UUID,
+                    collection_ids UUID[],
+                    vec vector({self.dimension}),
+                    {f"vec_binary bit({self.dimension})," if is_binary else ""}
+                    text TEXT,
+                    metadata JSONB,
+                    ord INT
+                ) ON COMMIT DROP;
+                """
+            )
+            await conn.copy_records_to_table(
+                staging_table, records=records, columns=[*columns, "ord"]
+            )
+            await conn.execute(
+                f"""
+                INSERT INTO {table_name} ({", ".join(columns)})
+                SELECT DISTINCT ON (extraction_id) {", ".join(columns)}
+                FROM {staging_table}
+                ORDER BY extraction_id, ord DESC
+                ON CONFLICT (extraction_id) DO UPDATE SET
+                {update_clause};
+                """
+            )
+
+    async def _register_vector_codec(self, conn: Any) -> str:
+        """
+        Registers a binary codec for the pgvector `vector` type on the given
+        connection so that it can be used with binary COPY.
+
+        Returns:
+            str: The schema the `vector` type was found in.
+        """
+        schema = await conn.fetchval(
+            "SELECT typnamespace::regnamespace::text FROM pg_type WHERE typname = 'vector'"
+        )
+        await conn.set_type_codec(
+            "vector",
+            schema=schema or "public",
+            encoder=encode_vector_binary,
+            decoder=lambda data: np.frombuffer(
+                data, dtype=">f4", offset=4
+            ).tolist(),
+            format="binary",
+        )
+        return schema or "public"
 
     async def semantic_search(
         self, query_vector: list[float], search_settings: VectorSearchSettings
     ) -> list[VectorSearchResult]:
+        return await self._semantic_search(
+            query_vector,
+            search_settings,
+            two_stage=self.quantization_type == VectorQuantizationType.INT1,
+        )
+
+    async def _semantic_search(
+        self,
+        query_vector: list[float],
+        search_settings: VectorSearchSettings,
+        two_stage: bool,
+        exact: bool = False,
+    ) -> list[VectorSearchResult]:
+        """
+        Runs a semantic search, either directly over `vec` or as a two-stage
+        INT1 search that ranks `vec_binary` candidates before re-ranking them
+        with the original vectors.
+
+        Args:
+            query_vector (list[float]): The query embedding
+            search_settings (VectorSearchSettings): Search settings
+            two_stage (bool): Whether to run the INT1 two-stage search
+            exact (bool): Whether to disable index scans, forcing an exact search
+        """
         try:
             imeasure_obj = IndexMeasure(search_settings.index_measure)
         except ValueError:
@@ -302,13 +779,14 @@ class PostgresVectorHandler(VectorHandler):
 
         params: list[Union[str, int, bytes]] = []
         # For binary vectors (INT1), implement two-stage search
-        if self.quantization_type == VectorQuantizationType.INT1:
+        if two_stage:
             # Convert query vector to binary format
             binary_query = quantize_vector_to_binary(query_vector)
-            # TODO - Put depth multiplier in config / settings
-            extended_limit = (
-                search_settings.search_limit * 20
-            )  # Get 20x candidates for re-ranking
+            extended_limit = search_settings.search_limit * (
+                search_settings.binary_oversampling_factor
+                or self.binary_oversampling_factor
+            )
+            candidate_depth = extended_limit + search_settings.offset
             if (
                 imeasure_obj == IndexMeasure.hamming_distance
                 or imeasure_obj == IndexMeasure.jaccard_distance
@@ -404,8 +882,13 @@ class PostgresVectorHandler(VectorHandler):
             params.extend(
                 [search_settings.search_limit, search_settings.offset]
             )
+            candidate_depth = (
+                search_settings.search_limit + search_settings.offset
+            )
 
-        results = await self.connection_manager.fetch_query(query, params)
+        results = await self._fetch_search_query(
+            query, params, search_settings, candidate_depth, exact
+        )
 
         return [
             VectorSearchResult(
@@ -428,6 +911,168 @@ class PostgresVectorHandler(VectorHandler):
             for result in results
         ]
 
+    async def _fetch_search_query(
+        self,
+        query: str,
+        params: list,
+        search_settings: VectorSearchSettings,
+        candidate_depth: int,
+        exact: bool = False,
+    ) -> list:
+        """
+        Fetches a vector search query with the ANN index parameters applied
+        for the duration of its transaction. An HNSW scan returns at most
+        `hnsw.ef_search` rows, so it is raised towards the candidate depth,
+        within pgvector's upper bound of 1000. Runs on the read replica when
+        one is configured.
+        """
+        async with self.connection_manager.get_connection(
+            read_only=True, query_name="semantic_search"
+        ) as conn:
+            async with conn.transaction():
+                if exact:
+                    await conn.execute("SET LOCAL enable_indexscan = off")
+                else:
+                    await conn.execute(
+                        f"SET LOCAL hnsw.ef_search = {int(min(max(search_settings.ef_search, candidate_depth), 1000))}"
+                    )
+                    await conn.execute(
+                        f"SET LOCAL ivfflat.probes = {int(search_settings.probes)}"
+                    )
+                return await conn.fetch(query, *params)
+
+    async def evaluate_search_recall(
+        self,
+        sample_size: int = 100,
+        search_limit: int = 10,
+        oversampling_factors: Optional[list[int]] = None,
+        index_measure: IndexMeasure = IndexMeasure.cosine_distance,
+    ) -> dict[str, Any]:
+        """
+        Offline recall and latency harness for semantic search.
+
+        A sample of stored vectors is used as queries. Exact FP32 results,
+        computed with index scans disabled, are the ground truth for the
+        index-backed FP32 search and, under INT1 quantization, for the
+        two-stage binary search at each oversampling factor.
+
+        Args:
+            sample_size (int): Number of stored vectors to query with
+            search_limit (int): Number of results compared per query
+            oversampling_factors (list[int], optional): INT1 candidate multipliers to evaluate
+            index_measure (IndexMeasure): The distance measure to search with
+
+        Returns:
+            dict[str, Any]: Mean recall and p50/p99 latencies per search mode
+        """
+        sample_query = f"""
+        SELECT vec FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)}
+        ORDER BY random()
+        LIMIT $1;
+        """
+        sample = await self.connection_manager.fetch_query(
+            sample_query, (sample_size,)
+        )
+        query_vectors = [json.loads(row["vec"]) for row in sample]
+
+        search_settings = VectorSearchSettings(
+            search_limit=search_limit,
+            index_measure=index_measure,
+            include_metadatas=False,
+        )
+
+        async def run(
+            two_stage: bool, exact: bool = False, factor: Optional[int] = None
+        ) -> Tuple[list[set[UUID]], list[float]]:
+            settings = search_settings.model_copy(
+                update={"binary_oversampling_factor": factor}
+            )
+            ids, latencies = [], []
+            for query_vector in query_vectors:
+                start = time.perf_counter()
+                results = await self._semantic_search(
+                    query_vector, settings, two_stage=two_stage, exact=exact
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                ids.append({result.extraction_id for result in results})
+            return ids, latencies
+
+        def summarize(
+            ids: list[set[UUID]], latencies: list[float]
+        ) -> dict[str, float]:
+            recalls = [
+                len(found & truth) / len(truth) if truth else 1.0
+                for found, truth in zip(ids, exact_ids)
+            ]
+            return {
+                "recall": float(np.mean(recalls)) if recalls else 0.0,
+                "latency_p50_ms": (
+                    float(np.percentile(latencies, 50)) if latencies else 0.0
+                ),
+                "latency_p99_ms": (
+                    float(np.percentile(latencies, 99)) if latencies else 0.0
+                ),
+            }
+
+        exact_ids, exact_latencies = await run(two_stage=False, exact=True)
+        report: dict[str, Any] = {
+            "sample_size": len(query_vectors),
+            "search_limit": search_limit,
+            "exact": summarize(exact_ids, exact_latencies),
+            "indexed": summarize(*await run(two_stage=False)),
+        }
+
+        if self.quantization_type == VectorQuantizationType.INT1:
+            report["two_stage"] = {
+                factor: summarize(
+                    *await run(two_stage=True, factor=factor)
+                )
+                for factor in (
+                    oversampling_factors or [self.binary_oversampling_factor]
+                )
+            }
+
+        return report
+
+    async def tune_binary_oversampling(
+        self,
+        target_recall: float = 0.95,
+        sample_size: int = 100,
+        search_limit: int = 10,
+        candidate_factors: Optional[list[int]] = None,
+    ) -> dict[str, Any]:
+        """
+        Sets `binary_oversampling_factor` to the smallest candidate factor
+        whose measured INT1 two-stage recall meets `target_recall`, or to the
+        largest candidate if none does.
+
+        Returns:
+            dict[str, Any]: The recall report the factor was chosen from
+        """
+        if self.quantization_type != VectorQuantizationType.INT1:
+            raise ValueError(
+                "Oversampling can only be tuned for INT1 quantization."
+            )
+
+        factors = sorted(candidate_factors or [2, 4, 8, 16, 20, 32, 64])
+        report = await self.evaluate_search_recall(
+            sample_size=sample_size,
+            search_limit=search_limit,
+            oversampling_factors=factors,
+        )
+        self.binary_oversampling_factor = next(
+            (
+                factor
+                for factor in factors
+                if report["two_stage"][factor]["recall"] >= target_recall
+            ),
+            factors[-1],
+        )
+        logger.info(
+            f"Tuned binary oversampling factor to {self.binary_oversampling_factor}"
+        )
+        return report
+
     async def full_text_search(
         self, query_text: str, search_settings: VectorSearchSettings
     ) -> list[VectorSearchResult]:
@@ -473,7 +1118,9 @@ class PostgresVectorHandler(VectorHandler):
             ]
         )
 
-        results = await self.connection_manager.fetch_query(query, params)
+        results = await self.connection_manager.fetch_query(
+            query, params, read_only=True, query_name="full_text_search"
+        )
         return [
             VectorSearchResult(
                 extraction_id=UUID(str(r["extraction_id"])),
@@ -507,94 +1154,76 @@ class PostgresVectorHandler(VectorHandler):
                 "The `full_text_limit` must be greater than or equal to the `search_limit`."
             )
 
-        semantic_settings = copy.deepcopy(search_settings)
-        semantic_settings.search_limit += search_settings.offset
-
-        full_text_settings = copy.deepcopy(search_settings)
-        full_text_settings.hybrid_search_settings.full_text_limit += (
-            search_settings.offset
-        )
-
-        semantic_results: list[VectorSearchResult] = (
-            await self.semantic_search(query_vector, semantic_settings)
-        )
-        full_text_results: list[VectorSearchResult] = (
-            await self.full_text_search(query_text, full_text_settings)
-        )
-
-        semantic_limit = search_settings.search_limit
-        full_text_limit = (
-            search_settings.hybrid_search_settings.full_text_limit
-        )
-        semantic_weight = (
-            search_settings.hybrid_search_settings.semantic_weight
-        )
-        full_text_weight = (
-            search_settings.hybrid_search_settings.full_text_weight
+        hybrid_settings = search_settings.hybrid_search_settings
+        semantic_settings = search_settings.model_copy(
+            update={
+                "search_limit": search_settings.search_limit
+                + search_settings.offset
+            }
         )
-        rrf_k = search_settings.hybrid_search_settings.rrf_k
-
-        combined_results: dict[uuid.UUID, HybridSearchIntermediateResult] = {}
-
-        for rank, result in enumerate(semantic_results, 1):
-            combined_results[result.extraction_id] = {
-                "semantic_rank": rank,
-                "full_text_rank": full_text_limit,
-                "data": result,
-                "rrf_score": 0.0,  # Initialize with 0, will be calculated later
+        full_text_settings = search_settings.model_copy(
+            update={
+                "hybrid_search_settings": hybrid_settings.model_copy(
+                    update={
+                        "full_text_limit": hybrid_settings.full_text_limit
+                        + search_settings.offset
+                    }
+                )
             }
+        )
 
-        for rank, result in enumerate(full_text_results, 1):
-            if result.extraction_id in combined_results:
-                combined_results[result.extraction_id]["full_text_rank"] = rank
-            else:
-                combined_results[result.extraction_id] = {
-                    "semantic_rank": semantic_limit,
-                    "full_text_rank": rank,
-                    "data": result,
-                    "rrf_score": 0.0,  # Initialize with 0, will be calculated later
-                }
-
-        combined_results = {
-            k: v
-            for k, v in combined_results.items()
-            if v["semantic_rank"] <= semantic_limit * 2
-            and v["full_text_rank"] <= full_text_limit * 2
-        }
+        # Each leg acquires its own pooled connection, so running them
+        # together bounds hybrid latency by the slower leg.
+        if hybrid_settings.concurrent_search:
+            semantic_results, full_text_results = await asyncio.gather(
+                self.semantic_search(query_vector, semantic_settings),
+                self.full_text_search(query_text, full_text_settings),
+            )
+        else:
+            semantic_results = await self.semantic_search(
+                query_vector, semantic_settings
+            )
+            full_text_results = await self.full_text_search(
+                query_text, full_text_settings
+            )
 
-        for hyb_result in combined_results.values():
-            semantic_score = 1 / (rrf_k + hyb_result["semantic_rank"])
-            full_text_score = 1 / (rrf_k + hyb_result["full_text_rank"])
-            hyb_result["rrf_score"] = (
-                semantic_score * semantic_weight
-                + full_text_score * full_text_weight
-            ) / (semantic_weight + full_text_weight)
-
-        sorted_results = sorted(
-            combined_results.values(),
-            key=lambda x: x["rrf_score"],
-            reverse=True,
+        fused = reciprocal_rank_fusion(
+            semantic_ids=[r.extraction_id for r in semantic_results],
+            full_text_ids=[r.extraction_id for r in full_text_results],
+            semantic_limit=search_settings.search_limit,
+            full_text_limit=hybrid_settings.full_text_limit,
+            semantic_weight=hybrid_settings.semantic_weight,
+            full_text_weight=hybrid_settings.full_text_weight,
+            rrf_k=hybrid_settings.rrf_k,
         )
-        offset_results = sorted_results[
+        offset_results = fused[
             search_settings.offset : search_settings.offset
             + search_settings.search_limit
         ]
 
+        results_by_id = {r.extraction_id: r for r in full_text_results}
+        results_by_id.update({r.extraction_id: r for r in semantic_results})
+
         return [
             VectorSearchResult(
-                extraction_id=result["data"].extraction_id,
-                document_id=result["data"].document_id,
-                user_id=result["data"].user_id,
-                collection_ids=result["data"].collection_ids,
-                text=result["data"].text,
-                score=result["rrf_score"],
+                extraction_id=extraction_id,
+                document_id=results_by_id[extraction_id].document_id,
+                user_id=results_by_id[extraction_id].user_id,
+                collection_ids=results_by_id[extraction_id].collection_ids,
+                text=results_by_id[extraction_id].text,
+                score=rrf_score,
                 metadata={
-                    **result["data"].metadata,
-                    "semantic_rank": result["semantic_rank"],
-                    "full_text_rank": result["full_text_rank"],
+                    **results_by_id[extraction_id].metadata,
+                    "semantic_rank": semantic_rank,
+                    "full_text_rank": full_text_rank,
                 },
             )
-            for result in offset_results
+            for (
+                extraction_id,
+                semantic_rank,
+                full_text_rank,
+                rrf_score,
+            ) in offset_results
         ]
 
     async def delete(
@@ -611,6 +1240,10 @@ class PostgresVectorHandler(VectorHandler):
 
         results = await self.connection_manager.fetch_query(query, params)
 
+        await self._refresh_document_search_index_after_delete(
+            list({result["document_id"] for result in results})
+        )
+
         return {
             str(result["extraction_id"]): {
                 "status": "deleted",
@@ -648,19 +1281,26 @@ class PostgresVectorHandler(VectorHandler):
     async def delete_user_vector(self, user_id: UUID) -> None:
         query = f"""
         DELETE FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)}
-        WHERE user_id = $1;
+        WHERE user_id = $1
+        RETURNING document_id;
         """
-        await self.connection_manager.execute_query(query, (user_id,))
+        results = await self.connection_manager.fetch_query(query, (user_id,))
+        await self._refresh_document_search_index_after_delete(
+            list({result["document_id"] for result in results})
+        )
 
     async def delete_collection_vector(self, collection_id: UUID) -> None:
         query = f"""
          DELETE FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)}
          WHERE $1 = ANY(collection_ids)
-         RETURNING collection_ids
+         RETURNING document_id
          """
-        results = await self.connection_manager.fetchrow_query(
+        results = await self.connection_manager.fetch_query(
             query, (collection_id,)
         )
+        await self._refresh_document_search_index_after_delete(
+            list({result["document_id"] for result in results})
+        )
         return None
 
     async def get_document_chunks(
@@ -684,7 +1324,9 @@ class PostgresVectorHandler(VectorHandler):
 
         params = [document_id, offset]
 
-        results = await self.connection_manager.fetch_query(query, params)
+        results = await self.connection_manager.fetch_query(
+            query, params, query_name="get_document_chunks"
+        )
 
         chunks = []
         total = 0
@@ -715,7 +1357,7 @@ class PostgresVectorHandler(VectorHandler):
         """
 
         result = await self.connection_manager.fetchrow_query(
-            query, (extraction_id,)
+            query, (extraction_id,), query_name="get_chunk"
         )
 
         if result:
@@ -786,57 +1428,43 @@ class PostgresVectorHandler(VectorHandler):
                     )
                     else "vec_binary"
                 )
-        elif table_name == VectorTableName.ENTITIES_DOCUMENT:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.ENTITIES_DOCUMENT}"
-            )
-            col_name = "description_embedding"
-        elif table_name == VectorTableName.ENTITIES_COLLECTION:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.ENTITIES_COLLECTION}"
-            )
-            col_name = "description_embedding"
-        elif table_name == VectorTableName.COMMUNITIES:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.COMMUNITIES}"
-            )
-            col_name = "embedding"
         else:
+            # knowledge graph tables are indexed by `PostgresKGHandler`
             raise ArgError("invalid table name")
 
-        if index_method not in (
-            IndexMethod.ivfflat,
-            IndexMethod.hnsw,
-            IndexMethod.auto,
-        ):
-            raise ArgError("invalid index method")
+        validate_index_arguments(index_method, index_arguments)
 
-        if index_arguments:
-            # Disallow case where user submits index arguments but uses the
-            # IndexMethod.auto index (index build arguments should only be
-            # used with a specific index)
-            if index_method == IndexMethod.auto:
+        if index_method == IndexMethod.auto:
+            index_method = IndexMethod.hnsw
+
+        if col_name == "vec_binary":
+            if self.quantization_type != VectorQuantizationType.INT1:
                 raise ArgError(
-                    "Index build parameters are not allowed when using the IndexMethod.auto index."
+                    "Binary vector indices require INT1 quantization."
+                )
+            if index_measure not in (
+                IndexMeasure.hamming_distance,
+                IndexMeasure.jaccard_distance,
+            ):
+                raise ArgError(
+                    "Binary vector indices support only hamming_distance and jaccard_distance."
                 )
-            # Disallow case where user specifies one index type but submits
-            # index build arguments for the other index type
             if (
-                isinstance(index_arguments, IndexArgsHNSW)
-                and index_method != IndexMethod.hnsw
-            ) or (
-                isinstance(index_arguments, IndexArgsIVFFlat)
-                and index_method != IndexMethod.ivfflat
+                index_method == IndexMethod.ivfflat
+                and index_measure != IndexMeasure.hamming_distance
             ):
                 raise ArgError(
-                    f"{index_arguments.__class__.__name__} build parameters were supplied but {index_method} index was specified."
+                    "IVFFlat binary vector indices support only hamming_distance."
                 )
 
-        if index_method == IndexMethod.auto:
-            index_method = IndexMethod.hnsw
-
+        # Binary columns take the `bit_*` operator classes
         ops = index_measure_to_ops(
-            index_measure  # , quantization_type=self.quantization_type
+            index_measure,
+            quantization_type=(
+                VectorQuantizationType.INT1
+                if col_name == "vec_binary"
+                else VectorQuantizationType.FP32
+            ),
         )
 
         if ops is None:
@@ -852,22 +1480,13 @@ class PostgresVectorHandler(VectorHandler):
         create_index_sql = f"""
         CREATE INDEX {concurrently_sql} {index_name}
         ON {table_name_str}
-        USING {index_method} ({col_name} {ops}) {self._get_index_options(index_method, index_arguments)};
+        USING {index_method} ({col_name} {ops}) {index_options(index_method, index_arguments)};
         """
 
         try:
-            if concurrently:
-                async with (
-                    self.connection_manager.pool.get_connection() as conn  # type: ignore
-                ):
-                    # Disable automatic transaction management
-                    await conn.execute(
-                        "SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL READ COMMITTED"
-                    )
-                    await conn.execute(create_index_sql)
-            else:
-                # Non-concurrent index creation can use normal query execution
-                await self.connection_manager.execute_query(create_index_sql)
+            await execute_index_ddl(
+                self.connection_manager, create_index_sql, concurrently
+            )
         except Exception as e:
             raise Exception(f"Failed to create index: {e}")
         return None
@@ -1005,7 +1624,9 @@ class PostgresVectorHandler(VectorHandler):
         return where_clause
 
     async def list_indices(
-        self, table_name: Optional[VectorTableName] = None
+        self,
+        table_name: Optional[VectorTableName] = None,
+        index_column: Optional[str] = None,
     ) -> list[dict[str, Any]]:
         """
         Lists all vector indices for the specified table.
@@ -1013,6 +1634,8 @@ class PostgresVectorHandler(VectorHandler):
         Args:
             table_name (VectorTableName, optional): The table to list indices for.
                 If None, defaults to VECTORS table.
+            index_column (str, optional): Restrict the listing to indices on this
+                column, e.g. `vec_binary`. Defaults to all vector columns.
 
         Returns:
             List[dict]: List of indices with their properties
@@ -1023,43 +1646,16 @@ class PostgresVectorHandler(VectorHandler):
         if table_name == VectorTableName.VECTORS:
             table_name_str = f"{self.project_name}.{VectorTableName.VECTORS}"
             col_name = "vec"
-        elif table_name == VectorTableName.ENTITIES_DOCUMENT:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.ENTITIES_DOCUMENT}"
-            )
-            col_name = "description_embedding"
-        elif table_name == VectorTableName.ENTITIES_COLLECTION:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.ENTITIES_COLLECTION}"
-            )
-        elif table_name == VectorTableName.COMMUNITIES:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.COMMUNITIES}"
-            )
-            col_name = "embedding"
         else:
+            # knowledge graph tables are indexed by `PostgresKGHandler`
             raise ArgError("invalid table name")
 
-        query = """
-        SELECT
-            i.indexname as name,
-            i.indexdef as definition,
-            am.amname as method,
-            pg_relation_size(c.oid) as size_in_bytes,
-            COALESCE(psat.idx_scan, 0) as number_of_scans,
-            COALESCE(psat.idx_tup_read, 0) as tuples_read,
-            COALESCE(psat.idx_tup_fetch, 0) as tuples_fetched
-        FROM pg_indexes i
-        JOIN pg_class c ON c.relname = i.indexname
-        JOIN pg_am am ON c.relam = am.oid
-        LEFT JOIN pg_stat_user_indexes psat ON psat.indexrelname = i.indexname
-            AND psat.schemaname = i.schemaname
-        WHERE i.schemaname || '.' || i.tablename = $1
-        AND i.indexdef LIKE $2;
-        """
-
+        # `%(vec%` matches both `vec` and `vec_binary` indices
+        column_pattern = (
+            f"%({index_column} %" if index_column else f"%({col_name}%"
+        )
         results = await self.connection_manager.fetch_query(
-            query, (table_name_str, f"%({col_name}%")
+            LIST_VECTOR_INDICES_QUERY, (table_name_str, column_pattern)
         )
 
         return [
@@ -1097,22 +1693,8 @@ class PostgresVectorHandler(VectorHandler):
         if table_name == VectorTableName.VECTORS:
             table_name_str = f"{self.project_name}.{VectorTableName.VECTORS}"
             col_name = "vec"
-        elif table_name == VectorTableName.ENTITIES_DOCUMENT:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.ENTITIES_DOCUMENT}"
-            )
-            col_name = "description_embedding"
-        elif table_name == VectorTableName.ENTITIES_COLLECTION:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.ENTITIES_COLLECTION}"
-            )
-            col_name = "description_embedding"
-        elif table_name == VectorTableName.COMMUNITIES:
-            table_name_str = (
-                f"{self.project_name}.{VectorTableName.COMMUNITIES}"
-            )
-            col_name = "embedding"
         else:
+            # knowledge graph tables are indexed by `PostgresKGHandler`
             raise ArgError("invalid table name")
 
         # Extract schema and base table name
@@ -1144,17 +1726,9 @@ class PostgresVectorHandler(VectorHandler):
         )
 
         try:
-            if concurrently:
-                async with (
-                    self.connection_manager.pool.get_connection() as conn  # type: ignore
-                ):
-                    # Disable automatic transaction management
-                    await conn.execute(
-                        "SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL READ COMMITTED"
-                    )
-                    await conn.execute(drop_query)
-            else:
-                await self.connection_manager.execute_query(drop_query)
+            await execute_index_ddl(
+                self.connection_manager, drop_query, concurrently
+            )
         except Exception as e:
             raise Exception(f"Failed to delete index: {e}")
 
@@ -1183,6 +1757,7 @@ class PostgresVectorHandler(VectorHandler):
         results = await self.connection_manager.fetch_query(
             query,
             (str(document_id), str(chunk_id), similarity_threshold, limit),
+            query_name="get_semantic_neighbors",
         )
 
         return [
@@ -1203,7 +1778,9 @@ class PostgresVectorHandler(VectorHandler):
     ) -> list[dict[str, Any]]:
         """
         Search for documents based on their metadata fields and/or body text.
-        Joins with document_info table to get complete document metadata.
+        Candidates come from the per-document search table maintained by
+        `refresh_document_search_index`; body ranks are averaged over the
+        candidates' matching chunks, found through `idx_vectors_text`.
 
         Args:
             query_text (str): The search query text
@@ -1212,74 +1789,110 @@ class PostgresVectorHandler(VectorHandler):
         Returns:
             list[dict[str, Any]]: List of documents with their search scores and complete metadata
         """
+        # An empty query or no searchable fields can never produce a
+        # positive rank, so skip the round-trip entirely.
+        if not query_text or not (
+            settings.search_over_metadata or settings.search_over_body
+        ):
+            return []
+
         where_clauses = []
         params: list[Union[str, int, bytes]] = [query_text]
 
         # Build the dynamic metadata field search expression
         metadata_fields_expr = " || ' ' || ".join(
             [
-                f"COALESCE(v.metadata->>{psql_quote_literal(key)}, '')"
+                f"COALESCE(c.metadata->>{psql_quote_literal(key)}, '')"
                 for key in settings.metadata_keys
             ]
         )
 
-        query = f"""
-            WITH
-            -- Metadata search scores
-            metadata_scores AS (
-                SELECT DISTINCT ON (v.document_id)
-                    v.document_id,
-                    d.metadata as doc_metadata,
-                    CASE WHEN $1 = '' THEN 0.0
-                    ELSE
-                        ts_rank_cd(
-                            setweight(to_tsvector('english', {metadata_fields_expr}), 'A'),
-                            websearch_to_tsquery('english', $1),
-                            32
-                        )
-                    END as metadata_rank
-                FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)} v
-                LEFT JOIN {self._get_table_name('document_info')} d ON v.document_id = d.document_id
-                WHERE v.metadata IS NOT NULL
-            ),
-            -- Body search scores
+        # Candidate documents are found through the GIN-indexed tsvectors.
+        # Truncated bodies may lack the matching lexemes, so their chunks
+        # are always checked.
+        match_clauses = []
+        if settings.search_over_metadata:
+            match_clauses.append(
+                "s.metadata_tsv @@ websearch_to_tsquery('english', $1)"
+            )
+        if settings.search_over_body:
+            match_clauses.append(
+                "s.body_tsv @@ websearch_to_tsquery('english', $1)"
+            )
+            match_clauses.append("s.body_truncated")
+
+        body_scores = (
+            f"""
+            -- Body ranks averaged over each candidate's matching chunks
             body_scores AS (
                 SELECT
-                    document_id,
+                    v.document_id,
                     AVG(
                         ts_rank_cd(
-                            setweight(to_tsvector('english', COALESCE(text, '')), 'B'),
+                            setweight(to_tsvector('english', COALESCE(v.text, '')), 'B'),
                             websearch_to_tsquery('english', $1),
                             32
                         )
                     ) as body_rank
-                FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)}
-                WHERE $1 != ''
-                {f"AND to_tsvector('english', text) @@ websearch_to_tsquery('english', $1)" if settings.search_over_body else ""}
-                GROUP BY document_id
+                FROM {self._get_table_name(PostgresVectorHandler.TABLE_NAME)} v
+                WHERE v.document_id IN (SELECT document_id FROM candidates)
+                AND to_tsvector('english', v.text) @@ websearch_to_tsquery('english', $1)
+                GROUP BY v.document_id
+            ),
+            """
+            if settings.search_over_body
+            else ""
+        )
+        body_rank_expr = (
+            "COALESCE(b.body_rank, 0)" if settings.search_over_body else "0.0"
+        )
+        body_join = (
+            "LEFT JOIN body_scores b ON b.document_id = c.document_id"
+            if settings.search_over_body
+            else ""
+        )
+
+        query = f"""
+            WITH
+            candidates AS (
+                SELECT s.document_id, s.metadata
+                FROM {self._get_table_name(PostgresVectorHandler.DOCUMENT_SEARCH_TABLE_NAME)} s
+                WHERE {" OR ".join(match_clauses)}
+            ),
+            {body_scores}
+            -- Metadata scores per candidate, joined with their body scores
+            scores AS (
+                SELECT
+                    c.document_id,
+                    c.metadata,
+                    ts_rank_cd(
+                        setweight(to_tsvector('english', {metadata_fields_expr}), 'A'),
+                        websearch_to_tsquery('english', $1),
+                        32
+                    ) as metadata_rank,
+                    {body_rank_expr} as body_rank
+                FROM candidates c
+                {body_join}
             ),
             -- Combined scores with document metadata
             combined_scores AS (
                 SELECT
-                    COALESCE(m.document_id, b.document_id) as document_id,
-                    m.doc_metadata as metadata,
-                    COALESCE(m.metadata_rank, 0) as debug_metadata_rank,
-                    COALESCE(b.body_rank, 0) as debug_body_rank,
+                    document_id,
+                    metadata,
+                    metadata_rank as debug_metadata_rank,
+                    body_rank as debug_body_rank,
                     CASE
                         WHEN {str(settings.search_over_metadata).lower()} AND {str(settings.search_over_body).lower()} THEN
-                            COALESCE(m.metadata_rank, 0) * {settings.metadata_weight} + COALESCE(b.body_rank, 0) * {settings.title_weight}
+                            metadata_rank * {settings.metadata_weight} + body_rank * {settings.title_weight}
                         WHEN {str(settings.search_over_metadata).lower()} THEN
-                            COALESCE(m.metadata_rank, 0)
-                        WHEN {str(settings.search_over_body).lower()} THEN
-                            COALESCE(b.body_rank, 0)
-                        ELSE 0
+                            metadata_rank
+                        ELSE
+                            body_rank
                     END as rank
-                FROM metadata_scores m
-                FULL OUTER JOIN body_scores b ON m.document_id = b.document_id
+                FROM scores
                 WHERE (
-                    ($1 = '') OR
-                    ({str(settings.search_over_metadata).lower()} AND m.metadata_rank > 0) OR
-                    ({str(settings.search_over_body).lower()} AND b.body_rank > 0)
+                    ({str(settings.search_over_metadata).lower()} AND metadata_rank > 0) OR
+                    ({str(settings.search_over_body).lower()} AND body_rank > 0)
                 )
         """
 
@@ -1312,7 +1925,9 @@ class PostgresVectorHandler(VectorHandler):
         params.extend([settings.offset, settings.limit])
 
         # Execute query
-        results = await self.connection_manager.fetch_query(query, params)
+        results = await self.connection_manager.fetch_query(
+            query, params, read_only=True, query_name="search_documents"
+        )
 
         # Format results with complete document metadata
         return [
@@ -1329,23 +1944,3 @@ class PostgresVectorHandler(VectorHandler):
             }
             for r in results
         ]
-
-    def _get_index_options(
-        self,
-        method: IndexMethod,
-        index_arguments: Optional[Union[IndexArgsIVFFlat, IndexArgsHNSW]],
-    ) -> str:
-        if method == IndexMethod.ivfflat:
-            if isinstance(index_arguments, IndexArgsIVFFlat):
-                return f"WITH (lists={index_arguments.n_lists})"
-            else:
-                # Default value if no arguments provided
-                return "WITH (lists=100)"
-        elif method == IndexMethod.hnsw:
-            if isinstance(index_arguments, IndexArgsHNSW):
-                return f"WITH (m={index_arguments.m}, ef_construction={index_arguments.ef_construction})"
-            else:
-                # Default values if no arguments provided
-                return "WITH (m=16, ef_construction=64)"
-        else:
-            return ""  # No options for other methods
@@ -224,6 +224,11 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
     ):
         return results[:limit]
 
+    def count_tokens(self, text: str) -> int:
+        if self.base_model in OpenAIEmbeddingProvider.MODEL_TO_TOKENIZER:
+            return len(self.tokenize_string(text, self.base_model))
+        return super().count_tokens(text)
+
     def tokenize_string(self, text: str, model: str) -> list[int]:
         try:
             import tiktoken
@@ -8,6 +8,7 @@ from typing import Optional
 from core.main.assembly import R2RConfig
 from shared.abstractions import R2RException
 
+from lambda_functions.common.core.main.app_registry import AppRegistry
 from .assembly.builder import CustomR2RBuilder
 from ..main.assembly.factory import CustomR2RProviderFactory
 from .orchestration.lambda_orchestration import LambdaOrchestration
@@ -77,6 +78,12 @@ async def create_r2r_app(
     return await builder.build()
 
 
+# Built apps are reused by warm invocations of this container
+app_registry: AppRegistry[LambdaOrchestration] = AppRegistry(
+    create_r2r_app, lambda app: app.service.providers.database
+)
+
+
 def get_token(event) -> str:
     try:
         return event["headers"]["authorization"].replace(
@@ -108,11 +115,7 @@ async def async_handler(event, context):
     response_data = {}
 
     # R2Rを初期化
-    r2r_app = await create_r2r_app(
-        config_name=config_name,
-        config_path=config_path,
-    )
-    logger.info("completed build.")
+    r2r_app = await app_registry.get(config_name, config_path)
 
     # Controller
     match (request_path, request_method):
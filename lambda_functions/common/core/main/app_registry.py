@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+from core.base import current_project_name
+
+logger = logging.getLogger()
+
+App = TypeVar("App")
+
+AppKey = tuple[Optional[str], Optional[str]]
+
+
+class _Entry(Generic[App]):
+    __slots__ = ("app", "loop", "last_used")
+
+    def __init__(self, app: App, loop: asyncio.AbstractEventLoop):
+        self.app = app
+        self.loop = loop
+        self.last_used = time.monotonic()
+
+
+class AppRegistry(Generic[App]):
+    """
+    Keeps built R2R apps, with their providers, pipelines and connection
+    pools, alive across warm Lambda invocations. Apps are keyed by config
+    and shared by all tenants: the tenant of a request is taken from
+    `current_project_name`, and its schema is migrated the first time the
+    app serves it. The least recently used app is evicted once `max_apps`
+    are cached, and apps idle for longer than `idle_seconds` are dropped on
+    the next lookup.
+
+    A container may have been frozen since an app was last used, so the
+    database connections are health checked before the app is reused.
+    """
+
+    def __init__(
+        self,
+        create_app: Callable[[Optional[str], Optional[str]], Awaitable[App]],
+        database_of: Callable[[App], Any],
+        max_apps: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        health_check_after: float = 5.0,
+    ):
+        self.create_app = create_app
+        self.database_of = database_of
+        self.max_apps = max_apps or int(os.getenv("R2R_APP_CACHE_SIZE", "4"))
+        self.idle_seconds = idle_seconds or float(
+            os.getenv("R2R_APP_CACHE_IDLE_SECONDS", "900")
+        )
+        # Connections used a moment ago are not checked again
+        self.health_check_after = health_check_after
+        self._apps: OrderedDict[AppKey, _Entry[App]] = OrderedDict()
+        self._locks: dict[AppKey, asyncio.Lock] = {}
+
+    async def get(
+        self,
+        config_name: Optional[str] = None,
+        config_path: Optional[str] = None,
+    ) -> App:
+        """Returns the app for a config, building it on first use."""
+        key = (config_name, config_path)
+        start = time.perf_counter()
+        await self._evict_idle()
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._apps.get(key)
+            if entry is not None and not await self._is_usable(entry):
+                await self._close(key)
+                entry = None
+
+            cached = entry is not None
+            if entry is None:
+                entry = _Entry(
+                    await self.create_app(config_name, config_path),
+                    asyncio.get_running_loop(),
+                )
+                self._apps[key] = entry
+
+            entry.last_used = time.monotonic()
+            self._apps.move_to_end(key)
+
+        await self.database_of(entry.app).ensure_schema()
+
+        while len(self._apps) > self.max_apps:
+            await self._close(next(iter(self._apps)))
+
+        logger.info(
+            f"App for tenant {current_project_name.get()} {'reused' if cached else 'built'} in {(time.perf_counter() - start) * 1000:.1f} ms, {len(self._apps)} apps cached."
+        )
+        return entry.app
+
+    async def _is_usable(self, entry: _Entry[App]) -> bool:
+        # asyncpg pools are bound to the event loop that created them
+        if entry.loop is not asyncio.get_running_loop():
+            return False
+        if time.monotonic() - entry.last_used < self.health_check_after:
+            return True
+        return await self.database_of(entry.app).check_health()
+
+    async def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for key in [
+            key
+            for key, entry in self._apps.items()
+            if now - entry.last_used > self.idle_seconds
+        ]:
+            await self._close(key)
+
+    async def _close(self, key: AppKey) -> None:
+        entry = self._apps.pop(key, None)
+        if entry is None:
+            return
+        logger.info(f"Evicting app for config {key}.")
+        try:
+            if entry.loop is asyncio.get_running_loop():
+                await self.database_of(entry.app).close()
+        except Exception as e:
+            logger.warning(f"Failed to close app for config {key}: {e}")
@@ -0,0 +1,67 @@
+"""
+Creates or migrates the Postgres schema of a tenant ahead of its first
+request, so no Lambda cold start pays for the DDL:
+
+    python -m lambda_functions.common.core.main.bootstrap_tenant <tenant>
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Optional
+
+from core.base import project_context
+from core.main.config import R2RConfig
+
+from lambda_functions.common.core.main.assembly.factory import (
+    AWSR2RProviderFactory,
+)
+from lambda_functions.common.core.providers.database.schema import (
+    get_schema_version,
+)
+
+logger = logging.getLogger()
+
+
+async def bootstrap_tenant(
+    tenant: str,
+    config_name: Optional[str] = None,
+    config_path: Optional[str] = None,
+) -> int:
+    """Brings the schema of `tenant` up to date and returns its version."""
+    if config_name is None and config_path is None:
+        config_name = "default"
+    config = R2RConfig.load(config_name, config_path)
+
+    factory = AWSR2RProviderFactory(config)
+    crypto_provider = factory.create_crypto_provider(config.crypto)
+    with project_context(tenant):
+        # Initializing the provider applies any pending migration
+        database_provider = await factory.create_database_provider(
+            config.database, crypto_provider
+        )
+        try:
+            async with database_provider.pool.get_connection() as conn:
+                return await get_schema_version(conn, tenant)
+        finally:
+            await database_provider.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Create or migrate the database schema of a tenant."
+    )
+    parser.add_argument("tenant", help="Project name of the tenant.")
+    parser.add_argument("--config-name", default=None)
+    parser.add_argument("--config-path", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    version = asyncio.run(
+        bootstrap_tenant(args.tenant, args.config_name, args.config_path)
+    )
+    logger.info(f"Schema of tenant {args.tenant} is at version {version}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,16 @@
 import os
 import json
+import time
 import boto3
+import asyncio
 import datetime
+import logging
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import jwt
+from jwt.algorithms import has_crypto
 
 from core.base import (
     AuthConfig,
@@ -13,6 +22,190 @@ from core.base import (
 )
 from core.base.api.models import UserResponse
 
+logger = logging.getLogger()
+
+
+def _to_user_response(user_data: dict[str, Any]) -> UserResponse:
+    return UserResponse(
+        id=user_data["sub"],
+        email=user_data["email"],
+        is_active=user_data["custom:is_active"],
+        is_superuser=user_data["custom:is_superuser"],
+        collection_ids=json.loads(user_data["custom:collection_ids"]),
+        name=user_data["name"],
+        bio=user_data["custom:bio"],
+        profile_picture=user_data["custom:profile_picture"],
+        is_verified=user_data["email_verified"],
+        created_at=datetime.datetime.now(),
+        updated_at=datetime.datetime.now(),
+    )
+
+
+class CognitoTokenVerifier:
+    """
+    Verifies Cognito JWTs locally against the user pool's JWKS and caches
+    the `UserResponse` resolved for each token until it expires.
+
+    The JWKS is fetched once, and again only when a token is signed with an
+    unknown key. ID tokens carry the user attributes, so they never need a
+    round-trip; access tokens are resolved with `get_user` once, off the
+    event loop. A cached user outlives neither its token nor
+    `max_cache_seconds`, which bounds how long a globally signed out token
+    is still accepted.
+
+    Tests can pass a local `jwks` dict, or point `COGNITO_JWKS_URL` at a
+    `file://` JWKS, together with tokens signed by the matching key.
+    """
+
+    JWKS_REFETCH_SECONDS = 60.0
+    USER_ATTRIBUTES = (
+        "sub",
+        "email",
+        "email_verified",
+        "custom:is_active",
+        "custom:is_superuser",
+        "custom:collection_ids",
+        "custom:bio",
+        "custom:profile_picture",
+    )
+
+    def __init__(
+        self,
+        get_user: Callable[..., dict[str, Any]],
+        region: Optional[str] = None,
+        user_pool_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        jwks: Optional[dict[str, Any]] = None,
+        max_cache_seconds: Optional[float] = None,
+        max_cache_size: int = 10_000,
+    ):
+        self.get_user = get_user
+        self.issuer = (
+            f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+            if region and user_pool_id
+            else None
+        )
+        self.client_id = client_id
+        self.jwks_url = jwks_url or (
+            f"{self.issuer}/.well-known/jwks.json" if self.issuer else None
+        )
+        self.max_cache_seconds = max_cache_seconds or float(
+            os.getenv("COGNITO_USER_CACHE_SECONDS", "300")
+        )
+        self.max_cache_size = max_cache_size
+        if (jwks is not None or self.jwks_url) and not has_crypto:
+            # Without it every RS256 token would be rejected
+            raise ImportError(
+                "Please install pyjwt[crypto] to verify Cognito tokens."
+            )
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._jwks_fetched_at = float("-inf")
+        if jwks is not None:
+            self._load_jwks(jwks)
+            self._jwks_fetched_at = time.monotonic()
+        self._users: OrderedDict[str, tuple[float, UserResponse]] = (
+            OrderedDict()
+        )
+
+    @property
+    def verifies_locally(self) -> bool:
+        return bool(self._keys) or self.jwks_url is not None
+
+    def _load_jwks(self, jwks: dict[str, Any]) -> None:
+        self._keys = {
+            key.key_id: key for key in jwt.PyJWKSet.from_dict(jwks).keys
+        }
+
+    def _fetch_jwks(self) -> dict[str, Any]:
+        with urllib.request.urlopen(self.jwks_url, timeout=5) as response:
+            return json.loads(response.read())
+
+    async def _signing_key(self, kid: Optional[str]) -> jwt.PyJWK:
+        key = self._keys.get(kid)
+        if (
+            key is None
+            and self.jwks_url
+            and time.monotonic() - self._jwks_fetched_at
+            >= self.JWKS_REFETCH_SECONDS
+        ):
+            # Cognito rotates keys rarely, so only unknown ids refetch
+            self._jwks_fetched_at = time.monotonic()
+            self._load_jwks(await asyncio.to_thread(self._fetch_jwks))
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid}")
+        return key
+
+    async def verify(self, token: str) -> dict[str, Any]:
+        """Returns the claims of `token` once its signature is checked."""
+        header = jwt.get_unverified_header(token)
+        key = await self._signing_key(header.get("kid"))
+        claims = jwt.decode(
+            token,
+            key.key,
+            algorithms=["RS256"],
+            issuer=self.issuer,
+            options={"verify_aud": False, "require": ["exp"]},
+        )
+        token_use = claims.get("token_use")
+        if token_use not in ("access", "id"):
+            raise jwt.InvalidTokenError(f"Unexpected token use {token_use}")
+        if self.client_id and self.client_id != claims.get(
+            "client_id" if token_use == "access" else "aud"
+        ):
+            raise jwt.InvalidTokenError("Token was issued for another client")
+        return claims
+
+    def _cached(self, token: str) -> Optional[UserResponse]:
+        entry = self._users.get(token)
+        if entry is None:
+            return None
+        if time.time() >= entry[0]:
+            del self._users[token]
+            return None
+        self._users.move_to_end(token)
+        return entry[1]
+
+    def _cache(
+        self, token: str, expires_at: float, user: UserResponse
+    ) -> None:
+        self._users[token] = (
+            min(expires_at, time.time() + self.max_cache_seconds),
+            user,
+        )
+        self._users.move_to_end(token)
+        while len(self._users) > self.max_cache_size:
+            self._users.popitem(last=False)
+
+    async def user(self, token: str) -> UserResponse:
+        user = self._cached(token)
+        if user is not None:
+            return user
+
+        verified = self.verifies_locally
+        if verified:
+            claims = await self.verify(token)
+        else:
+            # `get_user` below checks the token instead
+            claims = jwt.decode(token, options={"verify_signature": False})
+
+        if verified and all(name in claims for name in self.USER_ATTRIBUTES):
+            user_data = {**claims, "name": claims.get("cognito:username")}
+        else:
+            response = await asyncio.to_thread(
+                self.get_user, AccessToken=token
+            )
+            user_data = {
+                attr["Name"]: attr["Value"]
+                for attr in response["UserAttributes"]
+            }
+            user_data["name"] = response["Username"]
+
+        user = _to_user_response(user_data)
+        self._cache(token, float(claims.get("exp", 0)), user)
+        return user
+
 
 class CognitoAuthProvider(AuthProvider):
     def __init__(
@@ -30,31 +223,26 @@ class CognitoAuthProvider(AuthProvider):
             aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
             region_name=os.environ["AWS_REGION"]
         )
+        self.verifier = CognitoTokenVerifier(
+            self.client.get_user,
+            region=os.environ["AWS_REGION"],
+            user_pool_id=os.getenv("COGNITO_USER_POOL_ID"),
+            client_id=os.getenv("COGNITO_CLIENT_ID"),
+            jwks_url=os.getenv("COGNITO_JWKS_URL"),
+        )
+        if not self.verifier.verifies_locally:
+            logger.warning(
+                "COGNITO_USER_POOL_ID is not set, tokens are verified with `get_user`."
+            )
 
     async def user(self, token: str) -> UserResponse:
         try:
-            response = self.client.get_user(AccessToken=token)
-
-            user_data = {attr["Name"]: attr["Value"]
-                         for attr in response["UserAttributes"]}
-            user_data["name"] = response["Username"]
+            user = await self.verifier.user(token)
 
             # テレメトリ送信時にユーザーIDも送りたいため必要
-            os.environ["COGNITO_USER_ID"] = user_data["sub"]
-
-            return UserResponse(
-                id=user_data["sub"],
-                email=user_data["email"],
-                is_active=user_data["custom:is_active"],
-                is_superuser=user_data["custom:is_superuser"],
-                collection_ids=json.loads(user_data["custom:collection_ids"]),
-                name=user_data["name"],
-                bio=user_data["custom:bio"],
-                profile_picture=user_data["custom:profile_picture"],
-                is_verified=user_data["email_verified"],
-                created_at=datetime.datetime.now(),
-                updated_at=datetime.datetime.now(),
-            )
+            os.environ["COGNITO_USER_ID"] = str(user.id)
+
+            return user
 
         except Exception as e:
             raise R2RException(status_code=401, message=str(e))
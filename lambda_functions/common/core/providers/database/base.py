@@ -1,6 +1,4 @@
-import asyncio
 import logging
-import asyncpg
 
 from core.providers.database.base import SemaphoreConnectionPool
 
@@ -8,30 +6,26 @@ logger = logging.getLogger()
 
 
 class CustomSemaphoreConnectionPool(SemaphoreConnectionPool):
-    def __init__(self, connection_string, postgres_configuration_settings):
-        super().__init__(connection_string, postgres_configuration_settings)
-
-    async def initialize(self):
-        try:
-            logger.info(
-                f"Connecting with {int(self.postgres_configuration_settings.max_connections * 0.9)} connections to `asyncpg.create_pool`."
-            )
-
-            self.semaphore = asyncio.Semaphore(
-                int(self.postgres_configuration_settings.max_connections * 0.9)
-            )
-
-            self.pool = await asyncpg.create_pool(
-                self.connection_string,
-                min_size=1,
-                max_size=self.postgres_configuration_settings.max_connections,
-                max_inactive_connection_lifetime=0.2
-            )
-
-            logger.info(
-                "Successfully connected to Postgres database and created connection pool."
-            )
-        except Exception as e:
-            raise ValueError(
-                f"Error {e} occurred while attempting to connect to relational database."
-            ) from e
\ No newline at end of file
+    # Pools outlive invocations in the app registry, so unless configured
+    # otherwise keep a single warm connection and let extra ones go once
+    # the burst is over
+    DEFAULT_MIN_CONNECTIONS = 1
+    # Seconds an idle connection is kept for the next warm invocation
+    DEFAULT_MAX_INACTIVE_CONNECTION_LIFETIME = 300.0
+
+    async def check_health(self, timeout: float = 2.0) -> bool:
+        """
+        Pings the pool. Connections may have been dropped by the server or
+        the network while the container was frozen, so on failure they are
+        all expired and the ping is retried on a fresh connection.
+        """
+        for attempt in range(2):
+            try:
+                async with self.pool.acquire(timeout=timeout) as conn:
+                    await conn.fetchval("SELECT 1", timeout=timeout)
+                return True
+            except Exception as e:
+                logger.warning(f"Pooled connection failed health check: {e}")
+                if attempt == 0:
+                    await self.pool.expire_connections()
+        return False
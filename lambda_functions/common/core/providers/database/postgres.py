@@ -3,11 +3,13 @@ import logging
 from core.base import (
     DatabaseConfig,
     VectorQuantizationType,
+    current_project_name,
 )
 from core.providers import BCryptProvider
 from core.providers.database.postgres import PostgresDBProvider
 
 from .base import CustomSemaphoreConnectionPool
+from .schema import migrate_schema
 
 logger = logging.getLogger()
 
@@ -30,32 +32,50 @@ class CustomPostgresDBProvider(PostgresDBProvider):
             *args,
             **kwargs
         )
+        # Projects whose schema was checked by this process
+        self._migrated_projects: set[str] = set()
+
+    @property
+    def project_name(self) -> str:
+        """The project of the current request, else the configured one."""
+        return current_project_name.get() or self._project_name
+
+    @project_name.setter
+    def project_name(self, project_name: str) -> None:
+        self._project_name = project_name
 
     async def initialize(self):
         logger.info("Initializing `PostgresDBProvider`.")
         self.pool = CustomSemaphoreConnectionPool(
-            self.connection_string, self.postgres_configuration_settings
+            self.connection_string,
+            self.postgres_configuration_settings,
+            self.connection_manager.metrics,
         )
         await self.pool.initialize()
-        await self.connection_manager.initialize(self.pool)
+        if self.read_connection_string:
+            logger.info("Routing search queries to the Postgres read replica")
+            self.read_pool = CustomSemaphoreConnectionPool(
+                self.read_connection_string,
+                self.postgres_configuration_settings,
+                self.connection_manager.metrics,
+            )
+            await self.read_pool.initialize()
+        await self.connection_manager.initialize(self.pool, self.read_pool)
 
-        async with self.pool.get_connection() as conn:
-            await conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";')
-            await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
-            await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
-            await conn.execute("CREATE EXTENSION IF NOT EXISTS fuzzystrmatch;")
+        # Lambdas initialize a provider per cold start, so the DDL only
+        # runs when the tenant schema is behind
+        await self.ensure_schema()
 
-            # Create schema if it doesn't exist
-            await conn.execute(
-                f'CREATE SCHEMA IF NOT EXISTS "{self.project_name}";'
-            )
+    async def ensure_schema(self) -> None:
+        """Migrates the schema of the current project on its first use."""
+        project_name = self.project_name
+        if project_name not in self._migrated_projects:
+            await migrate_schema(self)
+            self._migrated_projects.add(project_name)
 
-        await self.document_handler.create_tables()
-        await self.collection_handler.create_tables()
-        await self.token_handler.create_tables()
-        await self.user_handler.create_tables()
-        await self.vector_handler.create_tables()
-        await self.prompt_handler.create_tables()
-        await self.file_handler.create_tables()
-        await self.kg_handler.create_tables()
-        await self.logging_handler.create_tables()
+    async def check_health(self) -> bool:
+        """Whether the pooled connections can still reach Postgres."""
+        for pool in (self.pool, self.read_pool):
+            if pool is not None and not await pool.check_health():
+                return False
+        return True
@@ -0,0 +1,109 @@
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from asyncpg import Connection
+from asyncpg.exceptions import InvalidSchemaNameError, UndefinedTableError
+
+if TYPE_CHECKING:
+    from .postgres import CustomPostgresDBProvider
+
+logger = logging.getLogger()
+
+# Version of the tables a tenant schema is expected to have
+SCHEMA_VERSION = 1
+
+
+async def _create_initial_schema(provider: "CustomPostgresDBProvider") -> None:
+    async with provider.pool.get_connection() as conn:
+        await conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";')
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS fuzzystrmatch;")
+
+        # Create schema if it doesn't exist
+        await conn.execute(
+            f'CREATE SCHEMA IF NOT EXISTS "{provider.project_name}";'
+        )
+
+    await provider.document_handler.create_tables()
+    await provider.collection_handler.create_tables()
+    await provider.token_handler.create_tables()
+    await provider.user_handler.create_tables()
+    await provider.vector_handler.create_tables()
+    await provider.prompt_handler.create_tables()
+    await provider.file_handler.create_tables()
+    await provider.kg_handler.create_tables()
+    await provider.logging_handler.create_tables()
+    await provider.embedding_cache_handler.create_tables()
+
+
+# Migration bringing a tenant schema up to each version. Migrations must be
+# idempotent; when a handler's `create_tables` changes, add one that applies
+# the change and bump `SCHEMA_VERSION`.
+MIGRATIONS: dict[
+    int, Callable[["CustomPostgresDBProvider"], Awaitable[None]]
+] = {
+    1: _create_initial_schema,
+}
+
+
+async def get_schema_version(conn: Connection, project_name: str) -> int:
+    """Returns the version of a tenant schema, 0 if it was never created."""
+    try:
+        return (
+            await conn.fetchval(
+                f'SELECT version FROM "{project_name}".schema_version'
+            )
+            or 0
+        )
+    except (InvalidSchemaNameError, UndefinedTableError):
+        return 0
+
+
+async def migrate_schema(provider: "CustomPostgresDBProvider") -> int:
+    """
+    Brings the tenant schema of `provider` up to `SCHEMA_VERSION`. An up to
+    date schema costs a single query; otherwise the pending migrations run
+    under an advisory lock, so concurrent cold starts of one tenant apply
+    them once. Returns the schema version.
+    """
+    project_name = provider.project_name
+    async with provider.pool.get_connection() as conn:
+        version = await get_schema_version(conn, project_name)
+        if version >= SCHEMA_VERSION:
+            return version
+
+        await conn.execute(
+            "SELECT pg_advisory_lock(hashtext($1))", project_name
+        )
+        try:
+            version = await get_schema_version(conn, project_name)
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                logger.info(
+                    f"Migrating schema {project_name} to version {target}."
+                )
+                await MIGRATIONS[target](provider)
+                await conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS "{project_name}".schema_version (
+                        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+                        version INT NOT NULL,
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                    );
+                    """
+                )
+                await conn.execute(
+                    f"""
+                    INSERT INTO "{project_name}".schema_version (version)
+                    VALUES ($1)
+                    ON CONFLICT (id) DO UPDATE
+                    SET version = EXCLUDED.version, updated_at = NOW();
+                    """,
+                    target,
+                )
+                version = target
+        finally:
+            await conn.execute(
+                "SELECT pg_advisory_unlock(hashtext($1))", project_name
+            )
+    return version
@@ -1,5 +1,6 @@
 from ..main.assembly.factory import CustomR2RProviderFactory
 from .assembly.builder import CustomR2RBuilder
+from core.base import project_context
 from core.main.assembly import R2RConfig
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
@@ -139,17 +140,18 @@ class CustomMangum(Mangum):
         super().__init__(**kwargs)
 
     @staticmethod
-    def set_environment(event):
+    def get_identification_name(event) -> str:
         logger.info("[[ INFO ]] received invoke handler!")
         logger.info(event)
         identification_name = event["headers"]["x-acc-identification-name"]
         # TODO: 顧客IDのバリデーションを実装する
-        os.environ["R2R_PROJECT_NAME"] = identification_name
         logger.info(f"[[ INFO ]] identification_name = {identification_name}")
+        return identification_name
 
     def __call__(self, event, context):
-        self.set_environment(event)
-        super().__call__(event, context)
+        # The app and its handlers read the tenant from this context
+        with project_context(self.get_identification_name(event)):
+            return super().__call__(event, context)
 # -------------test-----------------
 
 
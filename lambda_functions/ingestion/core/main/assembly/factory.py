@@ -64,6 +64,9 @@ class CustomR2RProviderFactory(AWSR2RProviderFactory):
                 self.config.database, crypto_provider, *args, **kwargs
             )
         )
+        embedding_provider.attach_cache_store(
+            database_provider.embedding_cache_handler
+        )
 
         # prompt_providerは使わないのでインスタンス化のみ（初期化は実行しない）
         prompt_provider = R2RPromptProvider(
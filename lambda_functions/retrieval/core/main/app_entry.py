@@ -5,10 +5,12 @@ import json
 from asyncio import get_event_loop
 from typing import Optional
 
+from core.base import current_project_name
 from core.main.assembly import R2RConfig
 from shared.abstractions import R2RException
 
 from lambda_functions.common.core.main.exception import LambdaException
+from lambda_functions.common.core.main.app_registry import AppRegistry
 from .assembly.builder import CustomR2RBuilder
 from ..main.assembly.factory import CustomR2RProviderFactory
 from .orchestration.lambda_orchestration import LambdaOrchestration
@@ -78,6 +80,12 @@ async def create_r2r_app(
     return await builder.build()
 
 
+# Built apps are reused by warm invocations of this container
+app_registry: AppRegistry[LambdaOrchestration] = AppRegistry(
+    create_r2r_app, lambda app: app.auth_service.providers.database
+)
+
+
 def get_token(event) -> str:
     try:
         return event["headers"]["authorization"].replace(
@@ -105,7 +113,8 @@ async def async_handler(event, context):
     # TODO: 会社IDを存在するものかバリデーションしてfalseならここでraiseする
     identification_name = event["headers"]["x-acc-identification-name"]
     if identification_name:
-        os.environ["R2R_PROJECT_NAME"] = identification_name
+        # Scoped to this invocation's task
+        current_project_name.set(identification_name)
     else:
         raise LambdaException(
             "x-acc-identification-name header was not found.", 404)
@@ -113,11 +122,7 @@ async def async_handler(event, context):
     response_data = {}
 
     # R2Rを初期化
-    r2r_app = await create_r2r_app(
-        config_name=config_name,
-        config_path=config_path,
-    )
-    logger.info("completed build.")
+    r2r_app = await app_registry.get(config_name, config_path)
 
     # Controller
     match (request_path, request_method):
@@ -85,6 +85,9 @@ class CustomR2RProviderFactory(AWSR2RProviderFactory):
                 self.config.database, crypto_provider, *args, **kwargs
             )
         )
+        embedding_provider.attach_cache_store(
+            database_provider.embedding_cache_handler
+        )
 
         # インスタンス化のみ
         ingestion_provider = IngestionProvider(
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 
 from pydantic import Field
 
@@ -101,6 +102,26 @@ class KGEntityDeduplicationSettings(R2RSerializable):
         description="Configuration for text generation during graph entity deduplication.",
     )
 
+    description_similarity_eps: float = Field(
+        default=0.1,
+        description="Maximum cosine distance between description embeddings for entities to be merged by `by_description` deduplication.",
+    )
+
+    deduplication_block_size: int = Field(
+        default=4096,
+        description="Number of embeddings compared per block during `by_description` deduplication; bounds memory at block_size^2 floats.",
+    )
+
+    deduplication_ann_threshold: int = Field(
+        default=50_000,
+        description="Entity count above which `by_description` deduplication finds candidate pairs through the `description_embedding` ANN index instead of comparing every pair; 0 always compares every pair.",
+    )
+
+    deduplication_ann_neighbours: int = Field(
+        default=16,
+        description="Nearest neighbours fetched per entity when `by_description` deduplication uses the ANN index; merges beyond them are missed.",
+    )
+
 
 class KGEnrichmentSettings(R2RSerializable):
     """Settings for knowledge graph enrichment."""
@@ -121,6 +142,11 @@ class KGEnrichmentSettings(R2RSerializable):
         description="The maximum length of the summary for a community.",
     )
 
+    community_summary_token_budget: Optional[int] = Field(
+        default=None,
+        description="The maximum number of LLM tokens spent on community summaries in one enrichment run. Communities left over are summarized by the next run. Unlimited if not set.",
+    )
+
     generation_config: GenerationConfig = Field(
         default_factory=GenerationConfig,
         description="Configuration for text generation during graph enrichment.",
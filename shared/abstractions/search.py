@@ -179,6 +179,10 @@ class HybridSearchSettings(R2RSerializable):
     rrf_k: int = Field(
         default=50, description="K-value for RRF (Rank Reciprocal Fusion)"
     )
+    concurrent_search: bool = Field(
+        default=True,
+        description="Whether to run the semantic and full text searches concurrently",
+    )
 
 
 class DocumentSearchSettings(R2RSerializable):
@@ -287,6 +291,11 @@ class VectorSearchSettings(R2RSerializable):
         default=40,
         description="Size of the dynamic candidate list for HNSW index search. Higher increases accuracy but decreases speed.",
     )
+    binary_oversampling_factor: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Multiplier on `search_limit` for the number of binary candidates re-ranked in INT1 quantized searches. Defaults to the provider's tuned value.",
+    )
     hybrid_search_settings: HybridSearchSettings = Field(
         default=HybridSearchSettings(),
         description="Settings for hybrid search",
@@ -407,6 +416,14 @@ class KGSearchSettings(R2RSerializable):
         "__Relationship__": 20,
         "__Community__": 20,
     }
+    probes: int = Field(
+        default=10,
+        description="Number of ivfflat index lists to query. Higher increases accuracy but decreases speed.",
+    )
+    ef_search: int = Field(
+        default=40,
+        description="Size of the dynamic candidate list for HNSW index search. Higher increases accuracy but decreases speed.",
+    )
 
     class Config:
         json_encoders = {UUID: str}
@@ -422,6 +439,8 @@ class KGSearchSettings(R2RSerializable):
                 "__Relationship__": 20,
                 "__Community__": 20,
             },
+            "probes": 10,
+            "ef_search": 40,
         }
 
     def __init__(self, **data):